@@ -0,0 +1,70 @@
+"""market_data continuous aggregates for higher timeframes
+
+Revision ID: market_data_caggs
+Revises: c5d9cc935a7a
+Create Date: 2026-01-10 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'market_data_caggs'
+down_revision = 'c5d9cc935a7a'
+branch_labels = None
+depends_on = None
+
+# টাইমফ্রেম -> time_bucket ইন্টারভাল (সবগুলো 1m বেস সিরিজ থেকে তৈরি হয়)
+# নোট: '3d' ও '1M' বাদ, কারণ time_bucket এর অ্যালাইনমেন্ট এক্সচেঞ্জের ক্যান্ডেলের সাথে মেলে না
+AGGREGATES = {
+    '3m': '3 minutes', '5m': '5 minutes', '15m': '15 minutes', '30m': '30 minutes', '45m': '45 minutes',
+    '1h': '1 hour', '2h': '2 hours', '3h': '3 hours', '4h': '4 hours', '6h': '6 hours', '8h': '8 hours',
+    '12h': '12 hours', '1d': '1 day', '1w': '1 week',
+}
+
+
+def view_name(timeframe):
+    return f"market_data_{timeframe}"
+
+
+def upgrade():
+    # Continuous Aggregate ট্রানজ্যাকশনের ভেতরে তৈরি করা যায় না
+    with op.get_context().autocommit_block():
+        for timeframe, bucket in AGGREGATES.items():
+            view = view_name(timeframe)
+            op.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {view}
+                WITH (timescaledb.continuous) AS
+                SELECT
+                    exchange,
+                    symbol,
+                    time_bucket(INTERVAL '{bucket}', timestamp) AS timestamp,
+                    first(open, timestamp) AS open,
+                    max(high) AS high,
+                    min(low) AS low,
+                    last(close, timestamp) AS close,
+                    sum(volume) AS volume
+                FROM market_data
+                WHERE timeframe = '1m'
+                GROUP BY exchange, symbol, time_bucket(INTERVAL '{bucket}', timestamp)
+                WITH NO DATA;
+            """)
+            # রিয়েল-টাইম অ্যাগ্রিগেশন: এখনো materialize না হওয়া সর্বশেষ বাকেটগুলোও কুয়েরিতে আসবে
+            op.execute(f"ALTER MATERIALIZED VIEW {view} SET (timescaledb.materialized_only = false);")
+            op.execute(f"CREATE INDEX IF NOT EXISTS idx_{view}_lookup ON {view} (symbol, timestamp);")
+
+            # রিফ্রেশ পলিসি: শেষ কয়েক বাকেট নিয়মিত রিফ্রেশ (পুরোনো ব্যাকফিল অ্যাপ নিজেই রিফ্রেশ করে)
+            schedule = '5 minutes' if timeframe.endswith('m') else '1 hour'
+            op.execute(f"""
+                SELECT add_continuous_aggregate_policy('{view}',
+                    start_offset => GREATEST(INTERVAL '2 days', INTERVAL '{bucket}' * 3),
+                    end_offset => INTERVAL '{bucket}',
+                    schedule_interval => INTERVAL '{schedule}',
+                    if_not_exists => TRUE);
+            """)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for timeframe in AGGREGATES:
+            op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {view_name(timeframe)} CASCADE;")
@@ -5,9 +5,13 @@ import os
 import pandas as pd
 from app import models, schemas
 from app.api import deps
-from app.tasks import run_backtest_task, run_optimization_task, download_candles_task, download_trades_task, run_batch_backtest_task
+from app.tasks import run_backtest_task, run_optimization_task, download_candles_task, download_trades_task, download_batch_task, run_batch_backtest_task, convert_trades_task
 from app.celery_app import celery_app
 from app import utils
+from app.services.data_processing import stream_trades_to_candles
+from app.services.feed_store import feed_store
+from app.services.trade_conversion_pool import to_pandas_timeframe, output_filename
+from fastapi.concurrency import run_in_threadpool
 
 router = APIRouter()
 
@@ -31,7 +35,8 @@ def run_backtest(
         secondary_timeframe=request.secondary_timeframe,
         stop_loss=request.stop_loss,
         take_profit=request.take_profit,
-        trailing_stop=request.trailing_stop
+        trailing_stop=request.trailing_stop,
+        engine=request.engine
     )
     return {"task_id": task.id, "status": "Processing"}
 
@@ -102,7 +107,14 @@ def run_optimization(
         population_size=request.population_size,
         generations=request.generations,
         commission=request.commission,
-        slippage=request.slippage
+        slippage=request.slippage,
+        workers=request.workers,
+        chunk_size=request.chunk_size,
+        train_period=request.train_period,
+        test_period=request.test_period,
+        anchored=request.anchored,
+        n_trials=request.n_trials,
+        prune=request.prune
     )
     
     return {"task_id": task.id, "status": "Processing"}
@@ -140,6 +152,25 @@ def start_trade_download(request: schemas.DownloadRequest):
     )
     return {"task_id": task.id, "status": "Started"}
 
+@router.post("/download/batch")
+def start_batch_download(request: schemas.BatchDownloadRequest):
+    if not request.symbols or not request.timeframes:
+        raise HTTPException(status_code=400, detail="symbols and timeframes must not be empty")
+    if request.destination not in ("file", "db"):
+        raise HTTPException(status_code=400, detail="destination must be 'file' or 'db'")
+    # MarketData টেবিল (এবং সেখান থেকে পড়া ব্যাকটেস্ট) শুধু binance ক্যান্ডেলের
+    if request.destination == "db" and request.exchange != "binance":
+        raise HTTPException(status_code=400, detail="destination 'db' only supports the binance exchange")
+    task = download_batch_task.delay(
+        exchange_id=request.exchange,
+        symbols=request.symbols,
+        timeframes=request.timeframes,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        destination=request.destination
+    )
+    return {"task_id": task.id, "status": "Started", "jobs": len(set(request.symbols)) * len(set(request.timeframes))}
+
 @router.get("/download/status/{task_id}")
 def get_download_status(task_id: str):
     task_result = AsyncResult(task_id)
@@ -174,8 +205,8 @@ def list_trade_files():
     target_dir = DATA_FEED_DIR
     if not os.path.exists(target_dir):
         return []
-    files = [f for f in os.listdir(target_dir) if f.startswith("trades_") and f.endswith(".csv")]
-    return files
+    # CSV ও বাইনারি (.feed) দুই ধরনের ট্রেড ফাইলই, লজিক্যাল .csv নামে
+    return feed_store.list_feeds("trades_")
 
 @router.post("/convert-data")
 async def run_data_conversion(request: schemas.ConversionRequest):
@@ -187,42 +218,41 @@ async def run_data_conversion(request: schemas.ConversionRequest):
         file_to_convert = request.filename
         
         if file_to_convert == "all":
-             files = [f for f in os.listdir(target_dir) if f.startswith("trades_") and f.endswith(".csv")]
+             files = feed_store.list_feeds("trades_")
         else:
              file_path = os.path.join(target_dir, file_to_convert)
-             if not os.path.exists(file_path):
+             if not os.path.exists(file_path) and not feed_store.exists(file_to_convert):
                  raise HTTPException(status_code=404, detail=f"File '{file_to_convert}' not found.")
              files = [file_to_convert]
 
+        timeframes = request.timeframes or [request.timeframe]
+
+        # ✅ সব ফাইল বা একাধিক টাইমফ্রেম: Celery টাস্কে প্রসেস পুলে একসাথে কনভার্সন (ইভেন্ট লুপ ব্লক হয় না)
+        if file_to_convert == "all" or len(timeframes) > 1:
+            if not files:
+                return {"success": False, "converted": 0, "message": "No trade files found to convert."}
+            task = convert_trades_task.delay(filenames=files, timeframes=timeframes)
+            return {"success": True, "task_id": task.id, "status": "Processing", "message": "Conversion started"}
+
         converted_count = 0
-        tf_map = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min', '1h': '1h', '4h': '4h', '1d': '1D'}
-        pandas_tf = tf_map.get(request.timeframe, '1min') 
-        
+        failed = []
         for trade_file in files:
             file_path = os.path.join(target_dir, trade_file)
             try:
-                df = pd.read_csv(file_path, usecols=['datetime', 'price', 'amount'])
-                df['datetime'] = pd.to_datetime(df['datetime'])
-                df.set_index('datetime', inplace=True)
+                # ✅ চাঙ্কে চাঙ্কে স্ট্রিমিং কনভার্সন (মাল্টি-GB ট্রেড ফাইলেও মেমোরি স্থির থাকে)
+                await run_in_threadpool(
+                    stream_trades_to_candles, file_path,
+                    os.path.join(target_dir, output_filename(trade_file, request.timeframe)),
+                    to_pandas_timeframe(request.timeframe), fill_gaps=False
+                )
             except Exception as e:
                 print(f"Skipping {trade_file}: {e}")
+                failed.append({"file": trade_file, "error": str(e)})
                 continue
-
-            ohlc = df['price'].resample(pandas_tf).ohlc()
-            volume = df['amount'].resample(pandas_tf).sum()
-            volume.name = 'volume' 
-
-            candles = pd.concat([ohlc, volume], axis=1)
-            # Add saving logic if needed or return summary. 
-            # In main.py it was cut off in view, I'll assuming saving was intended or just printing?
-            # main.py code ended with: "candles = pd.concat([ohlc, volume], axis=1)"
-            # It should probably save it. I'll add a placeholder save or just increment count.
-            # Assuming it saves to new CSV.
-            output_filename = f"candles_{request.timeframe}_{trade_file}"
-            candles.to_csv(os.path.join(target_dir, output_filename))
             converted_count += 1
-            
-        return {"success": True, "converted": converted_count, "message": "Conversion completed"}
+
+        return {"success": not failed, "converted": converted_count, "failed": failed,
+                "message": "Conversion completed" if not failed else f"{len(failed)} file(s) failed"}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -7,6 +7,8 @@ from app.api import deps
 from app.db.session import SessionLocal 
 from app.tasks import run_live_bot_task
 from app import utils
+from app.core.config import settings
+from app.services.bot_supervisor import notify_bot_control
 
 router = APIRouter()
 
@@ -91,6 +93,7 @@ def delete_bot(
             
             # Redis key ডিলিট করলে Celery টাস্কের লুপ ভেঙে যাবে
             r.delete(task_key)
+            notify_bot_control(r, bot_id, "stop")
             print(f"Force stopped worker for bot {bot_id} before deletion.")
         except Exception as e:
             print(f"Error stopping worker for bot {bot_id}: {e}")
@@ -126,8 +129,13 @@ def control_bot(
         bot.status = "active"
         db.commit()
         
-        # ✅ Celery টাস্ক ব্যাকগ্রাউন্ডে স্টার্ট করা হচ্ছে
-        run_live_bot_task.delay(bot_id=bot.id)
+        if settings.BOT_SUPERVISOR_ENABLED:
+            # ✅ key সেট করলেই consistent hash অনুযায়ী একটি সুপারভাইজার প্রসেস বটটি চালাবে
+            r.set(task_key, "running")
+            notify_bot_control(r, bot.id, "start")
+        else:
+            # ✅ Celery টাস্ক ব্যাকগ্রাউন্ডে স্টার্ট করা হচ্ছে
+            run_live_bot_task.delay(bot_id=bot.id)
         
     elif action == "stop":
         bot.status = "inactive"
@@ -135,6 +143,7 @@ def control_bot(
         
         # ✅ Redis Key ডিলিট করে লুপ থামানো হচ্ছে
         r.delete(task_key)
+        notify_bot_control(r, bot_id, "stop")
         
     db.refresh(bot)
     return bot
@@ -10,6 +10,7 @@ from app import models
 from app.api import deps  
 from app.services.market_service import MarketService
 from app.services.websocket_manager import manager
+from app.services.feed_store import feed_store
 
 router = APIRouter()
 market_service = MarketService()
@@ -91,6 +92,9 @@ async def upload_market_data(file: UploadFile = File(...), current_user: models.
             shutil.copyfileobj(file.file, file_object)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not save data file: {str(e)}")
+
+    # একই নামের পুরোনো বাইনারি ফিড থাকলে সেটি বাদ, নইলে নতুন CSV এর বদলে সেটিই পড়া হবে
+    feed_store.remove(file.filename)
         
     return {
         "filename": file.filename,
@@ -32,6 +32,64 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/0"
     REDIS_URL: str = "redis://redis:6379/0" # Added for previous fix related request
+
+    # Optimizer (Process Pool)
+    OPTIMIZER_WORKERS: int = 1      # 1 = সিরিয়াল, 0 = সব CPU কোর
+    OPTIMIZER_CHUNK_SIZE: int = 0   # 0 = অটো
+    VECTORIZED_BACKTEST: bool = True  # বিল্ট-ইন স্ট্র্যাটেজির জন্য NumPy ফাস্ট-পাথ
+    BACKTEST_ENGINE: str = "backtrader"  # "event" = Backtrader ছাড়া হালকা ইভেন্ট লুপ (রিকোয়েস্টে engine দিয়ে বদলানো যায়)
+    OPTIMIZER_TPE_TRIALS: int = 100         # method="tpe" এ ডিফল্ট ট্রায়াল সংখ্যা
+    OPTIMIZER_PRUNE_PERCENTILE: float = 25.0  # চেকপয়েন্টে এই percentile এর নিচের রান মাঝপথে বাদ
+    WALK_FORWARD_TRAIN_PERIOD: str = "90D"  # walk-forward train উইন্ডো (pandas Timedelta, বা "500" = বার সংখ্যা)
+    WALK_FORWARD_TEST_PERIOD: str = "30D"   # প্রতিটি out-of-sample test উইন্ডো
+    WALK_FORWARD_WARMUP_BARS: int = 300     # test উইন্ডোর আগের এত বার ইন্ডিকেটর warm-up এ (মেট্রিকে গোনা হয় না)
+    INDICATOR_CACHE_SIZE: int = 128   # LRU তে সর্বোচ্চ কয়টি ইন্ডিকেটর অ্যারে থাকবে (0 = ক্যাশ বন্ধ)
+
+    # Backtest Result Cache (Redis)
+    BACKTEST_CACHE_ENABLED: bool = True
+    BACKTEST_CACHE_TTL: int = 86400          # সেকেন্ড
+    BACKTEST_CACHE_MAX_ENTRIES: int = 200    # এর বেশি হলে সবচেয়ে পুরোনো রেজাল্ট মুছে যাবে
+
+    # Parquet Candle Cache (get_candles_from_db এর সামনে read-through)
+    CANDLE_CACHE_ENABLED: bool = True
+    CANDLE_CACHE_DIR: str = "app/candle_cache"
+    CANDLE_COPY_LOADER: bool = True   # Postgres থেকে binary COPY দিয়ে বাল্ক লোড
+    MARKET_SYNC_CONCURRENCY: int = 4  # হিস্টোরিক্যাল ব্যাকফিলে একসাথে কয়টি উইন্ডো ফেচ হবে
+    CONTINUOUS_AGGREGATES_ENABLED: bool = True  # বড় টাইমফ্রেম 1m এর TimescaleDB continuous aggregate থেকে পড়া
+    CANDLE_WRITE_BATCH_ROWS: int = 50000  # writer প্রতি commit এ সর্বোচ্চ কত ক্যান্ডেল জুড়বে
+    CANDLE_WRITE_FLUSH_SECONDS: float = 2.0  # ব্যাচ পূর্ণ না হলেও এতক্ষণ পর লিখে ফেলবে
+    CANDLE_COPY_WRITER: bool = True   # COPY -> staging -> upsert (বন্ধ করলে সাধারণ INSERT)
+    TRADE_CONVERT_CHUNK_ROWS: int = 1_000_000  # ট্রেড -> ক্যান্ডেল কনভার্সনে প্রতি চাঙ্কে কত ট্রেড পড়া হবে
+    TRADE_CONVERT_WORKERS: int = 0  # একসাথে কয়টি ট্রেড ফাইল কনভার্ট হবে (0 = সব CPU কোর)
+    DATA_FEED_BINARY: bool = True  # data_feeds ডাউনলোড Arrow সেগমেন্টে (বন্ধ করলে আগের মতো CSV)
+    FEED_SEGMENT_ROWS: int = 100_000  # ডাউনলোডে প্রতি কত রো পর নতুন সেগমেন্ট লেখা হবে
+    FEED_MAX_SEGMENTS: int = 64  # এর বেশি সেগমেন্ট হলে ডাউনলোড শেষে একটিতে কম্প্যাক্ট
+    DOWNLOAD_CONCURRENCY: int = 4  # ডাউনলোড টাস্কে একসাথে কয়টি উইন্ডো ফেচ হবে
+    DOWNLOAD_RATE_LIMIT_FACTOR: float = 1.0  # exchange.rateLimit এর কত অংশ ব্যবহার করা হবে (token bucket)
+    DOWNLOAD_MAX_RETRIES: int = 6  # নেটওয়ার্ক/রেট লিমিট এররে কতবার আবার চেষ্টা
+    DOWNLOAD_BACKOFF_BASE: float = 1.0  # exponential backoff এর শুরু (সেকেন্ড)
+    DOWNLOAD_BACKOFF_MAX: float = 30.0  # backoff এর সর্বোচ্চ (সেকেন্ড)
+    DOWNLOAD_TRADE_WINDOW_MINUTES: int = 60  # ট্রেড ডাউনলোডে প্রতিটি উইন্ডোর দৈর্ঘ্য
+    DOWNLOAD_BATCH_SYMBOLS: int = 8  # ব্যাচ ডাউনলোডে একসাথে কয়টি symbol/timeframe জব চলবে
+    DOWNLOAD_BATCH_PROGRESS_INTERVAL: float = 1.0  # ব্যাচ প্রোগ্রেস WebSocket এ পাঠানোর ন্যূনতম বিরতি (সেকেন্ড)
+    LIVE_STREAMING_ENABLED: bool = True  # লাইভ বট REST poll এর বদলে WebSocket kline স্ট্রিম ব্যবহার করবে
+    LIVE_CANDLE_HISTORY: int = 100  # স্ট্রিমিং বটের বাফারে কয়টি closed ক্যান্ডেল থাকবে
+    LIVE_RECONCILE_SECONDS: float = 60.0  # কত সেকেন্ড পরপর REST দিয়ে বাফার মিলিয়ে নেওয়া হবে
+    LIVE_STREAM_RECONNECT_MAX: float = 30.0  # স্ট্রিম রিকানেক্ট backoff এর সর্বোচ্চ (সেকেন্ড)
+    LIVE_STOP_POLL_SECONDS: float = 1.0  # স্ট্রিমিং বটে স্টপ সিগনাল কত ঘন ঘন চেক হবে
+    MARKET_HUB_CLUSTER: bool = True  # Redis দিয়ে ওয়ার্কারদের মধ্যে একই ফিড শেয়ার (একটি প্রসেসই exchange স্ট্রিম খোলে)
+    MARKET_HUB_LOCK_TTL: int = 15  # ফিড owner lock এর মেয়াদ (সেকেন্ড), owner মারা গেলে এর পর অন্য কেউ নেয়
+    MARKET_HUB_QUEUE_SIZE: int = 1000  # প্রতি বটের ইভেন্ট কিউ (ভরে গেলে পুরোনো টিক বাদ)
+    BOT_SUPERVISOR_ENABLED: bool = True  # লাইভ বট Celery টাস্কের বদলে সুপারভাইজার প্রসেসে (run_bot_supervisor.py)
+    BOT_SUPERVISOR_PROCESSES: int = 2  # কয়টি সুপারভাইজার প্রসেস (প্রতিটিতে একটি event loop, অনেক বট)
+    BOT_SUPERVISOR_VNODES: int = 64  # consistent hash ring এ প্রতি প্রসেসের virtual node
+    BOT_SUPERVISOR_SYNC_SECONDS: float = 5.0  # কত পরপর bot_task key / মেম্বারশিপ মিলিয়ে rebalance
+    BOT_SUPERVISOR_NODE_TTL: float = 20.0  # এতক্ষণ হার্টবিট না দিলে প্রসেসটিকে মৃত ধরে ring থেকে বাদ
+    BOT_SUPERVISOR_LEASE_TTL: int = 30  # বট lease এর মেয়াদ (হ্যান্ডঅফে ডাবল রান ঠেকাতে)
+    LIVE_STRATEGY_CASH: float = 10000.0  # লাইভ স্ট্র্যাটেজির সিমুলেটেড ব্রোকারের ক্যাশ (শুধু সাইজ অনুপাতের জন্য)
+    LIVE_STRATEGY_EXACTBARS: int = 1  # Cerebro exactbars (1 = ইন্ডিকেটরের দরকারি বাফারটুকুই রাখে; 0 = সব বার চিরকাল মেমরিতে)
+    LIVE_STRATEGY_HISTORY_BARS: int = 500  # exactbars এ ডাটা ফিডে অন্তত এত বার থাকে (স্ট্র্যাটেজি সরাসরি হিস্টোরি পড়লে)
+    LIVE_STRATEGY_BAR_TIMEOUT: float = 30.0  # একটি বার প্রসেসে Cerebro থ্রেড এর বেশি সেকেন্ড নিলে রানার বাতিল
     
     # Encryption
     ENCRYPTION_KEY: str = "Jq-w5yXp3zQ4R1t2E8y9U0i7O6p5L4k3J2h1G0f9D8s="
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 # --- User Schemas ---
@@ -77,6 +77,7 @@ class BacktestRequest(BaseModel):
     stop_loss: Optional[float] = 0.0      # % ভিত্তিক (যেমন 2.0 মানে 2%)
     take_profit: Optional[float] = 0.0    # % ভিত্তিক (যেমন 5.0 মানে 5%)
     trailing_stop: Optional[float] = 0.0  # % ভিত্তিক
+    engine: Optional[str] = None          # "backtrader" | "event" (None = সার্ভার ডিফল্ট)
 
 class BatchBacktestRequest(BaseModel):
     symbol: str
@@ -105,12 +106,22 @@ class OptimizationRequest(BaseModel):
     end_date: Optional[str] = None
     # প্যারামিটারের নাম ডাইনামিক হবে, তাই Dict ব্যবহার করা হয়েছে
     params: Dict[str, OptimizationParam]
-    method: str = "grid" # "grid" or "genetic"
+    method: str = "grid" # "grid", "genetic", "tpe" or "walk_forward"
     population_size: int = 50
     generations: int = 10
     # নতুন ফিল্ডস
     commission: float = 0.001
     slippage: float = 0.0
+    # Parallel Grid (None = সার্ভার ডিফল্ট, 0 = সব CPU কোর)
+    workers: Optional[int] = None
+    chunk_size: Optional[int] = None
+    # Walk-Forward (method="walk_forward"): "90D"/"12h" = সময়, "500" = বার সংখ্যা; None = সার্ভার ডিফল্ট
+    train_period: Optional[str] = None
+    test_period: Optional[str] = None
+    anchored: bool = False
+    # TPE (method="tpe"): None = সার্ভার ডিফল্ট ট্রায়াল; prune = খারাপ রান মাঝপথে থামানো
+    n_trials: Optional[int] = None
+    prune: bool = True
 
 # Download Data Schema
 class DownloadRequest(BaseModel):
@@ -120,10 +131,20 @@ class DownloadRequest(BaseModel):
     end_date: Optional[str] = None
     timeframe: Optional[str] = "1h"
 
+# একাধিক symbol x timeframe এক টাস্কে (শেয়ার্ড exchange ক্লায়েন্ট ও রেট লিমিট)
+class BatchDownloadRequest(BaseModel):
+    exchange: str
+    symbols: List[str]
+    timeframes: List[str] = ["1h"]
+    start_date: str
+    end_date: Optional[str] = None
+    destination: str = "file"  # 'file' (data_feeds) অথবা 'db' (MarketData টেবিল)
+
 # Data Conversion Schema
 class ConversionRequest(BaseModel):
     filename: str
     timeframe: str = "1min" # Default value
+    timeframes: Optional[List[str]] = None  # একসাথে একাধিক টাইমফ্রেম (দিলে timeframe এর বদলে)
 
 # --- Bot Schemas (NEW) ---
 from .bot import Bot, BotCreate, BotUpdate
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import zlib
+import hashlib
+import inspect
+from app.core.config import settings
+from app import utils
+from app.services.derived_timeframes import BASE_TIMEFRAME, is_derived
+from app.services.feed_store import feed_store
+
+# -----------------------------------------------------------
+# Content-Addressed Backtest Result Cache (Redis)
+# -----------------------------------------------------------
+# কী = hash(রিকোয়েস্ট প্যারামিটার + স্ট্র্যাটেজি সোর্স hash + ডাটা watermark)
+# নতুন ক্যান্ডেল আসলে watermark বদলায়, স্ট্র্যাটেজি ফাইল বদলালে সোর্স hash বদলায়,
+# তাই পুরোনো এন্ট্রি আর কখনো মিলবে না (TTL/সাইজ লিমিটে নিজে থেকেই মুছে যাবে)।
+
+KEY_PREFIX = "backtest_cache:"
+INDEX_KEY = "backtest_cache:index"  # sorted set: key -> সেভ করার সময় (সাইজ-ভিত্তিক eviction এর জন্য)
+
+# রেজাল্ট ফাইনালি যে টাইমফ্রেমের ডাটা থেকে আসতে পারে (BacktestEngine.run এর fallback রিস্যাম্পলিং)
+RESAMPLE_FALLBACK = {'45m': '15m', '2h': '1h'}
+
+
+def _json_default(obj):
+    # numpy স্কেলার (np.int64 ইত্যাদি) আসল টাইপেই ফেরত আসুক, স্ট্রিং হয়ে নয়
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+def strategy_source_hash(strategy_class):
+    """স্ট্র্যাটেজি ক্লাস ও এর প্রজেক্ট-লোকাল বেস ক্লাসগুলোর সোর্স ফাইলের hash।"""
+    digest = hashlib.sha256()
+    for klass in inspect.getmro(strategy_class):
+        if klass.__module__.startswith('backtrader') or klass is object:
+            continue
+        try:
+            path = inspect.getsourcefile(klass)
+        except TypeError:
+            path = None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        else:
+            digest.update(klass.__qualname__.encode())
+    return digest.hexdigest()
+
+
+def data_watermark(db, market_service, symbol, timeframe, start_date=None, end_date=None, custom_data_file=None):
+    if custom_data_file:
+        if feed_store.exists(custom_data_file):
+            return {"file": custom_data_file, "segments": feed_store.watermark(custom_data_file)}
+        stat = os.stat(f"app/data_feeds/{custom_data_file}")
+        return {"file": custom_data_file, "mtime": stat.st_mtime_ns, "size": stat.st_size}
+
+    timeframes = [timeframe] + ([RESAMPLE_FALLBACK[timeframe]] if timeframe in RESAMPLE_FALLBACK else [])
+    if is_derived(timeframe):
+        # continuous aggregate থেকে পড়া টাইমফ্রেম 1m সিরিজ বদলালে বদলে যায়
+        timeframes.append(BASE_TIMEFRAME)
+    return {tf: market_service.get_candle_watermark(db, symbol, tf, start_date, end_date) for tf in timeframes}
+
+
+def build_key(request: dict, source_hash: str, watermark: dict):
+    payload = json.dumps(
+        {"request": request, "strategy": source_hash, "data": watermark},
+        sort_keys=True, default=_json_default
+    )
+    return KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
+
+
+def request_key(db, engine, market_service, request: dict):
+    """run_backtest_task এর আর্গুমেন্ট থেকে ক্যাশ কী। স্ট্র্যাটেজি লোড না হলে None।"""
+    strategy_class = engine._load_strategy_class(request["strategy_name"])
+    if not strategy_class:
+        return None
+    watermark = data_watermark(
+        db, market_service, request["symbol"], request["timeframe"],
+        request.get("start_date"), request.get("end_date"), request.get("custom_data_file")
+    )
+    return build_key(request, strategy_source_hash(strategy_class), watermark)
+
+
+class BacktestResultCache:
+    def __init__(self, redis_client=None, ttl=None, max_entries=None):
+        self._redis = redis_client
+        self.ttl = settings.BACKTEST_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.BACKTEST_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = utils.get_redis_client()
+        return self._redis
+
+    def get(self, key):
+        blob = self.redis.get(key)
+        if blob is None:
+            # TTL এ মুছে যাওয়া এন্ট্রি ইনডেক্স থেকেও সরানো
+            self.redis.zrem(INDEX_KEY, key)
+            return None
+        return json.loads(zlib.decompress(blob))
+
+    def set(self, key, result):
+        blob = zlib.compress(json.dumps(result, default=_json_default).encode())
+        pipe = self.redis.pipeline()
+        pipe.set(key, blob, ex=self.ttl)
+        pipe.zadd(INDEX_KEY, {key: time.time()})
+        pipe.execute()
+        self._evict()
+
+    def _evict(self):
+        # সবচেয়ে পুরোনো এন্ট্রি মুছে max_entries এর মধ্যে রাখা
+        overflow = self.redis.zcard(INDEX_KEY) - self.max_entries
+        if overflow > 0:
+            stale = self.redis.zrange(INDEX_KEY, 0, overflow - 1)
+            if stale:
+                pipe = self.redis.pipeline()
+                pipe.delete(*stale)
+                pipe.zrem(INDEX_KEY, *stale)
+                pipe.execute()
+
+    def clear(self):
+        keys = self.redis.zrange(INDEX_KEY, 0, -1)
+        if keys:
+            self.redis.delete(*keys)
+        self.redis.delete(INDEX_KEY)
+
+
+result_cache = BacktestResultCache()
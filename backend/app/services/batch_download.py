@@ -0,0 +1,154 @@
+import asyncio
+import time
+import ccxt.async_support as ccxt
+from app.core.config import settings
+from app.services.exchange_pool import exchange_pool, split_windows
+
+# -----------------------------------------------------------
+# Multi-Symbol Batch Download
+# -----------------------------------------------------------
+# একটি টাস্কে অনেক symbol x timeframe: একটাই শেয়ার্ড async ক্লায়েন্ট, একবার load_markets, আর exchange এর
+# token bucket সব জবের মধ্যে ভাগ হয়। একসাথে DOWNLOAD_BATCH_SYMBOLS টি জব চলে, আর সব জব মিলিয়ে
+# DOWNLOAD_CONCURRENCY টির বেশি উইন্ডো in-flight থাকে না। প্রতিটি জব নিজের উইন্ডো ক্রমানুসারে লেখে
+# (তাই resume নিরাপদ থাকে)।
+
+PAGE_LIMIT = 1000
+
+
+class BatchJob:
+    def __init__(self, symbol, timeframe, since, end_ts, filename=None):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.filename = filename
+        self.since = since
+        self.end_ts = end_ts
+        self.status = "pending"
+        self.candles = 0
+        self.covered = 0
+        self.error = None
+
+    @property
+    def total(self):
+        return max(0, self.end_ts - self.since)
+
+    @property
+    def percent(self):
+        if self.status == "completed":
+            return 100
+        return min(100, int(self.covered * 100 / self.total)) if self.total else 0
+
+    def to_dict(self):
+        return {
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "filename": self.filename,
+            "status": self.status,
+            "percent": self.percent,
+            "candles": self.candles,
+            "error": self.error,
+        }
+
+
+class BatchStats:
+    """সব জব মিলিয়ে throughput (candles/sec) আর প্রতিটি symbol এর স্ট্যাটাস।"""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.started = time.monotonic()
+
+    @property
+    def candles(self):
+        return sum(job.candles for job in self.jobs)
+
+    @property
+    def percent(self):
+        total = sum(job.total for job in self.jobs)
+        if not total:
+            return 100 if all(job.status != "pending" for job in self.jobs) else 0
+        # শেষ (completed/failed) জবগুলো পুরো অংশ হিসেবে ধরা, নাহলে ব্যর্থ symbol থাকলে ১০০% এ পৌঁছায় না
+        done = sum(job.total if job.status in ("completed", "failed") else min(job.covered, job.total) for job in self.jobs)
+        return min(100, int(done * 100 / total))
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        counts = {}
+        for job in self.jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "candles": self.candles,
+            "elapsed": round(elapsed, 2),
+            "candles_per_sec": round(self.candles / elapsed, 1),
+            "counts": counts,
+            "symbols": [job.to_dict() for job in self.jobs],
+        }
+
+
+async def _run_job(exchange_id, job, open_sink, window_slots, on_progress, should_abort):
+    tf_ms = ccxt.Exchange.parse_timeframe(job.timeframe) * 1000
+    windows = split_windows(job.since, job.end_ts, PAGE_LIMIT * tf_ms)
+    batch_size = max(1, settings.DOWNLOAD_CONCURRENCY)
+
+    async def fetch(start, stop):
+        async with window_slots:
+            return await exchange_pool.fetch_ohlcv_window(exchange_id, job.symbol, job.timeframe, start, stop, PAGE_LIMIT)
+
+    job.status = "running"
+    try:
+        # সিঙ্ক রাইট (ফাইল/DB) থ্রেডে, যাতে পুলের event loop অন্য জবের রিকোয়েস্ট চালিয়ে যেতে পারে
+        sink = await asyncio.to_thread(open_sink, job)
+        try:
+            for i in range(0, len(windows), batch_size):
+                if await asyncio.to_thread(should_abort):
+                    job.status = "revoked"
+                    return
+                batch = windows[i:i + batch_size]
+                for rows in await asyncio.gather(*(fetch(start, stop) for start, stop in batch)):
+                    if rows:
+                        await asyncio.to_thread(sink.append, [c[:6] for c in rows])
+                        job.candles += len(rows)
+                job.covered = batch[-1][1] - job.since
+                await asyncio.to_thread(on_progress)
+        finally:
+            await asyncio.to_thread(sink.close)
+        job.status = "completed"
+    except Exception as e:
+        # একটি symbol ব্যর্থ হলেও বাকি জব চলতে থাকে
+        job.status = "failed"
+        job.error = str(e)
+        print(f"❌ Batch download failed for {job.symbol} ({job.timeframe}): {e}")
+    await asyncio.to_thread(on_progress)
+
+
+async def _run_batch(exchange_id, jobs, open_sink, on_progress, should_abort):
+    await exchange_pool.load_markets(exchange_id)
+    markets = exchange_pool.client(exchange_id).markets or {}
+    for job in jobs:
+        if markets and job.symbol not in markets:
+            job.status, job.error = "failed", f"Symbol {job.symbol} not found on {exchange_id}"
+        elif job.total <= 0:
+            job.status = "completed"
+
+    window_slots = asyncio.Semaphore(max(1, settings.DOWNLOAD_CONCURRENCY))
+    job_slots = asyncio.Semaphore(max(1, settings.DOWNLOAD_BATCH_SYMBOLS))
+
+    async def run(job):
+        async with job_slots:
+            if job.status == "pending":
+                await _run_job(exchange_id, job, open_sink, window_slots, on_progress, should_abort)
+
+    await asyncio.gather(*(run(job) for job in jobs))
+
+
+def run_batch_download(exchange_id, jobs, open_sink, on_progress=None, should_abort=None):
+    """
+    jobs (BatchJob) গুলো শেয়ার্ড exchange ক্লায়েন্ট দিয়ে ডাউনলোড করে BatchStats রিটার্ন করে।
+    open_sink(job) একটি অবজেক্ট দেয় যার append(rows) ও close() আছে (ফিড রাইটার বা DB)।
+    on_progress(stats) / should_abort() সিঙ্ক কলব্যাক, থ্রেডপুল থেকে কল হয়।
+    """
+    stats = BatchStats(jobs)
+    exchange_pool.run(_run_batch(
+        exchange_id, jobs, open_sink,
+        (lambda: on_progress(stats)) if on_progress else (lambda: None),
+        should_abort or (lambda: False),
+    ))
+    return stats
@@ -0,0 +1,238 @@
+import asyncio
+import bisect
+import hashlib
+import os
+import socket
+import time
+import uuid
+from app.core.config import settings
+
+# -----------------------------------------------------------
+# Bot Supervisor (Many Live Bots per Process)
+# -----------------------------------------------------------
+# প্রতিটি সুপারভাইজার প্রসেস একটি event loop এ শত শত LiveBotEngine কোরুটিন চালায় (Celery স্লট প্রতি একটি বট নয়)।
+# চালু থাকা বট = Redis এ bot_task:{id} key। কোন বট কোন প্রসেসে চলবে তা bot_id এর consistent hash দিয়ে
+# ঠিক হয়, তাই প্রসেস যোগ/বন্ধ হলে শুধু সেই অংশের বটগুলো সরে। হ্যান্ডঅফে একই বট দুই জায়গায় যেন না চলে,
+# সেজন্য bot_lease:{id} lease যে পায় সে-ই চালায়।
+
+MEMBERS_KEY = "bot_supervisors"
+CONTROL_CHANNEL = "bot_control"
+
+# lease এখনো নিজের হলে তবেই মেয়াদ বাড়ানো (compare-and-expire); নাহলে 0
+RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def stable_hash(value):
+    # Python এর hash() প্রসেস ভেদে আলাদা, তাই md5
+    return int(hashlib.md5(str(value).encode()).hexdigest()[:16], 16)
+
+
+class HashRing:
+    def __init__(self, nodes, replicas=None):
+        self.replicas = replicas or settings.BOT_SUPERVISOR_VNODES
+        self._ring = sorted(
+            (stable_hash(f"{node}#{i}"), node) for node in nodes for i in range(self.replicas)
+        )
+        self._hashes = [h for h, _ in self._ring]
+
+    def node_for(self, key):
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._hashes, stable_hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+def parse_bot_id(key):
+    try:
+        return int(key.rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def default_engine_factory(bot_id):
+    """DB থেকে বট লোড করে LiveBotEngine (সেশন সাথে সাথে বন্ধ, শত বটের জন্য শত কানেকশন নয়)।"""
+    from app.db.session import SessionLocal
+    from app.models import Bot
+    from app.services.live_engine import LiveBotEngine
+
+    db = SessionLocal()
+    try:
+        bot = db.query(Bot).filter(Bot.id == bot_id).first()
+        if not bot:
+            return None
+        db.expunge(bot)
+    finally:
+        db.close()
+    engine = LiveBotEngine(bot, None)
+    # স্টপ সিগনাল সুপারভাইজার নিজেই দেখে, বট প্রতি আলাদা Redis polling লাগে না
+    engine.watch_stop = False
+    return engine
+
+
+class BotSupervisor:
+    def __init__(self, node_id=None, redis=None, engine_factory=None):
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.redis = redis
+        self.engine_factory = engine_factory or default_engine_factory
+        self.running = {}
+        self._wake = None
+        self._stopping = False
+
+    async def _get_redis(self):
+        if self.redis is None:
+            import redis.asyncio as aioredis
+            self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self.redis
+
+    async def live_nodes(self):
+        redis = await self._get_redis()
+        now = time.time()
+        members = await redis.hgetall(MEMBERS_KEY)
+        nodes = []
+        for node, seen in members.items():
+            if now - float(seen) <= settings.BOT_SUPERVISOR_NODE_TTL:
+                nodes.append(node)
+            else:
+                await redis.hdel(MEMBERS_KEY, node)
+        return sorted(set(nodes) | {self.node_id})
+
+    async def desired_bots(self):
+        redis = await self._get_redis()
+        bots = set()
+        async for key in redis.scan_iter(match="bot_task:*", count=500):
+            bot_id = parse_bot_id(key)
+            if bot_id is not None:
+                bots.add(bot_id)
+        return bots
+
+    async def sync(self):
+        """মেম্বারশিপ হার্টবিট, ring অনুযায়ী নিজের বটগুলো চালু/বন্ধ, lease রিনিউ।"""
+        redis = await self._get_redis()
+        await redis.hset(MEMBERS_KEY, self.node_id, time.time())
+        ring = HashRing(await self.live_nodes())
+        owned = {bot_id for bot_id in await self.desired_bots() if ring.node_for(bot_id) == self.node_id}
+
+        # ইউজার স্টপ করেছে বা rebalance এ অন্য প্রসেসের ভাগে গেছে
+        handed_off = False
+        for bot_id in list(self.running):
+            if bot_id not in owned:
+                await self.stop_bot(bot_id)
+                handed_off = True
+        if handed_off:
+            # নতুন owner যেন পরের নির্ধারিত sync এর অপেক্ষা না করে lease নেয়
+            await redis.publish(CONTROL_CHANNEL, "rebalance")
+
+        for bot_id in sorted(owned):
+            if bot_id in self.running:
+                # stall এর সময় lease expire হয়ে অন্য নোড নিয়ে থাকলে তার lease ওভাররাইট না করে নিজের বট থামানো
+                if not await redis.eval(RENEW_LEASE_SCRIPT, 1, f"bot_lease:{bot_id}", self.node_id, settings.BOT_SUPERVISOR_LEASE_TTL):
+                    print(f"⚠️ Lease for bot {bot_id} lost, stopping local copy")
+                    await self.stop_bot(bot_id)
+            elif await redis.set(f"bot_lease:{bot_id}", self.node_id, nx=True, ex=settings.BOT_SUPERVISOR_LEASE_TTL):
+                self.start_bot(bot_id)
+            elif await redis.get(f"bot_lease:{bot_id}") == self.node_id:
+                # আগের রান থেকে নিজের lease রয়ে গেছে
+                self.start_bot(bot_id)
+        return owned
+
+    def start_bot(self, bot_id):
+        self.running[bot_id] = asyncio.create_task(self._run_bot(bot_id))
+
+    async def _run_bot(self, bot_id):
+        try:
+            engine = await asyncio.to_thread(self.engine_factory, bot_id)
+            if engine is None:
+                print(f"❌ Bot {bot_id} not found in DB")
+                redis = await self._get_redis()
+                await redis.delete(f"bot_task:{bot_id}")
+                return
+            await engine.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # key থাকলে পরের sync এ আবার চালু হবে
+            print(f"❌ Critical Bot Error ({bot_id}): {e}")
+            await asyncio.sleep(settings.BOT_SUPERVISOR_SYNC_SECONDS)
+        finally:
+            if self.running.get(bot_id) is asyncio.current_task():
+                del self.running[bot_id]
+                await self._release_lease(bot_id)
+
+    async def stop_bot(self, bot_id):
+        task = self.running.pop(bot_id, None)
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        await self._release_lease(bot_id)
+
+    async def _release_lease(self, bot_id):
+        try:
+            redis = await self._get_redis()
+            if await redis.get(f"bot_lease:{bot_id}") == self.node_id:
+                await redis.delete(f"bot_lease:{bot_id}")
+        except Exception:
+            pass
+
+    async def _listen_control(self):
+        # স্টার্ট/স্টপ/নতুন প্রসেস এলে পরের নির্ধারিত sync এর অপেক্ষা না করে সাথে সাথে sync
+        redis = await self._get_redis()
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(CONTROL_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._wake.set()
+        finally:
+            await pubsub.close()
+
+    async def run(self):
+        self._wake = asyncio.Event()
+        redis = await self._get_redis()
+        listener = asyncio.create_task(self._listen_control())
+        print(f"🚀 Bot supervisor {self.node_id} started")
+        try:
+            await redis.hset(MEMBERS_KEY, self.node_id, time.time())
+            await redis.publish(CONTROL_CHANNEL, "rebalance")
+            while not self._stopping:
+                try:
+                    await self.sync()
+                except Exception as e:
+                    print(f"⚠️ Supervisor sync error: {e}")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), settings.BOT_SUPERVISOR_SYNC_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            listener.cancel()
+            await self.shutdown()
+
+    async def shutdown(self):
+        """সব বট থামিয়ে lease ছেড়ে দেওয়া আর মেম্বারশিপ থেকে সরে যাওয়া, যাতে অন্যরা সাথে সাথে নিতে পারে।"""
+        self._stopping = True
+        for bot_id in list(self.running):
+            await self.stop_bot(bot_id)
+        try:
+            redis = await self._get_redis()
+            await redis.hdel(MEMBERS_KEY, self.node_id)
+            await redis.publish(CONTROL_CHANNEL, "rebalance")
+        except Exception:
+            pass
+        print(f"🛑 Bot supervisor {self.node_id} stopped")
+
+
+def notify_bot_control(redis_client, bot_id, action):
+    """API থেকে (সিঙ্ক Redis) সুপারভাইজারদের জানানো যাতে সাথে সাথে rebalance হয়।"""
+    try:
+        redis_client.publish(CONTROL_CHANNEL, f"{action}:{bot_id}")
+    except Exception as e:
+        print(f"⚠️ Redis Publish Error: {e}")
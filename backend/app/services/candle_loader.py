@@ -0,0 +1,147 @@
+import struct
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from app import models
+
+# -----------------------------------------------------------
+# Bulk COPY Candle Loader (PostgreSQL binary COPY -> NumPy)
+# -----------------------------------------------------------
+# ORM এর মতো প্রতি ক্যান্ডেলে Row অবজেক্ট তৈরি না করে `COPY (SELECT ...) TO STDOUT (FORMAT binary)`
+# স্ট্রিম সরাসরি আগে থেকে বরাদ্দ করা NumPy কলাম অ্যারেতে পার্স করা হয়।
+#
+# বাইনারি রো লেআউট (সব ফিল্ড fixed-width, NULL গুলো SQL এ NaN করে দেওয়া হয়):
+#   int16 field_count | (int32 len=8 | int64 timestamp µs since 2000-01-01) | 5 x (int32 len=8 | float8)
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+PG_EPOCH_US = int((datetime(2000, 1, 1) - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+
+ROW_DTYPE = np.dtype(
+    [('fields', '>i2'), ('ts_len', '>i4'), ('ts', '>i8')]
+    + [item for c in OHLCV_COLUMNS for item in ((f'{c}_len', '>i4'), (c, '>f8'))]
+)
+ROW_SIZE = ROW_DTYPE.itemsize  # 74 বাইট
+FIELD_COUNT = 1 + len(OHLCV_COLUMNS)
+
+
+class BinaryCopySink:
+    """
+    cursor.copy_expert এর file-like টার্গেট। libpq প্রতি write() এ সাধারণত একটি রো দেয়, তাই বাইটগুলো
+    bytearray তে জমিয়ে ~৪MB হলেই সম্পূর্ণ রো গুলো একসাথে কলাম অ্যারেতে পার্স করা হয়
+    (পুরো স্ট্রিম কখনো একসাথে মেমোরিতে জমে না)।
+    """
+
+    DRAIN_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, expected_rows=0):
+        capacity = max(int(expected_rows), 1024)
+        self.timestamps = np.empty(capacity, dtype='int64')
+        self.columns = {c: np.empty(capacity, dtype='float64') for c in OHLCV_COLUMNS}
+        self.rows = 0
+        self._buffer = bytearray()
+        self._header_done = False
+        self._finished = False
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.DRAIN_BYTES:
+            self._drain()
+        return len(data)
+
+    def _reserve(self, count):
+        needed = self.rows + count
+        if needed <= len(self.timestamps):
+            return
+        # COUNT এর পরে নতুন ক্যান্ডেল ঢুকলে অ্যারে বড় করা হয়
+        capacity = max(needed, len(self.timestamps) * 2)
+        self.timestamps = np.resize(self.timestamps, capacity)
+        for c in OHLCV_COLUMNS:
+            self.columns[c] = np.resize(self.columns[c], capacity)
+
+    def _drain(self):
+        buf = self._buffer
+        offset = 0
+
+        if not self._header_done:
+            # হেডার: signature(11) + flags(4) + extension length(4) + extension
+            if len(buf) < 19:
+                return
+            if bytes(buf[:11]) != COPY_SIGNATURE:
+                raise ValueError("Invalid PGCOPY signature")
+            ext_len = struct.unpack('>i', buf[15:19])[0]
+            if len(buf) < 19 + ext_len:
+                return
+            offset = 19 + ext_len
+            self._header_done = True
+
+        count = (len(buf) - offset) // ROW_SIZE
+        if count and not self._finished:
+            rows = np.frombuffer(buf, dtype=ROW_DTYPE, count=count, offset=offset)
+            # শেষ রো টি ট্রেইলার (field_count = -1) হতে পারে
+            trailer = np.flatnonzero(rows['fields'] == -1)
+            if len(trailer):
+                count = int(trailer[0])
+                rows = rows[:count]
+                self._finished = True
+            if np.any(rows['fields'] != FIELD_COUNT) or np.any(rows['ts_len'] != 8):
+                raise ValueError("Unexpected row layout in binary COPY stream")
+
+            self._reserve(count)
+            end = self.rows + count
+            self.timestamps[self.rows:end] = rows['ts']
+            for c in OHLCV_COLUMNS:
+                self.columns[c][self.rows:end] = rows[c]
+            self.rows = end
+            del rows
+
+        # পার্স হওয়া অংশ ফেলে দিয়ে অসম্পূর্ণ শেষ রো পরের চাঙ্কের জন্য রাখা
+        self._buffer = bytearray() if self._finished else buf[offset + count * ROW_SIZE:]
+
+    def to_frame(self):
+        self._drain()
+        index = pd.DatetimeIndex(
+            (self.timestamps[:self.rows] + PG_EPOCH_US).astype('datetime64[us]').astype('datetime64[ns]'),
+            name='datetime'
+        )
+        return pd.DataFrame({c: self.columns[c][:self.rows] for c in OHLCV_COLUMNS}, index=index)
+
+
+def copy_candles(db, symbol, timeframe, start_dt=None, end_dt=None, table=None, exchange=None):
+    """
+    PostgreSQL থেকে binary COPY দিয়ে ক্যান্ডেল DataFrame (index='datetime') লোড করা।
+    table দিলে (যেমন continuous aggregate ভিউ) timeframe ফিল্টার ছাড়া সেই টেবিল থেকে পড়া হয়।
+    """
+    where = ["symbol = %s"]
+    params = [symbol]
+    if table is None:
+        table = models.MarketData.__tablename__
+        where.append("timeframe = %s")
+        params.append(timeframe)
+    if exchange:
+        where.append("exchange = %s")
+        params.append(exchange)
+    if start_dt:
+        where.append("timestamp >= %s")
+        params.append(start_dt)
+    if end_dt:
+        where.append("timestamp <= %s")
+        params.append(end_dt)
+    where_sql = " AND ".join(where)
+
+    raw_conn = db.connection().connection
+    cursor = raw_conn.cursor()
+    try:
+        cursor.execute(f"SELECT count(*) FROM {table} WHERE {where_sql}", params)
+        expected_rows = cursor.fetchone()[0]
+
+        columns_sql = ", ".join(f"COALESCE({c}, 'NaN')::float8" for c in OHLCV_COLUMNS)
+        select_sql = cursor.mogrify(
+            f"SELECT timestamp, {columns_sql} FROM {table} WHERE {where_sql} ORDER BY timestamp ASC", params
+        ).decode()
+
+        sink = BinaryCopySink(expected_rows)
+        cursor.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH (FORMAT binary)", sink)
+    finally:
+        cursor.close()
+    return sink.to_frame()
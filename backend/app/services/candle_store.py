@@ -0,0 +1,162 @@
+import os
+import shutil
+import uuid
+from datetime import datetime
+import pandas as pd
+from app.core.config import settings
+from app.services.derived_timeframes import BASE_TIMEFRAME, DERIVED_TIMEFRAMES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow না থাকলে ক্যাশ বন্ধ, সরাসরি Postgres থেকে পড়া হবে
+    pa = None
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def month_start(dt):
+    return datetime(dt.year, dt.month, 1)
+
+
+def next_month(dt):
+    return datetime(dt.year + (dt.month // 12), dt.month % 12 + 1, 1)
+
+
+def iter_months(start, end):
+    current = month_start(start)
+    while current <= end:
+        yield current
+        current = next_month(current)
+
+
+def empty_candles():
+    df = pd.DataFrame({c: pd.Series(dtype='float64') for c in OHLCV_COLUMNS})
+    df.index = pd.DatetimeIndex([], name='datetime', dtype='datetime64[ns]')
+    return df
+
+
+class ParquetCandleStore:
+    """
+    Postgres এর সামনে read-through ক্যাশ: exchange/symbol/timeframe/মাস অনুযায়ী Parquet পার্টিশন।
+    লেআউট: {root}/{exchange}/{SYMBOL}/{timeframe}/{YYYY-MM}.parquet
+
+    - শুধু সম্পূর্ণ শেষ হওয়া মাস ক্যাশ হয়; চলতি মাস সবসময় Postgres থেকে আসে
+    - নতুন ক্যান্ডেল সেভ বা রিটেনশন ক্লিনআপ হলে সংশ্লিষ্ট মাসের পার্টিশন মুছে ফেলা হয়
+    """
+
+    def __init__(self, root=None, exchange='binance'):
+        self.root = root or settings.CANDLE_CACHE_DIR
+        self.exchange = exchange
+
+    @property
+    def enabled(self):
+        return pa is not None and settings.CANDLE_CACHE_ENABLED
+
+    def _series_dir(self, symbol, timeframe):
+        return os.path.join(self.root, self.exchange, symbol.replace('/', ''), timeframe)
+
+    def _partition_path(self, symbol, timeframe, month):
+        return os.path.join(self._series_dir(symbol, timeframe), f"{month:%Y-%m}.parquet")
+
+    def load(self, symbol, timeframe, start_dt, end_dt, query_range):
+        """
+        [start_dt, end_dt] রেঞ্জের ক্যান্ডেল DataFrame রিটার্ন করে।
+        query_range(start_dt, end_dt) -> DataFrame: ক্যাশে না থাকা অংশ Postgres থেকে আনার ফাংশন।
+        """
+        # DB এর timestamp লোকাল-naive (datetime.fromtimestamp), তাই "এখন" ও লোকাল সময়ে
+        current_month = month_start(datetime.now())
+        months = list(iter_months(start_dt, end_dt))
+
+        # ক্যাশে না থাকা সম্পূর্ণ মাসগুলো একটানা রান হিসেবে একবারে Postgres থেকে এনে ব্যাকফিল
+        missing_run = []
+        for month in months + [None]:
+            missing = (
+                month is not None and month < current_month
+                and not os.path.exists(self._partition_path(symbol, timeframe, month))
+            )
+            if missing:
+                missing_run.append(month)
+            elif missing_run:
+                self._backfill(symbol, timeframe, missing_run, query_range)
+                missing_run = []
+
+        frames = []
+        cached_files = [
+            self._partition_path(symbol, timeframe, m) for m in months if m < current_month
+        ]
+        if cached_files:
+            # predicate pushdown: শুধু রেঞ্জের ভেতরের row group / row পড়া হয়
+            dataset = ds.dataset(cached_files, format='parquet')
+            table = dataset.to_table(filter=(ds.field('datetime') >= pa.scalar(start_dt, pa.timestamp('us'))) &
+                                            (ds.field('datetime') <= pa.scalar(end_dt, pa.timestamp('us'))))
+            frames.append(table.to_pandas(coerce_temporal_nanoseconds=True).set_index('datetime'))
+
+        if months and months[-1] >= current_month:
+            live_start = max(start_dt, current_month)
+            frames.append(query_range(live_start, end_dt))
+
+        frames = [f for f in frames if not f.empty]
+        if not frames:
+            return empty_candles()
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        return df.sort_index()
+
+    def _backfill(self, symbol, timeframe, months, query_range):
+        df = query_range(months[0], next_month(months[-1]) - pd.Timedelta(microseconds=1))
+        os.makedirs(self._series_dir(symbol, timeframe), exist_ok=True)
+        for month in months:
+            part = df[(df.index >= month) & (df.index < next_month(month))]
+            # ফাঁকা মাসও লেখা হয়, যাতে পরের বার আবার Postgres এ যেতে না হয়
+            self._write_partition(self._partition_path(symbol, timeframe, month), part)
+
+    def _write_partition(self, path, df):
+        table = pa.Table.from_pandas(
+            df.reset_index(),
+            schema=pa.schema([('datetime', pa.timestamp('us'))] + [(c, pa.float64()) for c in OHLCV_COLUMNS]),
+            preserve_index=False
+        )
+        # অন্য প্রসেস যেন অর্ধেক লেখা ফাইল না পড়ে, তাই temp ফাইলে লিখে atomic rename
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, symbol, timeframe, start_dt=None, end_dt=None):
+        """
+        রেঞ্জের মাসগুলোর পার্টিশন মুছে ফেলা (রেঞ্জ না দিলে পুরো সিরিজ)।
+        1m বেস সিরিজ বদলালে এর থেকে তৈরি হওয়া (continuous aggregate) টাইমফ্রেমগুলোও বাতিল হয়।
+        """
+        self._invalidate_series(symbol, timeframe, start_dt, end_dt)
+        if timeframe == BASE_TIMEFRAME:
+            for derived in DERIVED_TIMEFRAMES:
+                self._invalidate_series(symbol, derived, start_dt, end_dt)
+
+    def _invalidate_series(self, symbol, timeframe, start_dt=None, end_dt=None):
+        series_dir = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(series_dir):
+            return
+        if start_dt is None and end_dt is None:
+            shutil.rmtree(series_dir, ignore_errors=True)
+            return
+
+        for file_name in os.listdir(series_dir):
+            if not file_name.endswith('.parquet'):
+                continue
+            month = datetime.strptime(file_name[:-len('.parquet')], "%Y-%m")
+            if (start_dt is None or next_month(month) > start_dt) and (end_dt is None or month <= end_dt):
+                try:
+                    os.remove(os.path.join(series_dir, file_name))
+                except FileNotFoundError:
+                    pass
+
+    def invalidate_before(self, timeframe, cutoff_dt):
+        """রিটেনশন ক্লিনআপ: সব সিম্বলের cutoff এর আগের (আংশিকসহ) মাসগুলোর পার্টিশন মুছে ফেলা।"""
+        exchange_dir = os.path.join(self.root, self.exchange)
+        if not os.path.isdir(exchange_dir):
+            return
+        for symbol in os.listdir(exchange_dir):
+            self.invalidate(symbol, timeframe, None, cutoff_dt)
+
+
+candle_store = ParquetCandleStore()
@@ -0,0 +1,165 @@
+import io
+import asyncio
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects.postgresql import insert
+from fastapi.concurrency import run_in_threadpool
+from app import models
+from app.core.config import settings
+from app.services.candle_store import candle_store
+
+STAGING_TABLE = "market_data_staging"
+COPY_COLUMNS = "exchange, symbol, timeframe, timestamp, open, high, low, close, volume"
+
+
+def ms_to_local_naive(timestamps_ms):
+    """
+    _save_candles এর datetime.fromtimestamp() এর মতো লোকাল naive datetime, কিন্তু ভেক্টরাইজড।
+    ব্যাচের শুরু ও শেষে UTC অফসেট একই হলে (DST পরিবর্তন নেই) একটি অফসেটেই পুরো অ্যারে কনভার্ট হয়।
+    """
+    timestamps_ms = np.asarray(timestamps_ms, dtype='int64')
+    first = datetime.fromtimestamp(timestamps_ms[0] / 1000.0)
+    last = datetime.fromtimestamp(timestamps_ms[-1] / 1000.0)
+    first_offset = first - datetime.fromtimestamp(timestamps_ms[0] / 1000.0, timezone.utc).replace(tzinfo=None)
+    last_offset = last - datetime.fromtimestamp(timestamps_ms[-1] / 1000.0, timezone.utc).replace(tzinfo=None)
+    if first_offset == last_offset:
+        # সরাসরি int64 ns গণনা (pd.to_datetime + Timedelta যোগের চেয়ে কয়েকগুণ দ্রুত, বড় ফিডে গুরুত্বপূর্ণ)
+        offset_ns = first_offset // timedelta(microseconds=1) * 1000
+        return pd.DatetimeIndex((timestamps_ms * 1_000_000 + offset_ns).view('datetime64[ns]'))
+    return pd.DatetimeIndex([datetime.fromtimestamp(ts / 1000.0) for ts in timestamps_ms])
+
+
+class CandleWriter:
+    """
+    ক্যান্ডেল লেখার producer/consumer স্টেজ।
+    ফেচাররা submit() দিয়ে raw OHLCV পেজ bounded queue তে দেয়, একটি ডেডিকেটেড writer সেগুলো জুড়ে
+    বড় ব্যাচ বানিয়ে নিজস্ব Session এ লেখে:
+      COPY -> temp staging টেবিল -> INSERT ... SELECT ON CONFLICT DO NOTHING (ব্যাচ প্রতি ১টি commit)
+      CANDLE_COPY_WRITER বন্ধ থাকলে সাধারণ bulk INSERT ... ON CONFLICT DO NOTHING
+    """
+
+    def __init__(self, session_factory, symbol: str, timeframe: str, exchange: str = "binance",
+                 batch_rows: int = None, queue_size: int = 8, flush_interval: float = None):
+        self.session_factory = session_factory
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.exchange = exchange
+        self.batch_rows = batch_rows or settings.CANDLE_WRITE_BATCH_ROWS
+        self.flush_interval = settings.CANDLE_WRITE_FLUSH_SECONDS if flush_interval is None else flush_interval
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.saved = 0
+        self.commits = 0
+        self.failed_rows = 0
+        self.error = None
+        self._task = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._consume())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # বডিতে আগেই এরর হলে সেটাই যাক, writer এর এরর দিয়ে ঢাকা নয়
+        await self.close(raise_on_error=exc is None)
+
+    async def submit(self, page):
+        if page:
+            await self.queue.put(page)
+
+    async def close(self, raise_on_error=True):
+        """কিউ খালি করে writer থামায়। কোনো ব্যাচ লেখা না গেলে RuntimeError (আংশিক সিঙ্ককে সফল দেখানো নয়)।"""
+        if self._task is not None:
+            await self.queue.put(None)
+            await self._task
+            self._task = None
+        if self.failed_rows and raise_on_error:
+            raise RuntimeError(f"{self.failed_rows} candles failed to write: {self.error}")
+        return self.saved
+
+    async def _consume(self):
+        db = self.session_factory()
+        try:
+            done = False
+            while not done:
+                page = await self.queue.get()
+                if page is None:
+                    break
+                batch = list(page)
+                # batch_rows পূর্ণ না হওয়া পর্যন্ত (সর্বোচ্চ flush_interval সেকেন্ড) আরও পেজ জুড়ে বড় ব্যাচ,
+                # এতে প্রতি পেজে commit এর বদলে কয়েক ডজন পেজে একটি commit হয়
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_rows:
+                    if self.queue.empty():
+                        if loop.time() >= deadline:
+                            break
+                        # wait_for(queue.get()) ক্যানসেল হলে পেজ হারানোর ঝুঁকি থাকে, তাই ছোট পোলিং
+                        await asyncio.sleep(0.05)
+                        continue
+                    page = self.queue.get_nowait()
+                    if page is None:
+                        done = True
+                        break
+                    batch.extend(page)
+                try:
+                    self.saved += await run_in_threadpool(self._write_batch, db, batch)
+                except Exception as e:
+                    # writer থেমে গেলে ফেচাররা ফুল কিউতে আটকে যাবে, তাই এরর রেকর্ড করে চালিয়ে যাওয়া; close() এ raise
+                    print(f"Batch Write Error: {e}")
+                    self.failed_rows += len(batch)
+                    self.error = self.error or e
+        finally:
+            db.close()
+
+    def _write_batch(self, db, ohlcv):
+        data = np.asarray([c[:6] for c in ohlcv], dtype='float64')
+        data = data[np.argsort(data[:, 0], kind='stable')]
+        frame = pd.DataFrame({
+            "exchange": self.exchange,
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "timestamp": ms_to_local_naive(data[:, 0]),
+            "open": data[:, 1], "high": data[:, 2], "low": data[:, 3], "close": data[:, 4], "volume": data[:, 5],
+        })
+
+        try:
+            if settings.CANDLE_COPY_WRITER and db.get_bind().dialect.name == 'postgresql':
+                inserted = self._copy_upsert(db, frame)
+            else:
+                stmt = insert(models.MarketData.__table__).values(frame.to_dict('records'))
+                result = db.execute(stmt.on_conflict_do_nothing(
+                    index_elements=['exchange', 'symbol', 'timeframe', 'timestamp']
+                ))
+                inserted = result.rowcount
+            db.commit()
+            self.commits += 1
+        except Exception:
+            db.rollback()
+            raise
+
+        # ✅ নতুন ক্যান্ডেল যে মাসগুলোতে পড়েছে সেগুলোর Parquet ক্যাশ বাতিল
+        candle_store.invalidate(self.symbol, self.timeframe,
+                                frame["timestamp"].iloc[0].to_pydatetime(), frame["timestamp"].iloc[-1].to_pydatetime())
+        return inserted
+
+    def _copy_upsert(self, db, frame):
+        table = models.MarketData.__tablename__
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            # সেশন-লোকাল temp টেবিল, commit এ খালি হয়ে যায়
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            cursor.copy_expert(f"COPY {STAGING_TABLE} ({COPY_COLUMNS}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM {STAGING_TABLE} "
+                f"ON CONFLICT (exchange, symbol, timeframe, timestamp) DO NOTHING"
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
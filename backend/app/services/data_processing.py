@@ -1,18 +1,180 @@
 import pandas as pd
 import os
+from app.core.config import settings
+from app.services.feed_store import FeedStore
+
+TRADE_COLUMNS = ['datetime', 'price', 'amount']
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def _fill_gaps(bars, last_close):
+    # যে বাকেটে ট্রেড হয়নি: আগের ক্লোজ প্রাইসই OHLC, ভলিউম 0 (চাঙ্কের আগের ক্লোজও ধরে)
+    close = bars['close'].ffill()
+    if last_close is not None:
+        close = close.fillna(last_close)
+    bars['close'] = close
+    bars['open'] = bars['open'].fillna(close)
+    bars['high'] = bars['high'].fillna(close)
+    bars['low'] = bars['low'].fillna(close)
+    return bars
+
+
+class StreamingCandleBuilder:
+    """
+    একটি টাইমফ্রেমের ক্যান্ডেল ট্রেড চাঙ্ক থেকে ইনক্রিমেন্টালি তৈরি করে।
+    প্রতিটি চাঙ্কের শেষ বাকেট অসম্পূর্ণ হতে পারে, তাই সেটি পরের চাঙ্কের প্রথম বাকেটের সাথে জুড়ে তারপর emit হয়।
+    ট্রেডগুলো সময় অনুযায়ী সাজানো থাকতে হবে (ccxt ডাউনলোড সেভাবেই লেখে)।
+    """
+
+    def __init__(self, timeframe='1s', fill_gaps=True):
+        self.freq = pd.tseries.frequencies.to_offset(timeframe)
+        self.fill_gaps = fill_gaps
+        self.origin = None
+        self.pending = None      # আগের চাঙ্কের শেষ (অসম্পূর্ণ) বার
+        self.last_close = None   # সর্বশেষ emit হওয়া বারের ক্লোজ (gap fill এর জন্য)
+
+    def add(self, trades):
+        """datetime ইনডেক্সসহ price/amount ট্রেড চাঙ্ক নিয়ে সম্পূর্ণ হওয়া বারগুলো রিটার্ন করে (না থাকলে None)।"""
+        if trades.empty:
+            return None
+        if self.origin is None:
+            # পুরো ফাইল একসাথে resample করলে যে অ্যালাইনমেন্ট হতো (প্রথম ট্রেডের দিনের শুরু) সেটাই সব চাঙ্কে
+            self.origin = trades.index[0].normalize()
+
+        ohlc = trades['price'].resample(self.freq, origin=self.origin).ohlc()
+        volume = trades['amount'].resample(self.freq, origin=self.origin).sum()
+        bars = pd.concat([ohlc, volume], axis=1)
+        bars.columns = CANDLE_COLUMNS
+
+        pending = self.pending
+        if pending is not None:
+            first_label = bars.index[0]
+            pending_label = pending.index[0]
+            if first_label < pending_label:
+                raise ValueError(f"Trades are not sorted by time near {first_label}")
+            if first_label == pending_label:
+                # চাঙ্ক সীমানায় ভাগ হয়ে যাওয়া বাকেট জোড়া লাগানো
+                row = bars.iloc[0]
+                carry = pending.iloc[0]
+                bars.iloc[0] = [
+                    carry['open'], max(carry['high'], row['high']), min(carry['low'], row['low']),
+                    row['close'], carry['volume'] + row['volume'],
+                ]
+            else:
+                bars = pd.concat([pending, bars])
+                # pending আর এই চাঙ্কের মাঝের ফাঁকা বাকেটগুলো
+                bars = bars.reindex(pd.date_range(bars.index[0], bars.index[-1], freq=self.freq, name='datetime'))
+                bars['volume'] = bars['volume'].fillna(0)
+
+        self.pending = bars.iloc[-1:]
+        return self._finish(bars.iloc[:-1])
+
+    def flush(self):
+        """ফাইল শেষে বাকি থাকা শেষ বার।"""
+        pending, self.pending = self.pending, None
+        return self._finish(pending) if pending is not None else None
+
+    def _finish(self, bars):
+        if bars.empty:
+            return None
+        if self.fill_gaps:
+            bars = _fill_gaps(bars.copy(), self.last_close)
+            self.last_close = bars['close'].iloc[-1]
+        return bars
+
+
+def iter_trade_chunks(file_path, chunk_rows=None, progress_callback=None):
+    """
+    ট্রেড CSV থেকে datetime ইনডেক্সসহ price/amount চাঙ্ক yield করে।
+    progress_callback(percent) প্রতিটি চাঙ্ক পড়ার পর ফাইলের কত অংশ পড়া হয়েছে তা জানায়।
+    """
+    chunk_rows = chunk_rows or settings.TRADE_CONVERT_CHUNK_ROWS
+    store = FeedStore(os.path.dirname(file_path))
+    if store.exists(os.path.basename(file_path)):
+        # ✅ বাইনারি ট্রেড ফিড: timestamp (epoch-ms) সরাসরি, স্ট্রিং পার্সিং নেই
+        for trades, fraction in store.iter_trade_batches(os.path.basename(file_path), chunk_rows):
+            yield trades
+            if progress_callback:
+                progress_callback(min(99, int(fraction * 100)))
+        return
+
+    total_bytes = os.path.getsize(file_path) or 1
+    with open(file_path, 'rb') as f:
+        for chunk in pd.read_csv(f, usecols=TRADE_COLUMNS, chunksize=chunk_rows):
+            if chunk.empty:
+                continue
+            chunk['datetime'] = pd.to_datetime(chunk['datetime'])
+            yield chunk.set_index('datetime')
+            if progress_callback:
+                progress_callback(min(99, int(f.tell() / total_bytes * 100)))
+
+
+def iter_trade_candles(file_path, timeframe='1s', chunk_rows=None, fill_gaps=True):
+    """ট্রেড CSV চাঙ্কে চাঙ্কে পড়ে সম্পূর্ণ হওয়া OHLCV বার (DataFrame) yield করে, মেমোরি ফাইল সাইজের উপর নির্ভর করে না।"""
+    builder = StreamingCandleBuilder(timeframe, fill_gaps)
+    for trades in iter_trade_chunks(file_path, chunk_rows):
+        bars = builder.add(trades)
+        if bars is not None:
+            yield bars
+    bars = builder.flush()
+    if bars is not None:
+        yield bars
+
+
+def stream_trades_to_candles(file_path, output_path, timeframe='1s', chunk_rows=None, fill_gaps=True):
+    """ট্রেড ফাইল থেকে ক্যান্ডেল CSV (datetime, open, high, low, close, volume) লেখে। মোট ক্যান্ডেল সংখ্যা রিটার্ন করে।"""
+    return convert_trade_file(file_path, {timeframe: output_path}, chunk_rows, fill_gaps)[timeframe]
+
+
+def convert_trade_file(file_path, outputs, chunk_rows=None, fill_gaps=True, progress_callback=None):
+    """
+    একবার ফাইল পড়েই একাধিক টাইমফ্রেমের ক্যান্ডেল CSV লেখে।
+    outputs: {pandas timeframe: output_path}। প্রতিটি টাইমফ্রেমের ক্যান্ডেল সংখ্যা রিটার্ন করে।
+    """
+    builders = {tf: StreamingCandleBuilder(tf, fill_gaps) for tf in outputs}
+    counts = {tf: 0 for tf in outputs}
+    handles = {}
+    try:
+        for tf, output_path in outputs.items():
+            handles[tf] = open(output_path + ".part", 'w', newline='')
+
+        def write(tf, bars):
+            if bars is not None:
+                bars.rename_axis('datetime').to_csv(handles[tf], header=(counts[tf] == 0))
+                counts[tf] += len(bars)
+
+        for trades in iter_trade_chunks(file_path, chunk_rows, progress_callback):
+            for tf, builder in builders.items():
+                write(tf, builder.add(trades))
+        for tf, builder in builders.items():
+            write(tf, builder.flush())
+
+        for tf, output_path in outputs.items():
+            handles.pop(tf).close()
+            # অর্ধেক লেখা ফাইল যেন ব্যাকটেস্টে ব্যবহার না হয়
+            os.replace(output_path + ".part", output_path)
+    finally:
+        for tf, handle in handles.items():
+            handle.close()
+            if os.path.exists(outputs[tf] + ".part"):
+                os.remove(outputs[tf] + ".part")
+    if progress_callback:
+        progress_callback(100)
+    return counts
+
 
 def convert_trades_to_candles_logic(timeframe='1s'):
     """
     Converts all trade files in the data_feeds directory to candle files.
     """
     feed_dir = "app/data_feeds/"
-    
+
     # Ensure directory exists
     if not os.path.exists(feed_dir):
         return {"message": "Data feeds directory not found.", "status": "error"}
 
-    files = [f for f in os.listdir(feed_dir) if f.startswith("trades_") and f.endswith(".csv")]
-    
+    files = FeedStore(feed_dir).list_feeds("trades_")
+
     if not files:
         return {"message": "No trade files found to convert.", "status": "warning"}
 
@@ -21,40 +183,17 @@ def convert_trades_to_candles_logic(timeframe='1s'):
 
     for trade_file_name in files:
         file_path = os.path.join(feed_dir, trade_file_name)
-        
+
         try:
             print(f"Processing {trade_file_name}...")
-            # Read data
-            df = pd.read_csv(file_path, usecols=['datetime', 'price', 'amount'])
-            
-            # Convert datetime and set index
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df.set_index('datetime', inplace=True)
-
-            # Resample
-            ohlc = df['price'].resample(timeframe).ohlc()
-            volume = df['amount'].resample(timeframe).sum()
-
-            # Merge
-            candles = pd.concat([ohlc, volume], axis=1)
-            candles.columns = ['open', 'high', 'low', 'close', 'volume']
-
-            # Handle missing data
-            candles['close'] = candles['close'].ffill()
-            candles['open'] = candles['open'].fillna(candles['close'])
-            candles['high'] = candles['high'].fillna(candles['close'])
-            candles['low'] = candles['low'].fillna(candles['close'])
-            candles['volume'] = candles['volume'].fillna(0)
-
-            # Save output
             output_filename = trade_file_name.replace('trades_', f'candles_{timeframe}_')
             output_path = os.path.join(feed_dir, output_filename)
-            
-            candles.reset_index(inplace=True)
-            candles.to_csv(output_path, index=False)
-            
+
+            # ✅ চাঙ্কে চাঙ্কে স্ট্রিমিং কনভার্সন (পুরো ফাইল মেমোরিতে লোড হয় না)
+            stream_trades_to_candles(file_path, output_path, timeframe)
+
             converted_files.append(output_filename)
-            
+
         except Exception as e:
             error_msg = f"Error converting {trade_file_name}: {str(e)}"
             print(error_msg)
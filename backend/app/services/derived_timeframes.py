@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import sqlalchemy as sa
+from app.core.config import settings
+
+# -----------------------------------------------------------
+# Derived Timeframes (TimescaleDB Continuous Aggregates)
+# -----------------------------------------------------------
+# market_data_caggs মাইগ্রেশন 1m বেস সিরিজ থেকে এই টাইমফ্রেমগুলোর continuous aggregate তৈরি করে।
+# কোনো টাইমফ্রেম আলাদাভাবে ডাউনলোড না থাকলে get_candles_df সরাসরি অ্যাগ্রিগেট থেকে পড়ে,
+# তাই Python/Backtrader এ রিস্যাম্পল করতে হয় না।
+
+BASE_TIMEFRAME = '1m'
+
+# টাইমফ্রেম -> বাকেট সাইজ (মাইগ্রেশনের AGGREGATES এর সাথে মিল রাখতে হবে)
+DERIVED_TIMEFRAMES = {
+    '3m': timedelta(minutes=3), '5m': timedelta(minutes=5), '15m': timedelta(minutes=15),
+    '30m': timedelta(minutes=30), '45m': timedelta(minutes=45),
+    '1h': timedelta(hours=1), '2h': timedelta(hours=2), '3h': timedelta(hours=3), '4h': timedelta(hours=4),
+    '6h': timedelta(hours=6), '8h': timedelta(hours=8), '12h': timedelta(hours=12),
+    '1d': timedelta(days=1), '1w': timedelta(weeks=1),
+}
+
+
+# market_service শুধু binance থেকে সিঙ্ক করে (_save_candles/CandleWriter), ভিউতে অন্য এক্সচেঞ্জের রো থাকলেও সেগুলো নয়
+AGGREGATE_EXCHANGE = 'binance'
+
+
+def last_closed_bucket(timeframe, now=None):
+    """
+    এর পরে শুরু হওয়া বাকেট এখনো চলছে (রিয়েল-টাইম অ্যাগ্রিগেশনে আংশিক ক্যান্ডেল), তাই কুয়েরি
+    timestamp <= এই মান পর্যন্ত। timestamp লোকাল-naive, তাই now() ও লোকাল।
+    """
+    return (now or datetime.now()) - DERIVED_TIMEFRAMES[timeframe]
+
+
+def is_derived(timeframe):
+    return settings.CONTINUOUS_AGGREGATES_ENABLED and timeframe in DERIVED_TIMEFRAMES
+
+
+def view_name(timeframe):
+    return f"market_data_{timeframe}"
+
+
+def aggregate_table(timeframe):
+    """ORM কুয়েরির জন্য অ্যাগ্রিগেট ভিউয়ের লাইটওয়েট টেবিল ডেফিনিশন (market_data এর মতোই কলাম, timeframe ছাড়া)।"""
+    return sa.table(
+        view_name(timeframe),
+        sa.column('exchange', sa.String), sa.column('symbol', sa.String), sa.column('timestamp', sa.DateTime),
+        sa.column('open', sa.Float), sa.column('high', sa.Float), sa.column('low', sa.Float),
+        sa.column('close', sa.Float), sa.column('volume', sa.Float),
+    )
+
+
+def refresh_aggregates(bind, start_dt, end_dt, timeframes=None):
+    """
+    ব্যাকফিল করা 1m রেঞ্জের জন্য অ্যাগ্রিগেটগুলো রিফ্রেশ করা
+    (রিফ্রেশ পলিসি শুধু শেষ কয়েক বাকেট দেখে, পুরোনো ইতিহাস এখানে materialize হয়)।
+    refresh_continuous_aggregate ট্রানজ্যাকশনের ভেতরে চলে না, তাই AUTOCOMMIT কানেকশন।
+    """
+    if not settings.CONTINUOUS_AGGREGATES_ENABLED or bind.dialect.name != 'postgresql':
+        return
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for timeframe in timeframes or DERIVED_TIMEFRAMES:
+            # শুধু পুরোপুরি উইন্ডোর ভেতরের বাকেট রিফ্রেশ হয়, তাই দুই পাশে এক বাকেট বাড়ানো
+            bucket = DERIVED_TIMEFRAMES[timeframe]
+            try:
+                conn.execute(
+                    sa.text(f"CALL refresh_continuous_aggregate('{view_name(timeframe)}', :start, :end)"),
+                    {"start": start_dt - bucket, "end": end_dt + bucket}
+                )
+            except Exception as e:
+                print(f"⚠️ Aggregate refresh failed for {timeframe}: {e}")
@@ -0,0 +1,758 @@
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from app.strategies import SmaCross, RsiStrategy, MacdCross, EmaCross, BollingerBandsStrat
+from app.services.vectorized_backtest import sma, ema, rsi, stddev, crossover
+
+# -----------------------------------------------------------
+# Event-Driven Backtest Engine (Backtrader ছাড়া)
+# -----------------------------------------------------------
+# 1s/1m এর লাখ লাখ বারে Backtrader এর line buffer মেশিনারিই বেশিরভাগ CPU খায়। এখানে বারগুলো একবার অ্যারেতে
+# কপি হয়, প্রতি বারে শুধু একটি ইনডেক্স বাড়ে; Order/Trade/Position হালকা __slots__ অবজেক্ট।
+# ব্রোকারের নিয়ম BackBroker এর মতো (তাই রেজাল্ট Backtrader এর সাথে মেলে):
+#   - Market: পরের বারের open এ (slippage হলে high/low দিয়ে সীমিত)
+#   - Stop/StopTrail/Limit: বারের OHLC দিয়ে ট্রিগার, gap থাকলে open এ; StopTrail প্রতি বারের close দিয়ে সরে
+#   - সাবমিটের সময় (তৈরির close দামে) ও ফিলের সময় ক্যাশ চেক, না হলে Margin
+# স্ট্র্যাটেজি API backtrader এর next()-স্টাইলের মতো (self.data.close[0], self.position, buy/sell/close,
+# cancel, notify_order), শুধু ইন্ডিকেটর self.I(...) দিয়ে NumPy অ্যারে হিসেবে আগেই হিসাব হয়।
+# Submitted/Accepted নোটিফিকেশন পাঠানো হয় না (অর্ডার অবজেক্ট ক্লোন হয় না, তাই শুধু চূড়ান্ত স্ট্যাটাস)।
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+class Line:
+    """অ্যারের উপর backtrader স্টাইলের [0]/[-1] অ্যাক্সেস, বর্তমান বারের সাপেক্ষে।"""
+
+    __slots__ = ('values', 'bars')
+
+    def __init__(self, values, bars):
+        # numpy স্কেলারের চেয়ে list ইনডেক্সিং দ্রুত
+        self.values = values
+        self.bars = bars
+
+    def __getitem__(self, ago):
+        index = self.bars.index + ago
+        if index < 0:
+            raise IndexError("line index out of range")
+        return self.values[index]
+
+    def __len__(self):
+        return self.bars.index + 1
+
+    def __float__(self):
+        return float(self.values[self.bars.index])
+
+    def __lt__(self, other):
+        return self.values[self.bars.index] < _current(other)
+
+    def __le__(self, other):
+        return self.values[self.bars.index] <= _current(other)
+
+    def __gt__(self, other):
+        return self.values[self.bars.index] > _current(other)
+
+    def __ge__(self, other):
+        return self.values[self.bars.index] >= _current(other)
+
+
+def _current(value):
+    return value.values[value.bars.index] if isinstance(value, Line) else value
+
+
+class BarSeries:
+    """df এর OHLCV অ্যারে (arrays) আর বর্তমান বারের ইনডেক্স; স্ট্র্যাটেজির কাছে self.data হিসেবে যায়।"""
+
+    def __init__(self, df):
+        self.index = -1
+        self.length = len(df)
+        self.arrays = {name: df[name].to_numpy(dtype='float64') for name in OHLCV}
+        self.arrays['timestamp'] = df.index.to_numpy('datetime64[s]').astype('int64')
+        for name, values in self.arrays.items():
+            setattr(self, name, Line(values.tolist(), self))
+
+    def __len__(self):
+        return self.index + 1
+
+
+class OrderData:
+    __slots__ = ('price', 'size', 'remsize', 'value', 'comm', 'pnl', 'dt', 'bar')
+
+    def __init__(self, price=0.0, size=0.0, bar=-1, dt=0, remsize=0.0):
+        self.price = price
+        self.size = size
+        self.remsize = remsize
+        self.value = 0.0
+        self.comm = 0.0
+        self.pnl = 0.0
+        self.dt = dt
+        self.bar = bar
+
+
+class Order:
+    Market, Limit, Stop, StopTrail = range(4)
+    ExecTypes = ['Market', 'Limit', 'Stop', 'StopTrail']
+
+    Created, Submitted, Accepted, Partial, Completed, Canceled, Expired, Margin, Rejected = range(9)
+    Status = ['Created', 'Submitted', 'Accepted', 'Partial', 'Completed', 'Canceled', 'Expired', 'Margin', 'Rejected']
+
+    __slots__ = ('ref', 'size', 'exectype', 'trailpercent', 'status', 'created', 'executed')
+
+    def __init__(self, ref, size, exectype, price, trailpercent, bar, dt, pclose):
+        self.ref = ref
+        self.size = size
+        self.exectype = self.Market if exectype is None else exectype
+        self.trailpercent = trailpercent or 0.0
+        self.status = self.Created
+        self.created = OrderData(price if price else pclose, size, bar, dt)
+        self.executed = OrderData(remsize=size)
+        if self.exectype == self.StopTrail:
+            self.created.price = float('inf') if size > 0 else float('-inf')
+            self.trailadjust(pclose)
+
+    def isbuy(self):
+        return self.size > 0
+
+    def issell(self):
+        return self.size < 0
+
+    def alive(self):
+        return self.status in (self.Created, self.Submitted, self.Partial, self.Accepted)
+
+    def getstatusname(self):
+        return self.Status[self.status]
+
+    def getordername(self):
+        return self.ExecTypes[self.exectype]
+
+    def trailadjust(self, price):
+        # সেল স্টপ শুধু উপরে সরে, বাই স্টপ শুধু নিচে
+        amount = price * self.trailpercent
+        if self.size > 0:
+            if price + amount < self.created.price:
+                self.created.price = price + amount
+        elif price - amount > self.created.price:
+            self.created.price = price - amount
+
+
+class Position:
+    __slots__ = ('size', 'price')
+
+    def __init__(self):
+        self.size = 0.0
+        self.price = 0.0
+
+    def __bool__(self):
+        return self.size != 0
+
+    def __repr__(self):
+        return f"Position(size={self.size}, price={self.price})"
+
+
+class Trade:
+    __slots__ = ('long', 'size', 'price', 'value', 'pnl', 'commission', 'open_bar', 'close_bar')
+
+    def __init__(self, long, bar):
+        self.long = long
+        self.size = 0.0
+        self.price = 0.0
+        self.value = 0.0
+        self.pnl = 0.0
+        self.commission = 0.0
+        self.open_bar = bar
+        self.close_bar = None
+
+    @property
+    def pnlcomm(self):
+        return self.pnl - self.commission
+
+    @property
+    def isclosed(self):
+        return self.close_bar is not None
+
+
+def _update_position(size, price, delta, exec_price):
+    """Position.update এর মতো: (নতুন size, নতুন গড় দাম, opened, closed)।"""
+    new_size = size + delta
+    if not new_size:
+        return 0.0, 0.0, 0.0, delta
+    if not size:
+        return new_size, exec_price, delta, 0.0
+    if (size > 0) == (delta > 0):
+        return new_size, (price * size + delta * exec_price) / new_size, delta, 0.0
+    if (new_size > 0) == (size > 0):
+        return new_size, price, 0.0, delta
+    # রিভার্সাল: পুরো পজিশন ক্লোজ, বাকিটা নতুন দিকে ওপেন
+    return new_size, exec_price, new_size, -size
+
+
+class EventBroker:
+    def __init__(self, bars, cash, commission=0.0, slippage=0.0, percents=90, trade_from=0):
+        self.bars = bars
+        self.cash = float(cash)
+        self.commission = commission
+        self.slippage = slippage
+        self.percents = percents
+        self.trade_from = trade_from
+        self.position = Position()
+        self.submitted = []
+        self.pending = []
+        self.notifs = []
+        self.trade = None
+        self.trades = []
+        self.transactions = []
+        self._ref = 0
+        self._open = bars.open.values
+        self._high = bars.high.values
+        self._low = bars.low.values
+        self._close = bars.close.values
+        self._time = bars.timestamp.values
+
+    def getvalue(self):
+        return self.cash + self.position.size * self._close[self.bars.index]
+
+    def create_order(self, size, exectype=None, price=None, trailpercent=None):
+        self._ref += 1
+        i = self.bars.index
+        order = Order(self._ref, size, exectype, price, trailpercent, i, self._time[i], self._close[i])
+        if i < self.trade_from:
+            # warm-up: ইন্ডিকেটর গরম হয়, কিন্তু কোনো পজিশন খোলে না
+            order.status = Order.Rejected
+            self.notifs.append(order)
+            return order
+        order.status = Order.Submitted
+        self.submitted.append(order)
+        return order
+
+    def cancel(self, order):
+        try:
+            self.pending.remove(order)
+        except ValueError:
+            return False
+        order.status = Order.Canceled
+        self.notifs.append(order)
+        return True
+
+    def next(self):
+        if self.submitted:
+            self._check_submitted()
+        if not self.pending:
+            return
+        i = self.bars.index
+        popen, phigh, plow, pclose = self._open[i], self._high[i], self._low[i], self._close[i]
+        pending, self.pending = self.pending, []
+        for order in pending:
+            self._try_exec(order, popen, phigh, plow, pclose)
+            if order.alive():
+                self.pending.append(order)
+
+    def _check_submitted(self):
+        # তৈরির close দামে সিউডো-এক্সিকিউশন; একই ব্যাচের অর্ডারগুলো ক্রমানুসারে ক্যাশ খরচ করে
+        cash = self.cash
+        size, price = self.position.size, self.position.price
+        for order in self.submitted:
+            exec_price = order.created.price
+            size, price, opened, closed = _update_position(size, price, order.size, exec_price)
+            if closed:
+                cash -= closed * exec_price + abs(closed) * exec_price * self.commission
+            if opened:
+                cash -= opened * exec_price + abs(opened) * exec_price * self.commission
+            if cash >= 0.0:
+                order.status = Order.Accepted
+                self.pending.append(order)
+            else:
+                order.status = Order.Margin
+                self.notifs.append(order)
+        self.submitted = []
+
+    def _slip_up(self, pmax, price):
+        if not self.slippage:
+            return price
+        return min(price * (1 + self.slippage), pmax)
+
+    def _slip_down(self, pmin, price):
+        if not self.slippage:
+            return price
+        return max(price * (1 - self.slippage), pmin)
+
+    def _try_exec(self, order, popen, phigh, plow, pclose):
+        exectype = order.exectype
+        pcreated = order.created.price
+        if exectype == Order.Market:
+            if order.size > 0:
+                self._execute(order, self._slip_up(phigh, popen))
+            else:
+                self._execute(order, self._slip_down(plow, popen))
+
+        elif exectype == Order.Limit:
+            if order.size > 0:
+                if pcreated >= popen:
+                    self._execute(order, self._slip_up(min(phigh, pcreated), popen))
+                elif pcreated >= plow:
+                    self._execute(order, pcreated)
+            elif pcreated <= popen:
+                self._execute(order, self._slip_down(pcreated, popen))
+            elif pcreated <= phigh:
+                self._execute(order, pcreated)
+
+        else:  # Stop / StopTrail
+            if order.size > 0:
+                if popen >= pcreated:
+                    self._execute(order, self._slip_up(phigh, popen))
+                elif phigh >= pcreated:
+                    self._execute(order, self._slip_up(phigh, pcreated))
+            elif popen <= pcreated:
+                self._execute(order, self._slip_down(plow, popen))
+            elif plow <= pcreated:
+                self._execute(order, self._slip_down(plow, pcreated))
+            if exectype == Order.StopTrail and order.alive():
+                order.trailadjust(pclose)
+
+    def _execute(self, order, price):
+        position = self.position
+        old_size, old_price = position.size, position.price
+        _, _, opened, closed = _update_position(old_size, old_price, order.executed.remsize, price)
+
+        pnl = closed_comm = opened_comm = 0.0
+        if closed:
+            pnl = -closed * (price - old_price)
+            closed_comm = abs(closed) * price * self.commission
+            # Backtrader এর মতো দুই ধাপে (ফ্লোট রাউন্ডিং হুবহু মেলাতে)
+            self.cash += -closed * old_price + pnl
+            self.cash -= closed_comm
+
+        margin = False
+        if opened:
+            opened_comm = abs(opened) * price * self.commission
+            cash = self.cash - opened * price - opened_comm
+            if cash < 0.0:
+                # ক্লোজ অংশ হয়েছে, ওপেন করার মতো ক্যাশ নেই
+                margin = True
+                opened = opened_comm = 0.0
+            else:
+                self.cash = cash
+
+        exec_size = closed + opened
+        i = self.bars.index
+        if exec_size:
+            position.size, position.price, _, _ = _update_position(old_size, old_price, exec_size, price)
+            executed = order.executed
+            executed.price = (executed.size * executed.price + exec_size * price) / (executed.size + exec_size)
+            executed.size += exec_size
+            executed.remsize -= exec_size
+            executed.value += abs(exec_size) * price
+            executed.comm += closed_comm + opened_comm
+            executed.pnl += pnl
+            executed.bar = i
+            executed.dt = self._time[i]
+            # Backtrader এর মতো: রিভার্সালে closed + opened এর ফ্লোট অবশিষ্ট থাকলে অর্ডার Partial থাকে,
+            # বাকিটুকু পরের বারে এক্সিকিউট হয়ে তবেই Completed
+            order.status = Order.Partial if executed.remsize else Order.Completed
+            self.transactions.append((self._time[i], exec_size, price))
+            self._update_trade(old_size, closed, opened, price, pnl, closed_comm, opened_comm)
+
+        if margin:
+            order.status = Order.Margin
+        if exec_size or margin:
+            self.notifs.append(order)
+
+    def _update_trade(self, old_size, closed, opened, price, pnl, closed_comm, opened_comm):
+        i = self.bars.index
+        if closed:
+            trade = self.trade
+            trade.size += closed
+            trade.pnl += pnl
+            trade.commission += closed_comm
+            if old_size + closed == 0:
+                trade.size = 0.0
+                trade.close_bar = i
+                self.trades.append(trade)
+                self.trade = None
+        if opened:
+            if self.trade is None:
+                self.trade = Trade(opened > 0, i)
+            trade = self.trade
+            trade.price = (trade.price * trade.size + opened * price) / (trade.size + opened)
+            trade.size += opened
+            trade.value = abs(trade.size) * trade.price
+            trade.commission += opened_comm
+
+
+def _resolve_params(strategy_class, params):
+    values = {}
+    for klass in reversed(strategy_class.__mro__):
+        for name, default in klass.__dict__.get('params', ()):
+            values[name] = default
+    unknown = set(params) - set(values)
+    if unknown:
+        raise TypeError(f"Unknown params for {strategy_class.__name__}: {sorted(unknown)}")
+    values.update(params)
+    return SimpleNamespace(**values)
+
+
+class EventStrategy:
+    """
+    Backtrader next()-স্টাইল স্ট্র্যাটেজির শিম। params টিউপল (ইনহেরিটেন্সসহ), self.p/self.params, self.data,
+    self.position, buy/sell/close/cancel আর notify_order/notify_trade/prenext/next একইভাবে কাজ করে।
+    ইন্ডিকেটর __init__ এ self.I(numpy_array) দিয়ে; সব ইন্ডিকেটর ভ্যালিড হওয়ার আগে next() এর বদলে prenext()।
+    """
+
+    params = ()
+
+    @classmethod
+    def _create(cls, broker, bars, params):
+        strategy = cls.__new__(cls)
+        strategy.p = strategy.params = _resolve_params(cls, params)
+        strategy.broker = broker
+        strategy.data = strategy.data0 = bars
+        strategy.datas = [bars]
+        strategy._minperiod = 1
+        strategy.__init__()
+        return strategy
+
+    def __init__(self):
+        pass
+
+    def I(self, values):
+        values = np.asarray(values, dtype='float64')
+        valid = np.flatnonzero(~np.isnan(values))
+        # Backtrader minperiod এর মতো: প্রথম ভ্যালিড মানের বার থেকে next()
+        self._minperiod = max(self._minperiod, int(valid[0]) + 1 if len(valid) else len(values) + 1)
+        return Line(values.tolist(), self.data)
+
+    @property
+    def position(self):
+        return self.broker.position
+
+    def getposition(self, data=None):
+        return self.broker.position
+
+    def getsizing(self, isbuy=True):
+        # PercentSizer: ফ্ল্যাট থাকলে ক্যাশের percents%, নাহলে বর্তমান পজিশনের সাইজ
+        position = self.broker.position
+        if not position:
+            return self.broker.cash / self.data.close[0] * (self.broker.percents / 100)
+        return position.size
+
+    def buy(self, data=None, size=None, price=None, exectype=None, trailpercent=None):
+        size = size if size is not None else self.getsizing(isbuy=True)
+        if not size:
+            return None
+        return self.broker.create_order(abs(size), exectype, price, trailpercent)
+
+    def sell(self, data=None, size=None, price=None, exectype=None, trailpercent=None):
+        size = size if size is not None else self.getsizing(isbuy=False)
+        if not size:
+            return None
+        return self.broker.create_order(-abs(size), exectype, price, trailpercent)
+
+    def close(self, data=None, size=None):
+        possize = self.broker.position.size
+        size = abs(size or possize)
+        if possize > 0:
+            return self.sell(size=size)
+        if possize < 0:
+            return self.buy(size=size)
+        return None
+
+    def cancel(self, order):
+        if order is not None:
+            self.broker.cancel(order)
+
+    def notify_order(self, order):
+        pass
+
+    def notify_trade(self, trade):
+        pass
+
+    def prenext(self):
+        pass
+
+    def next(self):
+        pass
+
+
+class EventBaseStrategy(EventStrategy):
+    """BaseStrategy.notify_order এর SL/TP/Trailing ও trade_history হুবহু (প্রিন্ট ছাড়া)।"""
+
+    params = (
+        ('stop_loss', 0.0),
+        ('take_profit', 0.0),
+        ('trailing_stop', 0.0),
+    )
+
+    def __init__(self):
+        self.trade_history = []
+        self.order = None
+        self.sl_order = None
+        self.tp_order = None
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+
+        if order.status in [order.Completed]:
+            is_buy = order.isbuy()
+            price = order.executed.price
+            size = order.executed.size
+            self.trade_history.append({
+                "type": "buy" if is_buy else "sell",
+                "price": price,
+                "size": size,
+                "time": int(order.executed.dt)
+            })
+
+            if is_buy:
+                if self.params.stop_loss > 0:
+                    sl_price = price * (1.0 - self.params.stop_loss / 100)
+                    self.sl_order = self.sell(exectype=Order.Stop, price=sl_price, size=size)
+                if self.params.take_profit > 0:
+                    tp_price = price * (1.0 + self.params.take_profit / 100)
+                    self.tp_order = self.sell(exectype=Order.Limit, price=tp_price, size=size)
+                if self.params.trailing_stop > 0:
+                    self.sell(exectype=Order.StopTrail, trailpercent=self.params.trailing_stop / 100, size=size)
+
+            elif order.issell():
+                # OCO: একটি সেল হলে বাকি SL/TP ক্যানসেল
+                if self.sl_order:
+                    self.cancel(self.sl_order)
+                    self.sl_order = None
+                if self.tp_order:
+                    self.cancel(self.tp_order)
+                    self.tp_order = None
+
+            self.order = None
+
+        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+            self.order = None
+
+
+# -----------------------------------------------------------
+# Backtrader ক্লাস -> ইভেন্ট পোর্ট (কাস্টম স্ট্র্যাটেজিও @event_port দিয়ে নিজের পোর্ট রেজিস্টার করতে পারে)
+# পোর্ট শুধু ইন্ডিকেটর আর next() লেখে; params (ডিফল্ট ও alias) সবসময় Backtrader ক্লাস থেকেই আসে।
+# লজিক মিলছে কিনা tests/test_event_backtest.py রেজিস্ট্রির প্রতিটি পোর্ট Backtrader এর সাথে মিলিয়ে দেখে।
+# -----------------------------------------------------------
+
+EVENT_STRATEGIES = {}
+
+
+def event_port(bt_class):
+    def register(event_class):
+        event_class.params = bt_class.params._gettuple()
+        EVENT_STRATEGIES[bt_class] = event_class
+        return event_class
+    return register
+
+
+def supports(strategy_class):
+    return strategy_class in EVENT_STRATEGIES or (
+        isinstance(strategy_class, type) and issubclass(strategy_class, EventStrategy)
+    )
+
+
+def cross_line(a, b):
+    """CrossOver: দুই লাইনই ভ্যালিড হওয়ার পরের বার থেকে (Backtrader এর মতো minperiod + 1)।"""
+    cross = crossover(a, b).astype('float64')
+    valid = np.flatnonzero(~np.isnan(a - b))
+    cross[:int(valid[0]) + 1 if len(valid) else len(cross)] = np.nan
+    return cross
+
+
+@event_port(SmaCross)
+class EventSmaCross(EventBaseStrategy):
+    def __init__(self):
+        super().__init__()
+        short_p = self.params.fast_period if self.params.fast_period else self.params.short_period
+        long_p = self.params.slow_period if self.params.slow_period else self.params.long_period
+        close = self.data.arrays['close']
+        self.crossover = self.I(cross_line(sma(close, int(short_p)), sma(close, int(long_p))))
+
+    def next(self):
+        if not self.position:
+            if self.crossover > 0: self.buy()
+        elif self.crossover < 0: self.close()
+
+
+@event_port(RsiStrategy)
+class EventRsiStrategy(EventBaseStrategy):
+    def __init__(self):
+        super().__init__()
+        p_period = self.params.rsi_period if self.params.rsi_period else self.params.period
+        self.upper_band = self.params.rsi_upper if self.params.rsi_upper else self.params.overbought
+        self.lower_band = self.params.rsi_lower if self.params.rsi_lower else self.params.oversold
+        self.rsi = self.I(rsi(self.data.arrays['close'], int(p_period)))
+
+    def next(self):
+        if not self.position:
+            if self.rsi[0] < self.lower_band: self.buy()
+        else:
+            if self.rsi[0] > self.upper_band: self.close()
+
+
+@event_port(MacdCross)
+class EventMacdCross(EventBaseStrategy):
+    def __init__(self):
+        super().__init__()
+        fp = self.params.fast_period if self.params.fast_period else self.params.fastPeriod
+        sp = self.params.slow_period if self.params.slow_period else self.params.slowPeriod
+        sig = self.params.signal_period if self.params.signal_period else self.params.signalPeriod
+        close = self.data.arrays['close']
+        macd_line = ema(close, int(fp)) - ema(close, int(sp))
+        self.crossover = self.I(cross_line(macd_line, ema(macd_line, int(sig))))
+
+    def next(self):
+        if not self.position:
+            if self.crossover > 0: self.buy()
+        elif self.crossover < 0: self.close()
+
+
+@event_port(BollingerBandsStrat)
+class EventBollingerBandsStrat(EventBaseStrategy):
+    def __init__(self):
+        super().__init__()
+        dev = self.params.std_dev if self.params.std_dev else (self.params.dev if self.params.dev else self.params.stdDev)
+        close = self.data.arrays['close']
+        mid = sma(close, int(self.params.period))
+        self.mid = self.I(mid)
+        self.bot = self.I(mid - float(dev) * stddev(close, int(self.params.period), mid))
+
+    def next(self):
+        if not self.position:
+            if self.data.close < self.bot: self.buy()
+        else:
+            if self.data.close > self.mid: self.close()
+
+
+@event_port(EmaCross)
+class EventEmaCross(EventBaseStrategy):
+    def __init__(self):
+        super().__init__()
+        sp = self.params.short_period if self.params.short_period else self.params.shortPeriod
+        lp = self.params.long_period if self.params.long_period else self.params.longPeriod
+        close = self.data.arrays['close']
+        self.crossover = self.I(cross_line(ema(close, int(sp)), ema(close, int(lp))))
+
+    def next(self):
+        if not self.position:
+            if self.crossover > 0: self.buy()
+        elif self.crossover < 0: self.close()
+
+
+# -----------------------------------------------------------
+# রানার ও রেজাল্ট
+# -----------------------------------------------------------
+
+class EventBacktestResult:
+    def __init__(self, strategy, broker, bars, values, start_value, pruned_at=None):
+        self.strategy = strategy
+        self.broker = broker
+        # prune হলে শুধু চালানো অংশটুকু
+        self.timestamps = bars.arrays['timestamp'][:len(values)]
+        self.values = values
+        self.pruned_at = pruned_at
+        self.start_value = start_value
+        self.end_value = float(values[-1]) if len(values) else start_value
+
+    def daily_returns(self):
+        """PyFolio (TimeReturn, Days) এর মতো: দিনের শেষ ভ্যালু / আগের দিনের শেষ ভ্যালু - 1।"""
+        days = pd.to_datetime(self.timestamps, unit='s').normalize()
+        day_end = pd.Series(self.values, index=days).groupby(level=0).last()
+        return day_end / day_end.shift(1).fillna(self.start_value) - 1.0
+
+    def equity_curve(self):
+        return [{"time": int(t), "value": round(float(v), 2)}
+                for t, v in zip(self.timestamps, self.values) if not np.isnan(v)]
+
+    def trades_log(self):
+        executed = list(getattr(self.strategy, 'trade_history', []))
+        if not executed:
+            # Transactions analyzer এর মতো ফলব্যাক
+            executed = [{"type": "buy" if size > 0 else "sell", "price": price, "size": abs(size), "time": int(t)}
+                        for t, size, price in self.broker.transactions]
+            executed.sort(key=lambda x: x['time'])
+        return executed
+
+    def trade_analysis(self):
+        """_format_trade_analysis এর একই কী (TradeAnalyzer এর সংজ্ঞা: pnlcomm >= 0 হলে won)।"""
+        closed = self.broker.trades
+        pnls = [t.pnlcomm for t in closed]
+        won = [p for p in pnls if p >= 0.0]
+        lost = [p for p in pnls if p < 0.0]
+        total_closed = len(closed)
+        avg_win = sum(won) / len(won) if won else 0.0
+        avg_loss = sum(lost) / len(lost) if lost else 0.0
+        rois = [t.pnlcomm / t.value * 100 for t in closed if t.value]
+        longs = [t for t in closed if t.long]
+        shorts = [t for t in closed if not t.long]
+        return {
+            "total_closed": total_closed,
+            "total_open": 1 if self.broker.trade is not None else 0,
+            "total_won": len(won),
+            "total_lost": len(lost),
+            "win_rate": round(len(won) / total_closed * 100 if total_closed else 0, 2),
+            "long_trades_total": len(longs),
+            "long_trades_won": sum(1 for t in longs if t.pnlcomm >= 0.0),
+            "short_trades_total": len(shorts),
+            "short_trades_won": sum(1 for t in shorts if t.pnlcomm >= 0.0),
+            "gross_profit": round(sum(t.pnl for t in closed), 2),
+            "net_profit": round(sum(pnls), 2),
+            "avg_pnl": round(sum(pnls) / total_closed if total_closed else 0, 2),
+            "avg_win": round(avg_win, 2),
+            "avg_loss": round(avg_loss, 2),
+            "ratio_avg_win_loss": round(abs(avg_win / avg_loss) if avg_loss else 0, 2),
+            "largest_win_value": round(max(won, default=0.0), 2),
+            "largest_loss_value": round(min(lost, default=0.0), 2),
+            "largest_win_percent": round(max(rois + [0.0]), 2),
+            "largest_loss_percent": round(min(rois + [0.0]), 2),
+        }
+
+
+def run_event_backtest(df, strategy_class, params, initial_cash, commission=0.001, slippage=0.0, percents=90,
+                       progress_callback=None, prune_callback=None, checkpoints=(), trade_from=0):
+    """
+    strategy_class হতে পারে EVENT_STRATEGIES এ থাকা Backtrader ক্লাস অথবা সরাসরি EventStrategy সাবক্লাস।
+    params অবশ্যই আগে থেকে BacktestEngine._filter_params দিয়ে ফিল্টার করা থাকতে হবে।
+    checkpoints এর বারে prune_callback(step, value) True দিলে রান সেখানেই থামে (result.pruned_at)।
+    trade_from এর আগের বারগুলোতে অর্ডার Rejected হয় (walk-forward warm-up)।
+    """
+    event_class = EVENT_STRATEGIES.get(strategy_class, strategy_class)
+    bars = BarSeries(df)
+    broker = EventBroker(bars, initial_cash, commission, slippage, percents, trade_from)
+    strategy = event_class._create(broker, bars, params)
+
+    n = bars.length
+    closes = bars.close.values
+    position = broker.position
+    minperiod = strategy._minperiod
+    values = [0.0] * n
+    closed_trades = 0
+    last_percent = -1
+    checkpoints = set(checkpoints) if prune_callback else ()
+
+    for i in range(n):
+        bars.index = i
+        broker.next()
+        if broker.notifs:
+            notifs, broker.notifs = broker.notifs, []
+            for order in notifs:
+                strategy.notify_order(order)
+        if len(broker.trades) != closed_trades:
+            for trade in broker.trades[closed_trades:]:
+                strategy.notify_trade(trade)
+            closed_trades = len(broker.trades)
+
+        if i + 1 >= minperiod:
+            strategy.next()
+        else:
+            strategy.prenext()
+        values[i] = broker.cash + position.size * closes[i]
+
+        if progress_callback:
+            percent = (i + 1) * 100 // n
+            if percent != last_percent:
+                last_percent = percent
+                progress_callback(percent)
+
+        if checkpoints and i + 1 in checkpoints and prune_callback(i + 1, values[i]):
+            return EventBacktestResult(strategy, broker, bars, np.array(values[:i + 1]), float(initial_cash), pruned_at=i + 1)
+
+    return EventBacktestResult(strategy, broker, bars, np.array(values), float(initial_cash))
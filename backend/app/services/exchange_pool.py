@@ -0,0 +1,178 @@
+import asyncio
+import random
+import threading
+import time
+import ccxt.async_support as ccxt
+from app.core.config import settings
+
+# -----------------------------------------------------------
+# Async ccxt Client Pool (Download Tasks)
+# -----------------------------------------------------------
+# প্রতিটি Celery ওয়ার্কার প্রসেসে একটি ব্যাকগ্রাউন্ড event loop থ্রেড থাকে, আর exchange_id প্রতি একটি async
+# ccxt ক্লায়েন্ট সেই লুপে বেঁচে থাকে (টাস্ক প্রতি নতুন exchange/aiohttp সেশন তৈরি হয় না)।
+# ccxt এর নিজস্ব throttler এক এক করে রিকোয়েস্ট পাঠায়, তাই সেটি বন্ধ রেখে exchange প্রতি token bucket
+# দিয়ে রেট লিমিট মেনে একাধিক উইন্ডো একসাথে ফেচ করা হয়।
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# এগুলো সাময়িক সমস্যা, তাই backoff দিয়ে আবার চেষ্টা করা হয় (বাকিগুলো যেমন BadSymbol সরাসরি এরর)
+RETRYABLE_ERRORS = (ccxt.NetworkError, ccxt.ExchangeNotAvailable, ccxt.RateLimitExceeded)
+
+
+class TokenBucket:
+    """প্রতি সেকেন্ডে rate টি টোকেন, সর্বোচ্চ capacity টি জমা থাকে। acquire() টোকেন না পাওয়া পর্যন্ত অপেক্ষা করে।"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, seconds):
+        # 429/DDoS রেসপন্স পেলে কিছুক্ষণ কোনো রিকোয়েস্ট না পাঠানো
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class ExchangeClientPool:
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._clients = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="exchange-pool", daemon=True)
+                self._thread.start()
+                self._clients, self._buckets = {}, {}
+        return self._loop
+
+    def run(self, coro, timeout=None):
+        """সিঙ্ক কোড (Celery টাস্ক) থেকে পুলের লুপে কোরুটিন চালিয়ে রেজাল্ট ফেরত দেয়।"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result(timeout)
+
+    def client(self, exchange_id):
+        # শুধু পুলের লুপ থেকে কল হয়
+        if exchange_id not in self._clients:
+            if exchange_id not in ccxt.exchanges:
+                raise ValueError(f"Exchange {exchange_id} not found")
+            exchange = getattr(ccxt, exchange_id)({
+                'enableRateLimit': False,
+                'userAgent': USER_AGENT,
+                'timeout': 10000,
+            })
+            rate = settings.DOWNLOAD_RATE_LIMIT_FACTOR * 1000.0 / max(exchange.rateLimit, 1)
+            self._clients[exchange_id] = exchange
+            self._buckets[exchange_id] = TokenBucket(rate, capacity=max(1, settings.DOWNLOAD_CONCURRENCY))
+        return self._clients[exchange_id]
+
+    async def call(self, exchange_id, method, *args, **kwargs):
+        """রেট লিমিট + exponential backoff (jitter সহ) দিয়ে exchange মেথড কল।"""
+        exchange = self.client(exchange_id)
+        bucket = self._buckets[exchange_id]
+        for attempt in range(settings.DOWNLOAD_MAX_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                return await getattr(exchange, method)(*args, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= settings.DOWNLOAD_MAX_RETRIES:
+                    raise
+                delay = min(settings.DOWNLOAD_BACKOFF_MAX, settings.DOWNLOAD_BACKOFF_BASE * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)  # "equal jitter": সব ওয়ার্কার একসাথে আবার চেষ্টা না করে
+                if isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+                    bucket.penalize(delay)
+                print(f"⚠️ {exchange_id}.{method} failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def load_markets(self, exchange_id):
+        exchange = self.client(exchange_id)
+        if not exchange.markets:
+            await self.call(exchange_id, 'load_markets')
+        return exchange
+
+    async def fetch_ohlcv_window(self, exchange_id, symbol, timeframe, start, stop, limit=1000):
+        """[start, stop) উইন্ডোর সব ক্যান্ডেল (একাধিক পেজ লাগলে পরপর)।"""
+        tf_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        rows = []
+        since = start
+        while since < stop:
+            raw = await self.call(exchange_id, 'fetch_ohlcv', symbol, timeframe, since, limit)
+            page = [c for c in raw if since <= c[0] < stop] if raw else []
+            if not page:
+                break
+            rows.extend(page)
+            # পরের ক্যান্ডেল থেকে: পুরো উইন্ডো (limit × tf) এক পেজে এলে since == stop, দ্বিতীয় রিকোয়েস্ট লাগে না।
+            # যেসব exchange পেজে limit এর কম রো দেয় (OKX, Kraken...) তাদের জন্য পেজিং চলতে থাকে
+            since = page[-1][0] + tf_ms
+        return rows
+
+    async def fetch_trades_window(self, exchange_id, symbol, start, stop, limit=1000):
+        """[start, stop) উইন্ডোর সব ট্রেড, raw CSV রো ফরম্যাটে।"""
+        rows = []
+        since = start
+        while since < stop:
+            trades = await self.call(exchange_id, 'fetch_trades', symbol, since, limit)
+            if not trades:
+                break
+            for t in trades:
+                if since <= t['timestamp'] < stop:
+                    rows.append([t['id'], t['timestamp'], t['datetime'], t['symbol'], t['side'], t['price'], t['amount'], t['cost']])
+            last_ts = trades[-1]['timestamp']
+            if last_ts >= stop or last_ts < since:
+                break
+            # একই মিলিসেকেন্ডে পেজের চেয়ে বেশি ট্রেড থাকলে আটকে না যেতে +1
+            since = last_ts + 1
+        return rows
+
+    async def fetch_windows(self, fetch_window, exchange_id, windows, *args):
+        """উইন্ডোগুলো একসাথে ফেচ করে ইনপুটের ক্রমেই রেজাল্ট দেয় (ফাইলে ক্রমানুসারে লেখার জন্য)।"""
+        return await asyncio.gather(*(fetch_window(exchange_id, *args, start, stop) for start, stop in windows))
+
+    async def _close_all(self):
+        for exchange in self._clients.values():
+            try:
+                await exchange.close()
+            except Exception:
+                pass
+        self._clients, self._buckets = {}, {}
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._close_all(), loop).result(10)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+        loop.close()
+
+
+def split_windows(start, end, window_ms):
+    """[start, end] কে পরপর [a, b) উইন্ডোতে ভাগ করা।"""
+    windows = []
+    current = start
+    while current <= end:
+        stop = min(end + 1, current + window_ms)
+        windows.append((current, stop))
+        current = stop
+    return windows
+
+
+exchange_pool = ExchangeClientPool()
@@ -0,0 +1,445 @@
+import os
+import io
+import csv
+import json
+import zlib
+import glob
+import shutil
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.services.candle_writer import ms_to_local_naive
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow না থাকলে আগের মতো CSV তেই লেখা/পড়া হবে
+    pa = None
+
+# -----------------------------------------------------------
+# Binary Data Feeds (app/data_feeds)
+# -----------------------------------------------------------
+# API/ফ্রন্টএন্ড আগের মতোই লজিক্যাল নাম ব্যবহার করে (যেমন binance_BTC-USDT_1h.csv), কিন্তু ডাটা থাকে
+#   {DATA_FEED_DIR}/binance_BTC-USDT_1h.feed/part-000000.arrow, part-000001.arrow, ...
+# প্রতিটি সেগমেন্ট একটি Arrow IPC ফাইল (timestamp = int64 epoch-ms)। append মানে নতুন সেগমেন্ট লেখা,
+# পড়ার সময় সব সেগমেন্ট memory-map করে zero-copy জোড়া লাগানো হয় (CSV/datetime পার্সিং নেই)।
+# কম্প্যাকশন base-NNNNNN.arrow লেখে = part-NNNNNN পর্যন্ত সব রো; রিডার base এর পরের part গুলোই শুধু দেখে,
+# তাই মাঝপথে ক্র্যাশ হলেও (পুরোনো সেগমেন্ট তখনো মোছা হয়নি) কোনো রো দুবার পড়া হয় না।
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+CSV_CANDLE_HEADER = ['datetime'] + CANDLE_COLUMNS
+CSV_TRADE_HEADER = ['id', 'timestamp', 'datetime', 'symbol', 'side', 'price', 'amount', 'cost']
+
+if pa is not None:
+    CANDLE_SCHEMA = pa.schema([('timestamp', pa.int64())] + [(c, pa.float64()) for c in CANDLE_COLUMNS])
+    TRADE_SCHEMA = pa.schema([
+        ('id', pa.string()), ('timestamp', pa.int64()), ('symbol', pa.string()), ('side', pa.string()),
+        ('price', pa.float64()), ('amount', pa.float64()), ('cost', pa.float64()),
+    ])
+
+
+def feed_stem(filename):
+    return filename[:-4] if filename.endswith('.csv') else filename
+
+
+class FeedWriter:
+    """
+    ডাউনলোড টাস্কের জন্য append writer। raw রো (CSV এর মতো একই ক্রমে) বাফারে জমিয়ে
+    segment_rows হলে নতুন সেগমেন্ট হিসেবে লেখে, তাই মাঝপথে থামলেও আগের সেগমেন্টগুলো অক্ষত থাকে।
+    """
+
+    def __init__(self, store, filename, kind, segment_rows=None):
+        self.store = store
+        self.filename = filename
+        self.kind = kind
+        self.segment_rows = segment_rows or settings.FEED_SEGMENT_ROWS
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, rows):
+        self.rows.extend(rows)
+        if len(self.rows) >= self.segment_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        if self.kind == 'candles':
+            data = np.asarray(rows, dtype='float64')
+            columns = {'timestamp': data[:, 0].astype('int64')}
+            columns.update({c: data[:, i + 1] for i, c in enumerate(CANDLE_COLUMNS)})
+            table = pa.table(columns, schema=CANDLE_SCHEMA)
+        else:
+            # trades: CSV এর datetime স্ট্রিং কলাম বাদ, timestamp থেকেই তৈরি হয়
+            table = pa.table({
+                'id': [str(r[0]) for r in rows],
+                'timestamp': [int(r[1]) for r in rows],
+                'symbol': [r[3] for r in rows],
+                'side': [r[4] for r in rows],
+                'price': [r[5] for r in rows],
+                'amount': [r[6] for r in rows],
+                'cost': [r[7] for r in rows],
+            }, schema=TRADE_SCHEMA)
+        self.store.append(self.filename, table)
+
+    def close(self):
+        self.flush()
+        if len(self.store.segments(self.filename)) > settings.FEED_MAX_SEGMENTS:
+            self.store.compact(self.filename)
+
+
+def manifest_path(csv_path):
+    return csv_path + ".manifest.json"
+
+
+def read_manifest(csv_path):
+    try:
+        with open(manifest_path(csv_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(csv_path, manifest):
+    # tmp এ লিখে rename, তাই ক্র্যাশ হলেও পুরোনো বা নতুন যেকোনো একটি সম্পূর্ণ ম্যানিফেস্ট থাকে
+    tmp_path = f"{manifest_path(csv_path)}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path(csv_path))
+
+
+def _row_timestamp(kind, fields):
+    if kind == 'candles':
+        return int(datetime.strptime(fields[0], "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+    return int(fields[1])
+
+
+def recover_csv_feed(csv_path, kind):
+    """
+    CSV ফিড resume এর আগে ম্যানিফেস্ট যাচাই করে শেষ timestamp রিটার্ন করে (ফাইল না থাকলে None)।
+    - ম্যানিফেস্ট ঠিক থাকলে: শেষ পেজের checksum মিলিয়ে, offset এর পরের (ম্যানিফেস্টে ওঠেনি এমন) বাইট কেটে ফেলা — O(1)
+    - ম্যানিফেস্ট না থাকলে/না মিললে: শেষ থেকে seek করে অর্ধেক লেখা শেষ রো কেটে ফেলে ম্যানিফেস্ট নতুন করে তৈরি
+    """
+    if not os.path.exists(csv_path):
+        return None
+    size = os.path.getsize(csv_path)
+    manifest = read_manifest(csv_path)
+    if manifest and manifest.get("kind") == kind and size >= manifest["offset"]:
+        with open(csv_path, 'rb+') as f:
+            f.seek(manifest["page_offset"])
+            page = f.read(manifest["offset"] - manifest["page_offset"])
+            if zlib.crc32(page) == manifest["checksum"]:
+                if size > manifest["offset"]:
+                    print(f"✂️ Truncating {size - manifest['offset']} unflushed bytes from {os.path.basename(csv_path)}")
+                    f.truncate(manifest["offset"])
+                return manifest["last_timestamp"]
+
+    # পুরোনো ফিড (ম্যানিফেস্ট নেই) বা ম্যানিফেস্ট ফাইলের সাথে মেলে না: একবার স্ক্যান করে নতুন ম্যানিফেস্ট
+    print(f"🔎 Rebuilding resume manifest for {os.path.basename(csv_path)}")
+    with open(csv_path, 'rb+') as f:
+        # ফাইলের শেষে newline না থাকলে শেষ রো অর্ধেক লেখা, সেটি কেটে ফেলা
+        end = size
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b'\n':
+                while end > 0:
+                    block = max(0, end - 65536)
+                    f.seek(block)
+                    cut = f.read(end - block).rfind(b'\n')
+                    if cut >= 0:
+                        end = block + cut + 1
+                        break
+                    end = block
+                f.truncate(end)
+
+        rows, last_ts, last_line, page_offset = 0, None, b"", 0
+        f.seek(0)
+        header = f.readline()
+        for line in f:
+            rows += 1
+            page_offset = f.tell() - len(line)
+            last_line = line
+        if last_line.strip():
+            try:
+                last_ts = _row_timestamp(kind, last_line.decode().strip().split(','))
+            except (ValueError, IndexError):
+                last_ts = None
+        if not rows:
+            page_offset, last_line = 0, header
+
+    write_manifest(csv_path, {
+        "kind": kind, "last_timestamp": last_ts, "rows": rows,
+        "offset": end, "page_offset": page_offset, "checksum": zlib.crc32(last_line),
+    })
+    return last_ts
+
+
+class CsvFeedWriter:
+    """
+    pyarrow না থাকলে বা বাইনারি ফিড বন্ধ থাকলে আগের CSV ফরম্যাটে append।
+    প্রতিটি পেজ লেখার পর পাশের {file}.manifest.json (শেষ timestamp, রো সংখ্যা, বাইট offset, শেষ পেজের crc32)
+    atomically আপডেট হয়, তাই resume করতে পুরো ফাইল পড়তে হয় না।
+    """
+
+    def __init__(self, path, kind):
+        self.path = path
+        self.kind = kind
+        # অসম্পূর্ণ শেষ পেজ কেটে ম্যানিফেস্টের offset থেকেই append শুরু
+        recover_csv_feed(path, kind)
+        self.manifest = read_manifest(path) if os.path.exists(path) else None
+        self.file = open(path, 'ab')
+        if self.manifest is None or os.path.getsize(path) == 0:
+            self.manifest = {"kind": kind, "last_timestamp": None, "rows": 0, "offset": 0, "page_offset": 0, "checksum": 0}
+            header = CSV_CANDLE_HEADER if kind == 'candles' else CSV_TRADE_HEADER
+            self._write_page([header], None, 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, rows):
+        if not rows:
+            return
+        last_ts = int(rows[-1][0] if self.kind == 'candles' else rows[-1][1])
+        if self.kind == 'candles':
+            rows = [[datetime.fromtimestamp(r[0] / 1000).strftime('%Y-%m-%d %H:%M:%S')] + list(r[1:6]) for r in rows]
+        self._write_page(rows, last_ts, len(rows))
+
+    def _write_page(self, rows, last_ts, row_count):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        page = buffer.getvalue().encode()
+        page_offset = self.file.tell()
+        self.file.write(page)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.manifest.update({
+            "last_timestamp": last_ts if last_ts is not None else self.manifest["last_timestamp"],
+            "rows": self.manifest["rows"] + row_count,
+            "offset": page_offset + len(page),
+            "page_offset": page_offset,
+            "checksum": zlib.crc32(page),
+        })
+        write_manifest(self.path, self.manifest)
+
+    def close(self):
+        self.file.close()
+
+
+def _segment_index(path):
+    # part-000012.arrow / base-000012.arrow -> 12
+    return int(os.path.basename(path)[5:11])
+
+
+def _write_segment(path, table):
+    # অর্ধেক লেখা সেগমেন্ট যেন কখনো পড়া না হয়: tmp এ লিখে rename
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+class FeedStore:
+    def __init__(self, root=None):
+        self.root = root or "app/data_feeds"
+
+    @property
+    def enabled(self):
+        return pa is not None and settings.DATA_FEED_BINARY
+
+    def feed_dir(self, filename):
+        return os.path.join(self.root, feed_stem(filename) + ".feed")
+
+    def csv_path(self, filename):
+        return os.path.join(self.root, feed_stem(filename) + ".csv")
+
+    def exists(self, filename):
+        return pa is not None and bool(self.segments(filename))
+
+    def segments(self, filename):
+        feed_dir = self.feed_dir(filename)
+        parts = sorted(glob.glob(os.path.join(feed_dir, "part-*.arrow")))
+        bases = sorted(glob.glob(os.path.join(feed_dir, "base-*.arrow")))
+        if not bases:
+            return parts
+        # সর্বশেষ base এর আওতার part (এবং পুরোনো base) কম্প্যাকশনের বাকি থাকা আবর্জনা
+        through = _segment_index(bases[-1])
+        return [bases[-1]] + [p for p in parts if _segment_index(p) > through]
+
+    def list_feeds(self, prefix=""):
+        """data_feeds এর সব লজিক্যাল ফাইলনাম (.feed ও .csv দুটোই, একই নাম একবার)।"""
+        if not os.path.isdir(self.root):
+            return []
+        names = set()
+        for entry in os.listdir(self.root):
+            if not entry.startswith(prefix):
+                continue
+            if entry.endswith(".csv"):
+                names.add(entry)
+            elif entry.endswith(".feed") and os.path.isdir(os.path.join(self.root, entry)):
+                names.add(entry[:-5] + ".csv")
+        return sorted(names)
+
+    def writer(self, filename, kind):
+        """kind: 'candles' বা 'trades'"""
+        if self.enabled:
+            return FeedWriter(self, filename, kind)
+        return CsvFeedWriter(self.csv_path(filename), kind)
+
+    def append(self, filename, table):
+        feed_dir = self.feed_dir(filename)
+        os.makedirs(feed_dir, exist_ok=True)
+        existing = self.segments(filename)
+        index = _segment_index(existing[-1]) + 1 if existing else 0
+        path = os.path.join(feed_dir, f"part-{index:06d}.arrow")
+        _write_segment(path, table)
+        return path
+
+    def open_table(self, filename, columns=None):
+        """সব সেগমেন্ট memory-map করে একটি pa.Table (কপি ছাড়া)। ফিড না থাকলে None।"""
+        segments = self.segments(filename)
+        if not segments:
+            return None
+        tables = []
+        for path in segments:
+            table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            tables.append(table.select(columns) if columns else table)
+        return pa.concat_tables(tables)
+
+    def last_timestamp(self, filename):
+        segments = self.segments(filename)
+        if not segments:
+            return None
+        reader = pa.ipc.open_file(pa.memory_map(segments[-1], 'r'))
+        timestamps = reader.get_batch(reader.num_record_batches - 1).column('timestamp')
+        return int(timestamps[len(timestamps) - 1].as_py()) if len(timestamps) else None
+
+    def resume_timestamp(self, filename, kind):
+        """ডাউনলোড resume এর জন্য শেষ সেভ হওয়া timestamp (বাইনারি ফিড বা ম্যানিফেস্টসহ CSV)।"""
+        if self.enabled:
+            return self.last_timestamp(filename)
+        return recover_csv_feed(self.csv_path(filename), kind)
+
+    def compact(self, filename):
+        """অনেকগুলো ছোট সেগমেন্ট (বারবার resume) একটি সেগমেন্টে জোড়া লাগানো।"""
+        segments = self.segments(filename)
+        if len(segments) > 1:
+            table = self.open_table(filename).combine_chunks()
+            # rename হওয়ার মুহূর্তেই রিডাররা base দেখে এবং পুরোনো সেগমেন্ট উপেক্ষা করে
+            _write_segment(os.path.join(self.feed_dir(filename), f"base-{_segment_index(segments[-1]):06d}.arrow"), table)
+        # আগের কোনো কম্প্যাকশন ক্র্যাশ করে থাকলে তার বাকি আবর্জনাও এখানে মোছা হয়
+        live = set(self.segments(filename))
+        for pattern in ("part-*.arrow", "base-*.arrow"):
+            for path in glob.glob(os.path.join(self.feed_dir(filename), pattern)):
+                if path not in live:
+                    os.remove(path)
+
+    def remove(self, filename):
+        shutil.rmtree(self.feed_dir(filename), ignore_errors=True)
+
+    def watermark(self, filename):
+        """ব্যাকটেস্ট রেজাল্ট ক্যাশের জন্য: নতুন সেগমেন্ট বা কম্প্যাকশন হলে বদলে যায়।"""
+        return [[os.path.basename(p), os.stat(p).st_mtime_ns, os.stat(p).st_size] for p in self.segments(filename)]
+
+    def load_candles(self, filename):
+        """
+        ব্যাকটেস্টের জন্য ক্যান্ডেল DataFrame (index='datetime', OHLCV)।
+        CSV তে datetime.fromtimestamp() এর লোকাল সময় লেখা হতো, তাই এখানেও লোকাল naive সময়।
+        """
+        table = self.open_table(filename, ['timestamp'] + CANDLE_COLUMNS)
+        timestamps = table.column('timestamp').to_numpy()
+        df = pd.DataFrame({c: table.column(c).to_numpy() for c in CANDLE_COLUMNS}, copy=False)
+        index = ms_to_local_naive(timestamps) if len(timestamps) else pd.DatetimeIndex([])
+        df.index = index.astype('datetime64[ns]').rename('datetime')
+        return df
+
+    def iter_trade_batches(self, filename, chunk_rows):
+        """ট্রেড ফিড থেকে datetime (UTC) ইনডেক্সসহ price/amount চাঙ্ক, CSV চাঙ্কের মতোই।"""
+        table = self.open_table(filename, ['timestamp', 'price', 'amount'])
+        for offset in range(0, table.num_rows, chunk_rows):
+            part = table.slice(offset, chunk_rows)
+            index = pd.to_datetime(part.column('timestamp').to_numpy(), unit='ms', utc=True).as_unit('ns').rename('datetime')
+            yield pd.DataFrame({
+                'price': part.column('price').to_numpy(),
+                'amount': part.column('amount').to_numpy(),
+            }, index=index), (offset + part.num_rows) / max(table.num_rows, 1)
+
+    def migrate_csv(self, filename, chunk_rows=1_000_000, delete_csv=False):
+        """
+        পুরোনো CSV ফিড বাইনারি ফিডে রূপান্তর (চাঙ্কে পড়া হয়, প্রতিটি চাঙ্ক একটি সেগমেন্ট)।
+        রূপান্তরিত রো সংখ্যা রিটার্ন করে; স্ট্যান্ডার্ড ক্যান্ডেল/ট্রেড হেডার না হলে None।
+        """
+        csv_path = self.csv_path(filename)
+        with open(csv_path) as f:
+            header = [c.strip().lower() for c in f.readline().strip().split(',')]
+        if header == CSV_TRADE_HEADER:
+            kind = 'trades'
+        elif header[:len(CSV_CANDLE_HEADER)] == CSV_CANDLE_HEADER:
+            kind = 'candles'
+        else:
+            return None
+        # ক্র্যাশে অর্ধেক লেখা শেষ রো থাকলে সেটি বাদ দিয়ে মাইগ্রেশন
+        recover_csv_feed(csv_path, kind)
+
+        # আগের অর্ধেক মাইগ্রেশন থাকলে মুছে নতুন করে
+        tmp_name = feed_stem(filename) + f".migrating-{uuid.uuid4().hex[:8]}"
+        rows = 0
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunk_rows, dtype={'id': str} if kind == 'trades' else None):
+                chunk.columns = [c.strip().lower() for c in chunk.columns]
+                if kind == 'candles':
+                    stamps = pd.to_datetime(chunk['datetime'])
+                    table = pa.table({
+                        'timestamp': local_naive_to_ms(stamps),
+                        **{c: chunk[c].to_numpy(dtype='float64') for c in CANDLE_COLUMNS},
+                    }, schema=CANDLE_SCHEMA)
+                else:
+                    table = pa.table({
+                        'id': chunk['id'].astype(str).to_numpy(),
+                        'timestamp': chunk['timestamp'].to_numpy(dtype='int64'),
+                        'symbol': chunk['symbol'].astype(str).to_numpy(),
+                        'side': chunk['side'].astype(str).to_numpy(),
+                        **{c: chunk[c].to_numpy(dtype='float64') for c in ['price', 'amount', 'cost']},
+                    }, schema=TRADE_SCHEMA)
+                self.append(tmp_name, table)
+                rows += len(chunk)
+
+            self.remove(filename)
+            if os.path.isdir(self.feed_dir(tmp_name)):
+                os.replace(self.feed_dir(tmp_name), self.feed_dir(filename))
+        finally:
+            self.remove(tmp_name)
+
+        if delete_csv:
+            os.remove(csv_path)
+            if os.path.exists(manifest_path(csv_path)):
+                os.remove(manifest_path(csv_path))
+        return rows
+
+
+def local_naive_to_ms(stamps):
+    """ms_to_local_naive এর উল্টো: CSV এর লোকাল naive datetime কলাম -> epoch-ms।"""
+    stamps = pd.Series(stamps)
+    if stamps.empty:
+        return np.empty(0, dtype='int64')
+    first = stamps.iloc[0].to_pydatetime()
+    last = stamps.iloc[-1].to_pydatetime()
+    naive_ms = stamps.to_numpy(dtype='datetime64[ms]').astype('int64')
+    first_offset = int(first.timestamp() * 1000) - int(naive_ms[0])
+    last_offset = int(last.timestamp() * 1000) - int(naive_ms[-1])
+    if first_offset == last_offset:
+        return naive_ms + first_offset
+    return np.array([int(ts.timestamp() * 1000) for ts in stamps.dt.to_pydatetime()], dtype='int64')
+
+
+feed_store = FeedStore()
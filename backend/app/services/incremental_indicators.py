@@ -0,0 +1,237 @@
+import math
+from collections import deque, namedtuple
+import pandas as pd
+
+# -----------------------------------------------------------
+# Incremental Indicators (Live Bots)
+# -----------------------------------------------------------
+# লাইভ বট প্রতিবার পুরো উইন্ডোর ইন্ডিকেটর আবার হিসাব না করে শুধু নতুন ক্যান্ডেল দিয়ে O(1) আপডেট করে।
+# মানগুলো Backtrader (এবং vectorized_backtest) এর সংজ্ঞার সাথে মেলে:
+#   - EMA: প্রথম period ভ্যালুর SMA দিয়ে সিড, তারপর prev * (1 - alpha) + x * alpha
+#   - RSI/ATR: Wilder smoothing (alpha = 1 / period)
+#   - Bollinger: StdDev = sqrt(|mean(x^2) - mean(x)^2|)
+# update(bar) একটি closed ক্যান্ডেল যোগ করে; peek(bar) চলমান ক্যান্ডেলটি এখন ক্লোজ হলে মান কী হত তা দেয়
+# (স্টেট বদলায় না)। bar হলো [ts, open, high, low, close, volume]।
+
+NAN = float('nan')
+
+MacdValue = namedtuple('MacdValue', ['macd', 'signal', 'histo'])
+BandsValue = namedtuple('BandsValue', ['mid', 'top', 'bot'])
+
+
+def is_nan(value):
+    return value is None or value != value
+
+
+class IncrementalIndicator:
+    source = 4  # bar এর কোন ফিল্ড (ডিফল্ট close)
+
+    def update(self, bar):
+        return self.push(bar[self.source])
+
+    def peek(self, bar):
+        return self.preview(bar[self.source])
+
+    def push(self, value):
+        raise NotImplementedError
+
+    def preview(self, value):
+        raise NotImplementedError
+
+
+class SMA(IncrementalIndicator):
+    # চলমান যোগফলের floating-point drift এড়াতে মাঝে মাঝে fsum দিয়ে আবার যোগ
+    RESYNC_EVERY = 1000
+
+    def __init__(self, period):
+        self.period = int(period)
+        self.window = deque(maxlen=self.period)
+        self.total = 0.0
+        self.value = NAN
+        self._pushes = 0
+
+    def push(self, value):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(self.window)
+        self.value = self.total / self.period if len(self.window) == self.period else NAN
+        return self.value
+
+    def preview(self, value):
+        count = min(len(self.window) + 1, self.period)
+        if count < self.period:
+            return NAN
+        oldest = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - oldest + value) / self.period
+
+
+class EMA(IncrementalIndicator):
+    def __init__(self, period, alpha=None):
+        self.period = int(period)
+        self.alpha = alpha if alpha is not None else 2.0 / (1.0 + self.period)
+        self.alpha1 = 1.0 - self.alpha
+        self.seed = []
+        self.value = NAN
+
+    def push(self, value):
+        # সিগনাল লাইনের মতো ইনপুট শুরুতে NaN হলে প্রথম ভ্যালিড মান থেকে গণনা
+        if is_nan(value):
+            return self.value
+        if self.seed is not None:
+            self.seed.append(value)
+            if len(self.seed) == self.period:
+                self.value = math.fsum(self.seed) / self.period
+                self.seed = None
+            return self.value
+        self.value = self.value * self.alpha1 + value * self.alpha
+        return self.value
+
+    def preview(self, value):
+        if is_nan(value):
+            return self.value
+        if self.seed is not None:
+            if len(self.seed) + 1 < self.period:
+                return NAN
+            return math.fsum(self.seed + [value]) / self.period
+        return self.value * self.alpha1 + value * self.alpha
+
+
+class RSI(IncrementalIndicator):
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.up = EMA(self.period, alpha=1.0 / self.period)
+        self.down = EMA(self.period, alpha=1.0 / self.period)
+        self.prev = None
+        self.value = NAN
+
+    @staticmethod
+    def _rsi(up, down):
+        if is_nan(up) or is_nan(down):
+            return NAN
+        if down == 0:
+            return 100.0 if up > 0 else NAN
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+    def push(self, value):
+        if self.prev is not None:
+            delta = value - self.prev
+            self.value = self._rsi(self.up.push(max(delta, 0.0)), self.down.push(max(-delta, 0.0)))
+        self.prev = value
+        return self.value
+
+    def preview(self, value):
+        if self.prev is None:
+            return NAN
+        delta = value - self.prev
+        return self._rsi(self.up.preview(max(delta, 0.0)), self.down.preview(max(-delta, 0.0)))
+
+
+class MACD(IncrementalIndicator):
+    def __init__(self, period_me1=12, period_me2=26, period_signal=9):
+        self.me1 = EMA(period_me1)
+        self.me2 = EMA(period_me2)
+        self.signal = EMA(period_signal)
+        self.value = MacdValue(NAN, NAN, NAN)
+
+    @staticmethod
+    def _value(macd, signal):
+        return MacdValue(macd, signal, macd - signal if not is_nan(signal) else NAN)
+
+    def push(self, value):
+        macd = self.me1.push(value) - self.me2.push(value)
+        self.value = self._value(macd, self.signal.push(macd) if not is_nan(macd) else NAN)
+        return self.value
+
+    def preview(self, value):
+        macd = self.me1.preview(value) - self.me2.preview(value)
+        return self._value(macd, self.signal.preview(macd) if not is_nan(macd) else NAN)
+
+
+class BollingerBands(IncrementalIndicator):
+    def __init__(self, period=20, devfactor=2.0):
+        self.devfactor = devfactor
+        self.mean = SMA(period)
+        self.mean_sq = SMA(period)
+        self.value = BandsValue(NAN, NAN, NAN)
+
+    def _bands(self, mid, mean_sq):
+        std = math.sqrt(abs(mean_sq - mid * mid)) if not is_nan(mid) else NAN
+        return BandsValue(mid, mid + self.devfactor * std, mid - self.devfactor * std)
+
+    def push(self, value):
+        self.value = self._bands(self.mean.push(value), self.mean_sq.push(value * value))
+        return self.value
+
+    def preview(self, value):
+        return self._bands(self.mean.preview(value), self.mean_sq.preview(value * value))
+
+
+class ATR(IncrementalIndicator):
+    def __init__(self, period=14):
+        self.period = int(period)
+        self.smoothed = EMA(self.period, alpha=1.0 / self.period)
+        self.prev_close = None
+        self.value = NAN
+
+    def _true_range(self, bar):
+        high, low = bar[2], bar[3]
+        return max(high, self.prev_close) - min(low, self.prev_close)
+
+    def update(self, bar):
+        if self.prev_close is not None:
+            self.value = self.smoothed.push(self._true_range(bar))
+        self.prev_close = bar[4]
+        return self.value
+
+    def peek(self, bar):
+        if self.prev_close is None:
+            return NAN
+        return self.smoothed.preview(self._true_range(bar))
+
+
+class IndicatorSet:
+    """
+    নাম -> ইন্ডিকেটর। ক্যান্ডেলের timestamp দেখে শুধু নতুন closed ক্যান্ডেলগুলো ফিড করে, তাই একই উইন্ডো
+    বারবার দিলেও প্রতি কলে কাজ হয় শুধু নতুন বারের।
+    """
+
+    def __init__(self, **indicators):
+        self.indicators = indicators
+        self.last_ts = None
+        self.values = {name: indicator.value for name, indicator in indicators.items()}
+
+    def update(self, bar):
+        if self.last_ts is not None and bar[0] <= self.last_ts:
+            return self.values
+        self.last_ts = bar[0]
+        self.values = {name: indicator.update(bar) for name, indicator in self.indicators.items()}
+        return self.values
+
+    def update_frame(self, df, forming=False):
+        """
+        timestamp কলামসহ OHLCV DataFrame থেকে last_ts এর পরের closed রোগুলো ফিড করা। forming=True হলে শেষ
+        রোটি চলমান ক্যান্ডেল: সেটি কমিট না করে peek মান রিটার্ন হয়।
+        """
+        timestamps = df['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = timestamps.to_numpy('datetime64[ns]').astype('int64')
+        else:
+            timestamps = timestamps.to_numpy('int64')
+        values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+
+        closed = len(df) - 1 if forming else len(df)
+        start = 0
+        if self.last_ts is not None:
+            start = int(timestamps[:closed].searchsorted(self.last_ts, side='right'))
+        for i in range(start, closed):
+            self.update([timestamps[i], *values[i]])
+        if forming and len(df):
+            return self.peek([timestamps[-1], *values[-1]])
+        return self.values
+
+    def peek(self, bar):
+        return {name: indicator.peek(bar) for name, indicator in self.indicators.items()}
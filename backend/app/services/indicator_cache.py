@@ -0,0 +1,54 @@
+import hashlib
+from collections import OrderedDict
+from app.core.config import settings
+
+
+def data_fingerprint(values):
+    """অ্যারের কন্টেন্ট থেকে ছোট হ্যাশ (একই ক্যান্ডেল ডাটা = একই fingerprint)।"""
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+class IndicatorCache:
+    """
+    (data fingerprint, indicator, params) কী দিয়ে ইন্ডিকেটর অ্যারে রাখার LRU ক্যাশ।
+    অপটিমাইজার গ্রিডে একই period এর SMA/EMA বারবার হিসাব না করে একবার হিসাব করে রিইউজ করা হয়।
+    প্রতিটি প্রসেসের নিজস্ব ক্যাশ থাকে (প্যারালাল ওয়ার্কাররাও আলাদা ক্যাশ ব্যবহার করে)।
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self._store = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        if key in self._store:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return self._store[key]
+
+        self.misses += 1
+        value = compute()
+        if self.max_size > 0:
+            # ক্যাশ করা অ্যারে শেয়ার হয়, তাই ভুলবশত মডিফাই হওয়া আটকাতে read-only করা হয়
+            for arr in (value if isinstance(value, tuple) else (value,)):
+                arr.flags.writeable = False
+            self._store[key] = value
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+        return value
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._store)}
+
+    def clear(self):
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._store)
+
+
+# প্রসেস-লেভেল শেয়ার্ড ইনস্ট্যান্স
+indicator_cache = IndicatorCache(max_size=settings.INDICATOR_CACHE_SIZE)
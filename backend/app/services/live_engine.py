@@ -1,17 +1,32 @@
 import ccxt
 import time
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 import redis # ✅ Redis ইমপোর্ট
 from app import models
 from app.utils import get_redis_client
 from app.core.config import settings
+from app.services.market_stream import LiveCandleFeed
+from app.services.market_hub import market_hub
+from app.services.incremental_indicators import IndicatorSet, RSI
+from app.services.live_strategy import create_live_runner
 
 # ✅ Sync Redis Client (লগ পাঠানোর জন্য)
 redis_log_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+# সুপারভাইজারে অনেক বট একটি event loop শেয়ার করে, তাই publish লুপে নয়, একটি থ্রেডে (ক্রম ঠিক রাখতে একটাই)
+log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-log")
+
+
+def publish_log(payload):
+    try:
+        # 'bot_logs' নামক মেইন চ্যানেলে সব লগ পাঠানো হচ্ছে
+        redis_log_client.publish("bot_logs", payload)
+    except Exception as e:
+        print(f"⚠️ Redis Publish Error: {e}")
+
 
 class LiveBotEngine:
     def __init__(self, bot: models.Bot, db_session):
@@ -42,9 +57,23 @@ class LiveBotEngine:
         # Position State
         self.position = { "amount": 0.0, "entry_price": 0.0, "tp_hits": [] }
 
+        # ইন্ক্রিমেন্টাল ইন্ডিকেটর: প্রতি সিগনাল চেকে শুধু নতুন ক্যান্ডেল ফিড হয় (পুরো উইন্ডো আবার নয়)
+        self.indicators = IndicatorSet(rsi=RSI(14))
+
+        # বটের আসল Backtrader স্ট্র্যাটেজি (run() এ তৈরি হয়; না পেলে RSI ডেমো)
+        self.strategy_runner = None
+        self._strategy_last_ts = None
+
         # Exchange Setup
         exchange_options = { 'enableRateLimit': True, 'options': {'defaultType': self.deployment_target} }
         self.exchange = ccxt.binance(exchange_options)
+        self.exchange_options = exchange_options
+
+        # ডাটা মোড: 'stream' (WebSocket, ক্যান্ডেল ক্লোজে রিঅ্যাক্ট) অথবা 'poll' (আগের মতো REST)
+        default_mode = 'stream' if settings.LIVE_STREAMING_ENABLED else 'poll'
+        self.data_mode = str(self.config.get('dataMode', default_mode)).lower()
+        # সুপারভাইজারে চললে স্টপ সিগনাল সুপারভাইজার দেখে (বট প্রতি Redis polling বন্ধ)
+        self.watch_stop = True
 
     # ✅ সেন্ট্রাল লগিং সিস্টেম (Redis দিয়ে)
     def log(self, message: str, type: str = "INFO"):
@@ -62,11 +91,7 @@ class LiveBotEngine:
                 "message": message
             }
         }
-        try:
-            # 'bot_logs' নামক মেইন চ্যানেলে সব লগ পাঠানো হচ্ছে
-            redis_log_client.publish("bot_logs", json.dumps(log_payload))
-        except Exception as e:
-            print(f"⚠️ Redis Publish Error: {e}")
+        log_executor.submit(publish_log, json.dumps(log_payload))
 
     # ... (setup_futures_settings, fetch_market_data, check_strategy_signal, monitor_risk_management, execute_trade আগের মতোই থাকবে) ...
     # এখানে সংক্ষেপ করা হয়েছে, আপনি আপনার লজিকগুলো অপরিবর্তিত রাখুন
@@ -91,13 +116,17 @@ class LiveBotEngine:
             self.log(f"Data Fetch Error: {e}", "ERROR")
             return None
 
-    def check_strategy_signal(self, df):
+    def check_strategy_signal(self, df, forming=False):
+        # forming=True হলে শেষ রো চলমান ক্যান্ডেল: কমিট না করে শুধু peek
+        values = self.indicators.update_frame(df, forming=forming)
+        return self.evaluate_signal(values, df.iloc[-1]['close'])
+
+    def evaluate_signal(self, values, price):
         # ... (আপনার স্ট্র্যাটেজি লজিক এখানে থাকবে) ...
         # ডেমো হিসেবে RSI:
-        df['rsi'] = ta.rsi(df['close'], length=14)
-        rsi = df['rsi'].iloc[-1]
-        if rsi < 30: return "BUY", f"RSI Oversold ({rsi:.2f})", df.iloc[-1]['close']
-        return "HOLD", "", df.iloc[-1]['close']
+        rsi = values['rsi']
+        if rsi < 30: return "BUY", f"RSI Oversold ({rsi:.2f})", price
+        return "HOLD", "", price
 
     async def monitor_risk_management(self, current_price):
         # ... (আপনার রিস্ক লজিক) ...
@@ -108,18 +137,128 @@ class LiveBotEngine:
         self.log(f"EXECUTING {signal} | {reason} | Price: {price}", "TRADE")
         return True
 
+    async def run(self, adapter=None):
+        if self.bot.strategy and self.strategy_runner is None:
+            try:
+                self.strategy_runner = await asyncio.to_thread(
+                    create_live_runner, self.bot.strategy, self.config.get('strategyParams', {})
+                )
+            except Exception as e:
+                self.log(f"Strategy Load Error: {e}", "ERROR")
+            if self.strategy_runner is None:
+                self.log(f"Strategy '{self.bot.strategy}' not found, using RSI demo signal", "ERROR")
+        try:
+            if self.data_mode == 'stream':
+                await self.run_stream(adapter)
+            else:
+                await self.run_loop()
+        finally:
+            if self.strategy_runner is not None:
+                await asyncio.to_thread(self.strategy_runner.stop)
+
+    async def run_strategy_bars(self, bars):
+        """নতুন closed বারগুলো লাইভ স্ট্র্যাটেজিতে পাঠানো (প্রথমবার আগের বারগুলো দিয়ে warm-up)।"""
+        runner = self.strategy_runner
+        bars = [bar for bar in bars if self._strategy_last_ts is None or bar[0] > self._strategy_last_ts]
+        if not bars:
+            return
+        self._strategy_last_ts = bars[-1][0]
+        if not runner.live:
+            await runner.warm_up(bars[:-1])
+            bars = bars[-1:]
+        for bar in bars:
+            for signal in await runner.push(bar):
+                self.log(f"🔔 {signal.action} Signal: {signal.reason}", "TRADE")
+                await self.execute_trade(signal.action, signal.price, signal.reason, signal.size_pct)
+
+    async def on_signal(self, signal, reason, price):
+        if signal == "BUY" and self.position["amount"] <= 0:
+            self.log(f"🔔 Buy Signal: {reason}", "TRADE")
+            await self.execute_trade("BUY", price, reason)
+
+    async def on_candle_close(self, feed, candle):
+        # স্ট্রিমে শুধু closed ক্যান্ডেলের উপর সিগনাল (চলমান ক্যান্ডেলে রিপেইন্ট হয় না)
+        if self.strategy_runner is not None:
+            await self.run_strategy_bars(list(feed.closed) if not self.strategy_runner.live else [candle])
+            return
+        if self.indicators.last_ts is None:
+            # প্রথম ক্লোজে ফিডের হিস্টোরি দিয়ে ইন্ডিকেটর warm-up
+            for bar in list(feed.closed):
+                self.indicators.update(bar)
+        values = self.indicators.update(candle)
+        if self.position["amount"] <= 0:
+            await self.on_signal(*self.evaluate_signal(values, candle[4]))
+
+    async def _watch_stop_signal(self, main_task):
+        task_key = f"bot_task:{self.bot.id}"
+        while True:
+            await asyncio.sleep(settings.LIVE_STOP_POLL_SECONDS)
+            # সিঙ্ক Redis কল থ্রেডে, যাতে স্ট্রিমের event loop আটকে না যায়
+            if not await asyncio.to_thread(self.redis.exists, task_key):
+                main_task.cancel()
+                return
+
+    async def run_stream(self, adapter=None):
+        """
+        kline স্ট্রিম শুনে ক্যান্ডেল ক্লোজ হওয়ামাত্র স্ট্র্যাটেজি চালায়, প্রতিটি টিকে রিস্ক মনিটর করে।
+        REST শুধু শুরুতে হিস্টোরি আর LIVE_RECONCILE_SECONDS পরপর reconciliation এ।
+        """
+        self.log(f"🚀 Bot {self.bot.name} Started on {self.symbol} (streaming)", "SYSTEM")
+        stop_watcher = asyncio.create_task(self._watch_stop_signal(asyncio.current_task())) if self.watch_stop else None
+        subscription = None
+        try:
+            if adapter is not None:
+                # নিজস্ব adapter (যেমন রিপ্লে) দিলে হাব ছাড়া সরাসরি ফিড
+                feed = LiveCandleFeed(adapter, self.symbol, self.timeframe, log=self.log)
+                events = feed.events()
+            else:
+                # একই symbol/timeframe এর সব বট হাবের একটি ফিড শেয়ার করে
+                subscription = await market_hub.subscribe(
+                    self.symbol, self.timeframe, 'binance', self.deployment_target, log=self.log
+                )
+                feed, events = subscription.feed, subscription
+
+            async for event, candle in events:
+                try:
+                    if event == "close":
+                        latency_ms = time.time() * 1000 - (candle[0] + feed.tf_ms)
+                        self.log(f"Candle closed @ {candle[4]} (+{latency_ms:.0f} ms)", "WAIT")
+                        await self.on_candle_close(feed, candle)
+                    elif self.position["amount"] > 0:
+                        await self.monitor_risk_management(candle[4])
+                except Exception as e:
+                    self.log(f"Loop Error: {e}", "ERROR")
+        except asyncio.CancelledError:
+            self.log(f"🛑 Stopping Bot {self.bot.name}...", "SYSTEM")
+            if not self.watch_stop:
+                # সুপারভাইজারের cancel (স্টপ/rebalance) সুপারভাইজার পর্যন্ত পৌঁছানো দরকার
+                raise
+        finally:
+            if stop_watcher:
+                stop_watcher.cancel()
+            if subscription is not None:
+                await market_hub.unsubscribe(subscription)
+            elif adapter is not None:
+                try:
+                    await adapter.close()
+                except Exception:
+                    pass
+
+        self.log("Bot Stopped Successfully.", "SYSTEM")
+
     async def run_loop(self):
         task_key = f"bot_task:{self.bot.id}"
         
         self.log(f"🚀 Bot {self.bot.name} Started on {self.symbol}", "SYSTEM")
 
+        # সুপারভাইজারে একই event loop এ অনেক বট চলে, তাই সিঙ্ক ccxt/Redis কল থ্রেডে
         if self.deployment_target == 'future':
-            try: self.exchange.load_markets() 
-            except: pass
+            try: await asyncio.to_thread(self.exchange.load_markets)
+            except Exception: pass
 
         while True:
-            # স্টপ সিগনাল চেক
-            if not self.redis.exists(task_key):
+            # স্টপ সিগনাল চেক (সুপারভাইজারে চললে সুপারভাইজার নিজেই cancel করে)
+            if self.watch_stop and not await asyncio.to_thread(self.redis.exists, task_key):
                 self.log(f"🛑 Stopping Bot {self.bot.name}...", "SYSTEM")
                 break
 
@@ -127,15 +266,20 @@ class LiveBotEngine:
                 # হার্টবিট লগ (যাতে ইউজার বুঝে বট চলছে)
                 self.log(f"Waiting for next candle analysis...", "WAIT")
 
-                df = self.fetch_market_data()
+                # সিঙ্ক ccxt কল থ্রেডে, যাতে event loop ব্লক না হয়
+                df = await asyncio.to_thread(self.fetch_market_data)
                 if df is not None:
                     current_price = df.iloc[-1]['close']
                     
-                    if self.position["amount"] <= 0:
-                        signal, reason, _ = self.check_strategy_signal(df)
-                        if signal == "BUY":
-                            self.log(f"🔔 Buy Signal: {reason}", "TRADE")
-                            await self.execute_trade("BUY", current_price, reason)
+                    if self.strategy_runner is not None:
+                        # REST এর শেষ ক্যান্ডেলটি চলমান, তাই শুধু closed রোগুলো স্ট্র্যাটেজিতে
+                        closed = df.iloc[:-1]
+                        timestamps = closed['timestamp'].to_numpy('datetime64[ms]').astype('int64')
+                        values = closed[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+                        await self.run_strategy_bars([[ts, *row] for ts, row in zip(timestamps, values)])
+                    elif self.position["amount"] <= 0:
+                        # REST এর শেষ ক্যান্ডেলটি চলমান
+                        await self.on_signal(*self.check_strategy_signal(df, forming=True))
                     
                     if self.position["amount"] > 0:
                         await self.monitor_risk_management(current_price)
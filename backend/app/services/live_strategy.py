@@ -0,0 +1,203 @@
+import asyncio
+import queue
+import threading
+from datetime import datetime, timezone
+import backtrader as bt
+from app.core.config import settings
+
+# -----------------------------------------------------------
+# Live Backtrader Strategy Runner
+# -----------------------------------------------------------
+# বটের আসল STRATEGY_MAP / কাস্টম স্ট্র্যাটেজি একবারই Cerebro তে তৈরি হয় (নিজস্ব থ্রেডে, live মোডে) আর
+# প্রতিটি নতুন closed ক্যান্ডেল LiveBarFeed এর কিউ দিয়ে একই স্ট্র্যাটেজি অবজেক্টে যায়। তাই প্রতি বারের খরচ
+# হিস্টোরির দৈর্ঘ্যের উপর নির্ভর করে না (প্রতি poll এ পুরো Cerebro আবার চালানোর দরকার নেই)।
+# স্ট্র্যাটেজির buy/sell/close সিমুলেটেড ব্রোকারে যায়; LiveBridgeBroker সেগুলো সিগনাল হিসেবে ইঞ্জিনে পাঠায়:
+#   - Market অর্ডার: সাবমিট হওয়ামাত্র (ক্যান্ডেল ক্লোজেই রিঅ্যাকশন)
+#   - Stop/Limit (যেমন BaseStrategy এর SL/TP): সিমুলেটেড ব্রোকারে ফিল হলে
+# warm-up (হিস্টোরি) চলাকালীন অর্ডার reject হয়, যাতে বট ফ্ল্যাট অবস্থা থেকে শুরু করে।
+
+_STOP = object()
+
+
+class LiveSignal:
+    __slots__ = ('action', 'price', 'size_pct', 'reason', 'bar_ts')
+
+    def __init__(self, action, price, size_pct, reason, bar_ts):
+        self.action = action
+        self.price = price
+        self.size_pct = size_pct
+        self.reason = reason
+        self.bar_ts = bar_ts
+
+    def __repr__(self):
+        return f"LiveSignal({self.action}, {self.price}, {self.size_pct}%, {self.reason!r}, {self.bar_ts})"
+
+
+class LiveBarFeed(bt.feed.DataBase):
+    """কিউ থেকে বার নেওয়া live ফিড। খালি থাকলে None (Cerebro অপেক্ষা করে), _STOP এ False (ফিড শেষ)।"""
+
+    params = (('qcheck', 0.5),)
+
+    def __init__(self):
+        super().__init__()
+        self.bars = queue.Queue()
+
+    def qbuffer(self, savemem=0, replaying=False):
+        super().qbuffer(savemem=savemem, replaying=replaying)
+        # exactbars এ ডাটা লাইন শুধু ইন্ডিকেটরের minperiod রাখে; data.close.get(size=N) এর মতো সরাসরি
+        # হিস্টোরি পড়া স্ট্র্যাটেজির জন্য সীমিত একটি ইতিহাস রাখা
+        self.minbuffer(settings.LIVE_STRATEGY_HISTORY_BARS)
+
+    def islive(self):
+        return True
+
+    def haslivedata(self):
+        return not self.bars.empty()
+
+    def _load(self):
+        try:
+            item = self.bars.get(timeout=self.p.qcheck)
+        except queue.Empty:
+            return None
+        if item is _STOP:
+            return False
+        ts, o, h, l, c, v = item[:6]
+        self.lines.datetime[0] = bt.date2num(datetime.fromtimestamp(ts / 1000, tz=timezone.utc).replace(tzinfo=None))
+        self.lines.open[0] = o
+        self.lines.high[0] = h
+        self.lines.low[0] = l
+        self.lines.close[0] = c
+        self.lines.volume[0] = v
+        self.lines.openinterest[0] = 0.0
+        return True
+
+
+class LiveBridgeBroker(bt.brokers.BackBroker):
+    params = (('bridge', None),)
+
+    def submit(self, order, check=True):
+        bridge = self.p.bridge
+        if not bridge.live:
+            order.reject(self)
+            self.notify(order)
+            return order
+        if order.exectype in (None, bt.Order.Market):
+            order.forwarded = True
+            bridge.forward(order, self.getposition(order.data).size)
+        return super().submit(order, check)
+
+    def notify(self, order):
+        # শর্তসাপেক্ষ অর্ডার সিমুলেশনে ফিল হলে তখনই আসল ট্রেড
+        if order.status == order.Completed and not getattr(order, 'forwarded', False):
+            order.forwarded = True
+            position = self.getposition(order.data).size - order.executed.size
+            self.p.bridge.forward(order, position, order.executed.price)
+        super().notify(order)
+
+
+class BarDone(bt.Analyzer):
+    """স্ট্র্যাটেজি প্রতিটি বার শেষ করলে (minperiod এর আগেও) ব্রিজকে জানানো।"""
+
+    params = (('bridge', None),)
+
+    def prenext(self):
+        self.p.bridge.bar_done()
+
+    def next(self):
+        self.p.bridge.bar_done()
+
+
+class LiveStrategyRunner:
+    """
+    strategy_class একবারই তৈরি হয়। warm_up(history) দিয়ে ইন্ডিকেটর গরম করা, তারপর push(bar) প্রতিটি closed বারের
+    জন্য স্ট্র্যাটেজির সিগনালগুলো (LiveSignal) রিটার্ন করে।
+    """
+
+    def __init__(self, strategy_class, params=None, name=None, cash=None):
+        self.name = name or strategy_class.__name__
+        self.live = False
+        self._signals = []
+        self._processed = threading.Semaphore(0)
+        self._bar_ts = None
+        self._error = None
+
+        self.cerebro = bt.Cerebro(stdstats=False, preload=False, runonce=False, exactbars=settings.LIVE_STRATEGY_EXACTBARS)
+        self.feed = LiveBarFeed()
+        self.cerebro.adddata(self.feed)
+        self.cerebro.addstrategy(strategy_class, **(params or {}))
+        self.cerebro.broker = LiveBridgeBroker(bridge=self)
+        self.cerebro.broker.setcash(cash or settings.LIVE_STRATEGY_CASH)
+        self.cerebro.addsizer(bt.sizers.PercentSizer, percents=90)
+        self.cerebro.addanalyzer(BarDone, bridge=self)
+        self._thread = threading.Thread(target=self._run, name=f"live-strategy-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.cerebro.run()
+        except Exception as e:
+            self._error = e
+            print(f"❌ Live strategy {self.name} crashed: {e}")
+        finally:
+            # অপেক্ষমাণ push() যেন আটকে না থাকে
+            self._processed.release()
+
+    # --- Cerebro থ্রেড থেকে কল ---
+    def bar_done(self):
+        self._processed.release()
+
+    def forward(self, order, position_size, price=None):
+        data = order.data
+        size = abs(order.size if order.size else order.executed.size)
+        if order.isbuy():
+            action, size_pct = "BUY", 100
+        else:
+            action = "SELL"
+            size_pct = min(100, round(size / abs(position_size) * 100, 2)) if position_size else 100
+        ordtype = order.getordername() if hasattr(order, 'getordername') else 'Market'
+        self._signals.append(LiveSignal(
+            action, price if price is not None else data.close[0], size_pct,
+            f"{self.name} {ordtype}", self._bar_ts
+        ))
+
+    # --- ইঞ্জিন থেকে কল ---
+    def _push_sync(self, bar):
+        if self._error or not self._thread.is_alive():
+            raise RuntimeError(f"Live strategy {self.name} is not running: {self._error}")
+        self._bar_ts = bar[0]
+        self.feed.bars.put(list(bar[:6]))
+        if not self._processed.acquire(timeout=settings.LIVE_STRATEGY_BAR_TIMEOUT):
+            # দেরিতে আসা release পরের push এর সাথে মিশে যেত, তাই রানারটি আর ব্যবহারযোগ্য নয়
+            self._error = TimeoutError(f"bar not processed within {settings.LIVE_STRATEGY_BAR_TIMEOUT}s")
+            raise RuntimeError(f"Live strategy {self.name} is stuck: {self._error}")
+        if self._error:
+            raise RuntimeError(f"Live strategy {self.name} crashed: {self._error}")
+        signals, self._signals = self._signals, []
+        return signals
+
+    async def warm_up(self, bars):
+        """হিস্টোরি বারগুলো (অর্ডার reject হয়) তারপর live মোড চালু।"""
+        for bar in bars:
+            await asyncio.to_thread(self._push_sync, bar)
+        self._signals = []
+        self.live = True
+
+    async def push(self, bar):
+        return await asyncio.to_thread(self._push_sync, bar)
+
+    def stop(self):
+        self.feed.bars.put(_STOP)
+        self._thread.join(timeout=5)
+
+
+def create_live_runner(strategy_name, raw_params=None, cash=None):
+    """বটের স্ট্র্যাটেজি নাম (STRATEGY_MAP বা strategies/custom) থেকে রানার; না পেলে None।"""
+    from app.services.backtest_engine import BacktestEngine
+
+    engine = BacktestEngine()
+    strategy_class = engine._load_strategy_class(strategy_name)
+    if not strategy_class:
+        return None
+    # ব্যাকটেস্টের মতোই প্যারামিটার টাইপ কনভার্সন ও alias ফিল্টার
+    clean_params = engine._clean_params(raw_params or {})
+    return LiveStrategyRunner(strategy_class, engine._filter_params(strategy_class, clean_params), strategy_name, cash)
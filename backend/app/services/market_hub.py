@@ -0,0 +1,267 @@
+import asyncio
+import json
+import uuid
+from app.core.config import settings
+from app.services.market_stream import CcxtProAdapter, ExchangeStreamAdapter, LiveCandleFeed, OwnerLost
+
+# -----------------------------------------------------------
+# Market Data Hub (Shared Feeds for Live Bots)
+# -----------------------------------------------------------
+# একই (exchange, market type, symbol, timeframe) এর সব বট একটি LiveCandleFeed শেয়ার করে। প্রথম
+# সাবস্ক্রাইবার ফিড চালু করে, প্রতিটি ইভেন্ট সব সাবস্ক্রাইবারের কিউতে যায়, আর শেষ বট চলে গেলে ফিড বন্ধ হয়।
+# ক্লাস্টার মোডে (MARKET_HUB_CLUSTER) Redis lock যে প্রসেস পায় শুধু সে exchange স্ট্রিম খোলে এবং ইভেন্ট
+# Redis pub/sub এ relay করে, অন্য ওয়ার্কাররা সেখান থেকে পড়ে। owner থেমে গেলে lock expire হয় আর
+# অন্য কেউ owner হয়।
+
+
+# lock এখনো নিজের token এ থাকলে তবেই মেয়াদ বাড়ানো (compare-and-expire); নাহলে 0
+RENEW_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def feed_key(exchange_id, market_type, symbol, timeframe):
+    return f"{exchange_id}:{market_type}:{symbol}:{timeframe}"
+
+
+class RedisRelayAdapter(ExchangeStreamAdapter):
+    """অন্য প্রসেসের owner ফিড থেকে আপডেট (pub/sub) ও হিস্টোরি (snapshot key) পড়া, exchange এ কোনো রিকোয়েস্ট নয়।"""
+
+    def __init__(self, redis, key):
+        self.redis = redis
+        self.key = key
+        self.pubsub = None
+
+    async def _ensure_subscribed(self):
+        if self.pubsub is None:
+            self.pubsub = self.redis.pubsub()
+            await self.pubsub.subscribe(f"market_feed:{self.key}")
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        await self._ensure_subscribed()
+        waited = 0.0
+        while True:
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message:
+                return [json.loads(message["data"])]
+            waited += 1.0
+            if waited >= settings.MARKET_HUB_LOCK_TTL:
+                waited = 0.0
+                if not await self.redis.exists(f"market_feed_owner:{self.key}"):
+                    raise OwnerLost(f"Owner of {self.key} is gone")
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit=100):
+        await self._ensure_subscribed()
+        raw = await self.redis.get(f"market_feed_snapshot:{self.key}")
+        return json.loads(raw)[-limit:] if raw else []
+
+    async def close(self):
+        if self.pubsub is not None:
+            await self.pubsub.unsubscribe()
+            await self.pubsub.close()
+
+
+class HubSubscription:
+    def __init__(self, hub, key, entry):
+        self.hub = hub
+        self.key = key
+        self.entry = entry
+        self.queue = asyncio.Queue(maxsize=settings.MARKET_HUB_QUEUE_SIZE)
+
+    @property
+    def feed(self):
+        return self.entry.feed
+
+    def to_frame(self, include_current=False):
+        return self.entry.feed.to_frame(include_current)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # ধীর বট অন্য বটকে আটকাবে না: সবচেয়ে পুরোনো ইভেন্ট বাদ
+            self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class _FeedEntry:
+    def __init__(self):
+        self.subscribers = []
+        self.feed = None
+        self.ready = asyncio.Event()
+        self.task = None
+        self.error = None
+
+
+class MarketDataHub:
+    def __init__(self, adapter_factory=None, cluster=None, redis_url=None):
+        self.adapter_factory = adapter_factory or (
+            lambda exchange_id, market_type: CcxtProAdapter(exchange_id, {'options': {'defaultType': market_type}})
+        )
+        self.cluster = settings.MARKET_HUB_CLUSTER if cluster is None else cluster
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.token = uuid.uuid4().hex
+        self._entries = {}
+        self._redis = None
+        self._redis_loop = None
+
+    def active_feeds(self):
+        return {key: len(entry.subscribers) for key, entry in self._entries.items()}
+
+    async def subscribe(self, symbol, timeframe, exchange_id='binance', market_type='spot', log=None):
+        """ফিডে সাবস্ক্রাইব করে (দরকার হলে চালু করে) হিস্টোরি লোড হওয়া পর্যন্ত অপেক্ষা করে।"""
+        key = feed_key(exchange_id, market_type, symbol, timeframe)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _FeedEntry()
+            entry.task = asyncio.create_task(self._produce(key, entry, exchange_id, market_type, symbol, timeframe, log))
+        subscription = HubSubscription(self, key, entry)
+        entry.subscribers.append(subscription)
+
+        ready = asyncio.ensure_future(entry.ready.wait())
+        await asyncio.wait([ready, entry.task], return_when=asyncio.FIRST_COMPLETED)
+        ready.cancel()
+        if not entry.ready.is_set():
+            await self.unsubscribe(subscription)
+            raise RuntimeError(f"Market feed {key} failed to start: {entry.error}")
+        return subscription
+
+    async def unsubscribe(self, subscription):
+        entry = self._entries.get(subscription.key)
+        if entry is None or subscription not in entry.subscribers:
+            return
+        entry.subscribers.remove(subscription)
+        if not entry.subscribers:
+            # শেষ সাবস্ক্রাইবার: ফিড বন্ধ (owner হলে lock ছেড়ে দেয়)
+            del self._entries[subscription.key]
+            entry.task.cancel()
+            try:
+                await entry.task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def _get_redis(self):
+        # প্রতিটি বট টাস্ক নতুন event loop খোলে, তাই ক্লায়েন্টও loop অনুযায়ী
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    async def _elect(self, key):
+        """owner হলে None, না হলে relay adapter। Redis না পেলে লোকাল owner।"""
+        if not self.cluster:
+            return None
+        try:
+            redis = await self._get_redis()
+            if await redis.set(f"market_feed_owner:{key}", self.token, nx=True, ex=settings.MARKET_HUB_LOCK_TTL):
+                return None
+            return RedisRelayAdapter(redis, key)
+        except Exception as e:
+            print(f"⚠️ Market hub Redis unavailable, streaming locally: {e}")
+            self.cluster = False
+            return None
+
+    async def _renew_lock(self, key, feed):
+        redis = await self._get_redis()
+        while True:
+            await asyncio.sleep(settings.MARKET_HUB_LOCK_TTL / 3)
+            try:
+                renewed = await redis.eval(RENEW_LOCK_SCRIPT, 1, f"market_feed_owner:{key}", self.token, settings.MARKET_HUB_LOCK_TTL)
+            except Exception as e:
+                print(f"⚠️ Market feed lock renew error: {e}")
+                continue
+            if not renewed:
+                # stall এর মধ্যে lock expire হয়ে অন্য প্রসেস owner হয়েছে; lock কেড়ে নিলে দুজনেই publish করত
+                raise OwnerLost(f"Lost ownership of {key}")
+            try:
+                # বড় টাইমফ্রেমে ক্লোজের মাঝেও snapshot মেয়াদোত্তীর্ণ না হয়
+                await self._write_snapshot(key, feed)
+            except Exception as e:
+                print(f"⚠️ Market feed snapshot error: {e}")
+
+    async def _release_lock(self, key):
+        try:
+            redis = await self._get_redis()
+            if await redis.get(f"market_feed_owner:{key}") == self.token:
+                await redis.delete(f"market_feed_owner:{key}")
+        except Exception:
+            pass
+
+    async def _publish(self, key, feed, event, candle):
+        redis = await self._get_redis()
+        await redis.publish(f"market_feed:{key}", json.dumps(candle))
+        if event != "tick":
+            await self._write_snapshot(key, feed)
+
+    async def _write_snapshot(self, key, feed):
+        redis = await self._get_redis()
+        rows = list(feed.closed) + ([feed.current] if feed.current else [])
+        await redis.set(f"market_feed_snapshot:{key}", json.dumps(rows), ex=settings.MARKET_HUB_LOCK_TTL * 4)
+
+    async def _produce(self, key, entry, exchange_id, market_type, symbol, timeframe, log):
+        while entry.subscribers:
+            relay = await self._elect(key)
+            owner = relay is None and self.cluster
+            adapter = relay or self.adapter_factory(exchange_id, market_type)
+            feed = LiveCandleFeed(adapter, symbol, timeframe, log=log)
+            renew = asyncio.create_task(self._renew_lock(key, feed)) if owner else None
+            try:
+                await feed.bootstrap()
+                if owner:
+                    await self._write_snapshot(key, feed)
+                entry.feed = feed
+                entry.ready.set()
+                async for event, candle in feed.events(bootstrap=False):
+                    if renew and renew.done():
+                        # OwnerLost (বা অন্য এরর) এখানে তোলা হয়, publish করার আগেই
+                        renew.result()
+                    for subscription in entry.subscribers:
+                        subscription.put((event, candle))
+                    if owner:
+                        try:
+                            await self._publish(key, feed, event, candle)
+                        except Exception as e:
+                            print(f"⚠️ Market feed relay error: {e}")
+            except OwnerLost as e:
+                print(f"🔁 {e}, re-electing feed owner")
+                continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                entry.error = e
+                print(f"❌ Market feed {key} failed: {e}")
+                break
+            finally:
+                if renew:
+                    renew.cancel()
+                if owner:
+                    await self._release_lock(key)
+                try:
+                    await adapter.close()
+                except Exception:
+                    pass
+            # স্ট্রিম শেষ (রিপ্লে)
+            break
+
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        for subscription in list(entry.subscribers):
+            subscription.put(None)
+
+
+# প্রতি প্রসেসে একটি হাব (একই event loop এ চলা সব বট শেয়ার করে)
+market_hub = MarketDataHub()
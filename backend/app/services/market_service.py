@@ -1,7 +1,8 @@
 import ccxt.async_support as ccxt
 import os
 import ccxt as ccxt_sync 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.dialects.postgresql import insert # ✅ এই ইমপোর্টটি খুব গুরুত্বপূর্ণ
 from datetime import datetime, timedelta
 from app import models
@@ -9,6 +10,14 @@ from app.constants import VALID_TIMEFRAMES
 import asyncio
 from tqdm import tqdm
 from app.services.websocket_manager import manager
+from app.services.candle_store import candle_store, empty_candles, OHLCV_COLUMNS
+from app.services.candle_loader import copy_candles
+from app.services.candle_writer import CandleWriter
+from app.services.derived_timeframes import (
+    AGGREGATE_EXCHANGE, BASE_TIMEFRAME, is_derived, aggregate_table, view_name, refresh_aggregates, last_closed_bucket
+)
+from app.core.config import settings
+import pandas as pd
 from fastapi.concurrency import run_in_threadpool
 
 class MarketService:
@@ -25,7 +34,8 @@ class MarketService:
         elif timeframe.endswith('M'): seconds = int(timeframe[:-1]) * 2592000
         return seconds * 1000
 
-    async def fetch_and_store_candles(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None, limit: int = 1000):
+    async def fetch_and_store_candles(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None, limit: int = 1000,
+                                      concurrency: int = None, full_resync: bool = False):
         # 1. Exchange Setup
         exchange = ccxt.binance({
             'enableRateLimit': True,
@@ -73,55 +83,48 @@ class MarketService:
                  except Exception as e:
                      return {"status": "error", "message": f"Fetch Error: {str(e)}"}
 
-            # 4. Historical Data Loop with Progress Bar
-            total_saved = 0
+            # 4. Historical Data: কনকারেন্ট উইন্ডো ব্যাকফিল + প্রোগ্রেস বার
             tf_ms = self.timeframe_to_ms(timeframe)
-            current_since = since_ts
+            concurrency = max(1, int(concurrency or settings.MARKET_SYNC_CONCURRENCY))
+
+            # ✅ Gap-aware: ডাটাবেসে যা আছে তা বাদ দিয়ে শুধু মিসিং রেঞ্জগুলো ডাউনলোড
+            if full_resync:
+                missing_ranges = [(since_ts, end_ts)]
+            else:
+                missing_ranges = await run_in_threadpool(
+                    self.find_missing_ranges, db, symbol, timeframe, since_ts, end_ts
+                )
+            if not missing_ranges:
+                await self._broadcast_progress(symbol, safe_symbol, 100, "Already up to date!")
+                return {
+                    "status": "success",
+                    "new_candles_stored": 0,
+                    "missing_ranges": 0,
+                    "range": f"{start_date} to {end_date or 'Now'}",
+                }
             
-            # মোট কত সময় বাকি তা হিসাব করা (প্রোগ্রেস এর জন্য)
-            total_duration = end_ts - since_ts
+            # মোট কত সময় বাকি তা হিসাব করা (প্রোগ্রেস এর জন্য)
+            total_duration = max(1, sum(end - start for start, end in missing_ranges))
             
-            # শুরুতেই একটা ০% মেসেজ পাঠানো যাতে UI রেডি হয়
+            # শুরুতেই একটা ০% মেসেজ পাঠানো যাতে UI রেডি হয়
             await self._broadcast_progress(symbol, safe_symbol, 0, f"Starting sync for {symbol}...")
 
+            windows = self._split_windows(missing_ranges, tf_ms, concurrency)
             with tqdm(total=total_duration, desc=f"Syncing {symbol}", unit="ms") as pbar:
-                while current_since < end_ts:
-                    try:
-                        ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=1000, since=current_since)
-                    except Exception as e:
-                        print(f"Error fetching batch: {e}")
-                        break 
+                total_saved = await self._backfill_windows(
+                    exchange, db, symbol, safe_symbol, timeframe, windows, concurrency, total_duration, pbar
+                )
 
-                    if not ohlcv:
-                        break
-                    
-                    filtered_ohlcv = [c for c in ohlcv if c[0] <= end_ts]
-                    saved_count = await run_in_threadpool(self._save_candles, db, filtered_ohlcv, symbol, timeframe)
-                    total_saved += saved_count
-                    
-                    if not filtered_ohlcv:
-                        break
-
-                    last_time = filtered_ohlcv[-1][0]
-                    
-                    # প্রোগ্রেস ক্যালকুলেশন
-                    progress_percent = int(((last_time - since_ts) / total_duration) * 100)
-                    progress_percent = min(100, max(0, progress_percent))
-
-                    # TQDM আপডেট
-                    pbar.update(last_time - current_since)
-
-                    # ✅ WebSocket মেসেজ পাঠানো (সব চ্যানেলে)
-                    await self._broadcast_progress(symbol, safe_symbol, progress_percent, f"Syncing {symbol}... {progress_percent}%")
-
-                    # পরবর্তী লুপের জন্য সময় সেট করা
-                    if last_time == current_since:
-                        current_since += tf_ms
-                    else:
-                        current_since = last_time + tf_ms
-                    
-                    # ইভেন্ট লুপ ব্লক না করার জন্য ছোট বিরতি
-                    await asyncio.sleep(0.1)
+            # ✅ 1m ব্যাকফিলের পর ঐ রেঞ্জের higher-timeframe অ্যাগ্রিগেটগুলো materialize করা
+            if timeframe == BASE_TIMEFRAME and total_saved:
+                try:
+                    await run_in_threadpool(
+                        refresh_aggregates, db.get_bind(),
+                        datetime.fromtimestamp(missing_ranges[0][0] / 1000),
+                        datetime.fromtimestamp(missing_ranges[-1][1] / 1000)
+                    )
+                except Exception as e:
+                    print(f"⚠️ Aggregate Refresh Error: {e}")
 
             # ফাইনাল ১০০% মেসেজ পাঠানো
             await self._broadcast_progress(symbol, safe_symbol, 100, "Sync Completed Successfully!")
@@ -129,6 +132,7 @@ class MarketService:
             return {
                 "status": "success", 
                 "new_candles_stored": total_saved, 
+                "missing_ranges": len(missing_ranges),
                 "range": f"{start_date} to {end_date or 'Now'}",
             }
 
@@ -140,6 +144,113 @@ class MarketService:
         finally:
             await exchange.close()
 
+    def find_missing_ranges(self, db: Session, symbol: str, timeframe: str, since_ts: int, end_ts: int):
+        """
+        [since_ts, end_ts] (ms) রেঞ্জে market_data তে না থাকা অংশগুলো [(start_ms, end_ms), ...] হিসেবে রিটার্ন করে।
+        LEAD() উইন্ডো ফাংশন দিয়ে পরপর দুই ক্যান্ডেলের মাঝে এক টাইমফ্রেমের বেশি ফাঁক খোঁজা হয়,
+        তাই পুরো রেঞ্জ পড়তে হয় না, শুধু দুইটি কুয়েরি লাগে।
+        """
+        tf_ms = self.timeframe_to_ms(timeframe)
+        # _save_candles এর মতো একই কনভেনশন (datetime.fromtimestamp) দিয়ে ms <-> datetime
+        start_dt = datetime.fromtimestamp(since_ts / 1000.0)
+        end_dt = datetime.fromtimestamp(end_ts / 1000.0)
+        to_ms = lambda dt: int(dt.timestamp() * 1000)
+
+        ts = models.MarketData.timestamp
+        first_ts, last_ts = self._filter_candle_range(
+            db.query(func.min(ts), func.max(ts)), symbol, timeframe, start_dt=start_dt, end_dt=end_dt
+        ).one()
+        if first_ts is None:
+            return [(since_ts, end_ts)]
+
+        ranges = []
+        if to_ms(first_ts) - since_ts >= tf_ms:
+            ranges.append((since_ts, to_ms(first_ts) - tf_ms))
+
+        next_ts = func.lead(ts, type_=ts.type).over(order_by=ts)
+        steps = self._filter_candle_range(
+            db.query(ts.label('ts'), next_ts.label('next_ts')), symbol, timeframe, start_dt=start_dt, end_dt=end_dt
+        ).subquery()
+        gaps = db.query(steps.c.ts, steps.c.next_ts).filter(
+            steps.c.next_ts > steps.c.ts + timedelta(milliseconds=tf_ms)
+        ).order_by(steps.c.ts).all()
+        for gap_start, gap_end in gaps:
+            # মাসিক ('1M') ক্যান্ডেলের মতো অসম দৈর্ঘ্যের ফাঁক হলে রেঞ্জ ফাঁকা হবে, সেটা বাদ
+            if to_ms(gap_start) + tf_ms <= to_ms(gap_end) - tf_ms:
+                ranges.append((to_ms(gap_start) + tf_ms, to_ms(gap_end) - tf_ms))
+
+        if end_ts - to_ms(last_ts) >= tf_ms:
+            ranges.append((to_ms(last_ts) + tf_ms, end_ts))
+        return ranges
+
+    def _split_windows(self, intervals, tf_ms, concurrency, page_size=1000):
+        """
+        [start, end] ইন্টারভালগুলোকে পরস্পর বিচ্ছিন্ন (disjoint) হাফ-ওপেন [start, stop) উইন্ডোতে ভাগ করা।
+        প্রতি কনকারেন্ট স্লটে ~৪টি উইন্ডো, তবে প্রতিটি অন্তত এক পেজ (page_size ক্যান্ডেল) লম্বা।
+        """
+        page_ms = page_size * tf_ms
+        total_ms = sum(end - start for start, end in intervals)
+        window_ms = max(page_ms, -(-total_ms // (concurrency * 4)))
+        window_ms = -(-window_ms // tf_ms) * tf_ms  # টাইমফ্রেমের গুণিতক
+
+        windows = []
+        for start, end in intervals:
+            current = start
+            while current <= end:
+                window_stop = min(end + 1, current + window_ms)
+                windows.append((current, window_stop))
+                current = window_stop
+        return windows
+
+    async def _backfill_windows(self, exchange, db: Session, symbol: str, safe_symbol: str, timeframe: str,
+                                windows: list, concurrency: int, total_duration: int, pbar=None):
+        """
+        উইন্ডোগুলো bounded semaphore দিয়ে একসাথে ফেচ করে (ccxt enableRateLimit শেয়ার্ড exchange
+        ইনস্ট্যান্সে রেট লিমিট বজায় রাখে)। সব পেজ CandleWriter এর bounded queue হয়ে একটিমাত্র writer এ যায়,
+        তাই এক্সচেঞ্জ ল্যাটেন্সি আর DB ল্যাটেন্সি একে অপরকে আটকায় না।
+        """
+        tf_ms = self.timeframe_to_ms(timeframe)
+        semaphore = asyncio.Semaphore(concurrency)
+        progress = {"covered": 0, "percent": -1}
+
+        async def report(covered_ms):
+            progress["covered"] += covered_ms
+            if pbar is not None:
+                pbar.update(covered_ms)
+            percent = min(100, max(0, int(progress["covered"] / total_duration * 100)))
+            if percent != progress["percent"]:
+                progress["percent"] = percent
+                # ✅ WebSocket মেসেজ পাঠানো (সব চ্যানেলে)
+                await self._broadcast_progress(symbol, safe_symbol, percent, f"Syncing {symbol}... {percent}%")
+
+        async def fetch_window(window_start, window_stop):
+            async with semaphore:
+                current_since = window_start
+                while current_since < window_stop:
+                    try:
+                        ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=1000, since=current_since)
+                    except Exception as e:
+                        print(f"Error fetching batch: {e}")
+                        break
+
+                    # উইন্ডোর বাইরের ক্যান্ডেল পরের উইন্ডো নিজেই আনবে
+                    page = [c for c in ohlcv if current_since <= c[0] < window_stop] if ohlcv else []
+                    if not page:
+                        await report(window_stop - current_since)
+                        break
+
+                    await writer.submit(page)
+                    next_since = page[-1][0] + tf_ms
+                    await report(min(next_since, window_stop) - current_since)
+                    current_since = next_since
+
+        # ✅ ডেডিকেটেড writer (নিজস্ব Session), ফেচারদের পেজ জুড়ে বড় COPY ব্যাচে লেখে
+        async with CandleWriter(sessionmaker(bind=db.get_bind()), symbol, timeframe,
+                                queue_size=concurrency * 2) as writer:
+            await asyncio.gather(*(fetch_window(start, stop) for start, stop in windows))
+        print(f"💾 Stored {writer.saved} candles in {writer.commits} commits")
+        return writer.saved
+
     # ✅ হেল্পার মেথড: সব পসিবল চ্যানেলে ব্রডকাস্ট করার জন্য
     async def _broadcast_progress(self, symbol: str, safe_symbol: str, percent: int, status_msg: str):
         message = {
@@ -194,6 +305,10 @@ class MarketService:
                 db.rollback()
                 print(f"Bulk Insert Error: {e}")
                 return 0
+
+            # ✅ নতুন ক্যান্ডেল যে মাসগুলোতে পড়েছে সেগুলোর Parquet ক্যাশ বাতিল
+            timestamps = [c["timestamp"] for c in candles_data]
+            candle_store.invalidate(symbol, timeframe, min(timestamps), max(timestamps))
         
         return len(candles_data)
 
@@ -271,7 +386,58 @@ class MarketService:
         # ccxt লাইব্রেরিতে থাকা সব এক্সচেঞ্জ রিটার্ন করবে
         return ccxt.exchanges
             
-    def get_candles_from_db(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None):
+    def _parse_date_range(self, start_date: str = None, end_date: str = None):
+        start_dt = end_dt = None
+        if start_date:
+            try:
+                start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            except: pass
+        if end_date:
+             try:
+                end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+                end_dt = end_dt.replace(hour=23, minute=59, second=59)
+             except: pass
+        return start_dt, end_dt
+
+    def _filter_candle_range(self, query, symbol: str, timeframe: str, start_date: str = None, end_date: str = None,
+                             start_dt: datetime = None, end_dt: datetime = None):
+        query = query.filter(
+            models.MarketData.symbol == symbol,
+            models.MarketData.timeframe == timeframe
+        )
+
+        if start_date or end_date:
+            start_dt, end_dt = self._parse_date_range(start_date, end_date)
+        if start_dt:
+            query = query.filter(models.MarketData.timestamp >= start_dt)
+        if end_dt:
+            query = query.filter(models.MarketData.timestamp <= end_dt)
+        return query
+
+    def _query_candles_df(self, db: Session, symbol: str, timeframe: str, start_dt: datetime = None, end_dt: datetime = None):
+        # ✅ PostgreSQL এ binary COPY দিয়ে সরাসরি NumPy অ্যারেতে লোড (ORM Row অবজেক্ট ছাড়া)
+        if settings.CANDLE_COPY_LOADER and db.get_bind().dialect.name == 'postgresql':
+            try:
+                df = copy_candles(db, symbol, timeframe, start_dt, end_dt)
+                if df.empty and is_derived(timeframe):
+                    return copy_candles(db, symbol, timeframe, start_dt, self._aggregate_end(timeframe, end_dt),
+                                        table=view_name(timeframe), exchange=AGGREGATE_EXCHANGE)
+                return df
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ COPY Loader Error (falling back to ORM): {e}")
+
+        df = self._query_native_df(db, symbol, timeframe, start_dt, end_dt)
+        # ✅ টাইমফ্রেমটি আলাদাভাবে ডাউনলোড না থাকলে 1m এর continuous aggregate থেকে পড়া
+        if df.empty and is_derived(timeframe) and db.get_bind().dialect.name == 'postgresql':
+            try:
+                return self._query_aggregate_df(db, symbol, timeframe, start_dt, end_dt)
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Aggregate Query Error ({view_name(timeframe)}): {e}")
+        return df
+
+    def _query_native_df(self, db: Session, symbol: str, timeframe: str, start_dt: datetime = None, end_dt: datetime = None):
         query = db.query(
             models.MarketData.timestamp,
             models.MarketData.open,
@@ -279,24 +445,73 @@ class MarketService:
             models.MarketData.low,
             models.MarketData.close,
             models.MarketData.volume
-        ).filter(
-            models.MarketData.symbol == symbol,
-            models.MarketData.timeframe == timeframe
         )
+        query = self._filter_candle_range(query, symbol, timeframe, start_dt=start_dt, end_dt=end_dt)
+        rows = query.order_by(models.MarketData.timestamp.asc()).all()
+        return self._rows_to_df(rows)
 
-        if start_date:
+    def _aggregate_end(self, timeframe: str, end_dt: datetime = None):
+        # চলতি (এখনো ক্লোজ না হওয়া) বাকেট বাদ, নাহলে ব্যাকটেস্ট আংশিক ক্যান্ডেলকে ক্লোজড ধরে নেয়
+        closed = last_closed_bucket(timeframe)
+        return min(end_dt, closed) if end_dt else closed
+
+    def _query_aggregate_df(self, db: Session, symbol: str, timeframe: str, start_dt: datetime = None, end_dt: datetime = None):
+        view = aggregate_table(timeframe)
+        query = db.query(view.c.timestamp, *[view.c[c] for c in OHLCV_COLUMNS]).filter(
+            view.c.exchange == AGGREGATE_EXCHANGE,
+            view.c.symbol == symbol,
+            view.c.timestamp <= self._aggregate_end(timeframe, end_dt),
+        )
+        if start_dt:
+            query = query.filter(view.c.timestamp >= start_dt)
+        return self._rows_to_df(query.order_by(view.c.timestamp.asc()).all())
+
+    def _rows_to_df(self, rows):
+        if not rows:
+            return empty_candles()
+        df = pd.DataFrame(rows, columns=['datetime'] + OHLCV_COLUMNS)
+        df['datetime'] = pd.to_datetime(df['datetime']).astype('datetime64[ns]')
+        return df.set_index('datetime').astype('float64')
+
+    def get_candles_df(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None):
+        """
+        ক্যান্ডেল DataFrame (index='datetime', OHLCV কলাম) রিটার্ন করে।
+        ✅ Parquet ক্যাশ চালু থাকলে আগে ক্যাশ থেকে পড়ে, না থাকা মাসগুলো Postgres থেকে এনে ব্যাকফিল করে।
+        """
+        start_dt, end_dt = self._parse_date_range(start_date, end_date)
+        if candle_store.enabled:
             try:
-                start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                query = query.filter(models.MarketData.timestamp >= start_dt)
-            except: pass
-        if end_date:
-             try:
-                end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                end_dt = end_dt.replace(hour=23, minute=59, second=59)
-                query = query.filter(models.MarketData.timestamp <= end_dt)
-             except: pass
-             
-        return query.order_by(models.MarketData.timestamp.asc()).all()
+                if start_dt is None:
+                    first_ts = self._filter_candle_range(
+                        db.query(func.min(models.MarketData.timestamp)), symbol, timeframe
+                    ).scalar()
+                    if first_ts is None and is_derived(timeframe):
+                        # অ্যাগ্রিগেট থেকে আসা সিরিজ 1m বেস সিরিজের প্রথম ক্যান্ডেল থেকে শুরু
+                        first_ts = self._filter_candle_range(
+                            db.query(func.min(models.MarketData.timestamp)), symbol, BASE_TIMEFRAME
+                        ).scalar()
+                    if first_ts is None:
+                        return empty_candles()
+                    start_dt = first_ts
+                end_dt = end_dt or datetime.now()
+                return candle_store.load(
+                    symbol, timeframe, start_dt, end_dt,
+                    lambda s, e: self._query_candles_df(db, symbol, timeframe, s, e)
+                )
+            except Exception as e:
+                print(f"⚠️ Candle Cache Error (falling back to DB): {e}")
+        return self._query_candles_df(db, symbol, timeframe, start_dt, end_dt)
+
+    def get_candles_from_db(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None):
+        # পুরোনো কলারদের জন্য (timestamp, open, high, low, close, volume) টাপল লিস্ট
+        df = self.get_candles_df(db, symbol, timeframe, start_date, end_date)
+        return list(zip(df.index.to_pydatetime(), *(df[c].tolist() for c in OHLCV_COLUMNS)))
+
+    def get_candle_watermark(self, db: Session, symbol: str, timeframe: str, start_date: str = None, end_date: str = None):
+        """রেঞ্জের ক্যান্ডেল সংখ্যা ও সর্বশেষ timestamp (নতুন ক্যান্ডেল আসলে বা ডিলিট হলে বদলে যায়)।"""
+        query = db.query(func.count(models.MarketData.timestamp), func.max(models.MarketData.timestamp))
+        count, last_ts = self._filter_candle_range(query, symbol, timeframe, start_date, end_date).one()
+        return [count, last_ts.isoformat() if last_ts else None]
 
     def cleanup_old_data(self, db: Session, retention_rules: dict = None):
         if not retention_rules:
@@ -305,6 +520,7 @@ class MarketService:
             }
         
         total_deleted = 0
+        cleaned = []
         for tf, days in retention_rules.items():
             cutoff_date = datetime.utcnow() - timedelta(days=days)
             deleted = db.query(models.MarketData).filter(
@@ -313,5 +529,10 @@ class MarketService:
             ).delete(synchronize_session=False)
             if deleted > 0:
                 total_deleted += deleted
+                cleaned.append((tf, cutoff_date))
         db.commit()
+
+        # ✅ মুছে যাওয়া রেঞ্জের Parquet ক্যাশও বাতিল
+        for tf, cutoff_date in cleaned:
+            candle_store.invalidate_before(tf, cutoff_date)
         return total_deleted
\ No newline at end of file
@@ -0,0 +1,229 @@
+import asyncio
+import time
+from collections import deque
+import pandas as pd
+from app.core.config import settings
+
+# -----------------------------------------------------------
+# Live Market Streams (Event-Driven Bots)
+# -----------------------------------------------------------
+# বট প্রতি ৫ সেকেন্ডে REST poll না করে exchange এর kline WebSocket স্ট্রিম শোনে। নতুন ক্যান্ডেলের প্রথম
+# আপডেট আসামাত্র আগের ক্যান্ডেলটি "closed" ইভেন্ট হিসেবে যায়, আর REST শুধু শুরুতে (হিস্টোরি) ও
+# নির্দিষ্ট বিরতিতে reconciliation এর জন্য ব্যবহার হয়।
+# Adapter ইন্টারফেস: watch_ohlcv / fetch_ohlcv / close (লাইভে ccxt.pro, টেস্টে ReplayAdapter)।
+
+OHLCV_FIELDS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+class StreamClosed(Exception):
+    """Adapter এর স্ট্রিম শেষ (যেমন রিপ্লে ডাটা শেষ)।"""
+
+
+class OwnerLost(Exception):
+    """ক্লাস্টার ফিডের owner আর নেই, নতুন করে election দরকার (স্ট্রিম শেষ নয়, তাই events() এটা উপরে পাঠায়)।"""
+
+
+class ExchangeStreamAdapter:
+    async def watch_ohlcv(self, symbol, timeframe):
+        """চলমান/নতুন ক্যান্ডেলের আপডেট ([[ts, o, h, l, c, v], ...]) আসা পর্যন্ত অপেক্ষা করে।"""
+        raise NotImplementedError
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit=100):
+        """REST: সর্বশেষ limit টি ক্যান্ডেল (শেষেরটি সাধারণত চলমান)।"""
+        raise NotImplementedError
+
+    def parse_timeframe(self, timeframe):
+        import ccxt
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    async def close(self):
+        pass
+
+
+class CcxtProAdapter(ExchangeStreamAdapter):
+    """ccxt.pro WebSocket ক্লায়েন্ট (একই ইনস্ট্যান্সের async REST মেথড reconciliation এ ব্যবহার হয়)।"""
+
+    def __init__(self, exchange_id, options=None):
+        import ccxt.pro as ccxtpro
+        if exchange_id not in ccxtpro.exchanges:
+            raise ValueError(f"Exchange {exchange_id} does not support streaming")
+        self.exchange = getattr(ccxtpro, exchange_id)({'enableRateLimit': True, **(options or {})})
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        return await self.exchange.watch_ohlcv(symbol, timeframe)
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit=100):
+        return await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+    def parse_timeframe(self, timeframe):
+        return self.exchange.parse_timeframe(timeframe)
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class ReplayAdapter(ExchangeStreamAdapter):
+    """
+    লোকাল ক্যান্ডেল লিস্ট থেকে স্ট্রিম রিপ্লে (টেস্ট/ডেমো)। প্রথম history টি ক্যান্ডেল REST হিস্টোরি,
+    বাকিগুলো প্রতিটি ticks_per_candle টি আংশিক আপডেট হিসেবে আসে (শেষটিতে পূর্ণ ক্যান্ডেল)।
+    skip দেওয়া ক্যান্ডেল ইনডেক্সগুলোর কোনো আপডেট স্ট্রিমে আসে না (হারানো মেসেজ সিমুলেশন)।
+    """
+
+    def __init__(self, candles, history=100, ticks_per_candle=3, delay=0.0, skip=()):
+        self.candles = [list(c) for c in candles]
+        self.history = history
+        self.delay = delay
+        self.rest_calls = 0
+        self.is_closed = False
+        self._position = history  # REST এ দেখা যাবে এমন শেষ ক্যান্ডেল পর্যন্ত
+        self._updates = self._generate(ticks_per_candle, set(skip))
+
+    def _generate(self, ticks, skip):
+        for index in range(self.history, len(self.candles)):
+            ts, o, h, l, c, v = self.candles[index]
+            self._position = index + 1
+            if index in skip:
+                continue
+            for step in range(1, ticks + 1):
+                if step == ticks:
+                    yield [[ts, o, h, l, c, v]]
+                else:
+                    # আংশিক ক্যান্ডেল: close o থেকে c এর দিকে এগোয়, ভলিউম জমে
+                    price = o + (c - o) * step / ticks
+                    yield [[ts, o, max(o, price), min(o, price), price, v * step / ticks]]
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        try:
+            return next(self._updates)
+        except StopIteration:
+            raise StreamClosed("Replay finished")
+
+    async def fetch_ohlcv(self, symbol, timeframe, limit=100):
+        self.rest_calls += 1
+        return [list(c) for c in self.candles[max(0, self._position - limit):self._position]]
+
+    async def close(self):
+        self.is_closed = True
+
+
+class LiveCandleFeed:
+    """
+    একটি symbol/timeframe এর লাইভ ক্যান্ডেল বাফার। events() থেকে ("tick", candle) এবং ক্যান্ডেল শেষ হলে
+    ("close", candle) ইভেন্ট আসে। closed ক্যান্ডেলগুলো history দৈর্ঘ্যের deque এ থাকে।
+    """
+
+    def __init__(self, adapter, symbol, timeframe, history=None, reconcile_seconds=None, log=None):
+        self.adapter = adapter
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.tf_ms = adapter.parse_timeframe(timeframe) * 1000
+        self.history = history or settings.LIVE_CANDLE_HISTORY
+        self.reconcile_seconds = settings.LIVE_RECONCILE_SECONDS if reconcile_seconds is None else reconcile_seconds
+        self.closed = deque(maxlen=self.history)
+        self.current = None
+        self.log = log or (lambda message, type="INFO": print(f"[{type}] {symbol}: {message}"))
+        self._last_reconcile = 0.0
+
+    async def bootstrap(self):
+        candles = await self.adapter.fetch_ohlcv(self.symbol, self.timeframe, limit=self.history + 1)
+        self._last_reconcile = time.monotonic()
+        self.closed.clear()
+        for candle in candles[:-1]:
+            self.closed.append(list(candle[:6]))
+        self.current = list(candles[-1][:6]) if candles else None
+
+    async def reconcile(self):
+        """REST এর সাথে মিলিয়ে নেওয়া। স্ট্রিমে মিস হওয়া closed ক্যান্ডেলগুলো রিটার্ন করে।"""
+        self._last_reconcile = time.monotonic()
+        candles = await self.adapter.fetch_ohlcv(self.symbol, self.timeframe, limit=self.history + 1)
+        if not candles:
+            return []
+        by_ts = {c[0]: list(c[:6]) for c in candles[:-1]}
+        # বাফারে থাকা closed ক্যান্ডেলের মান REST এর চূড়ান্ত মান দিয়ে ঠিক করা
+        for i, candle in enumerate(self.closed):
+            if candle[0] in by_ts:
+                self.closed[i] = by_ts[candle[0]]
+
+        last_closed = self.closed[-1][0] if self.closed else None
+        missed = [c for ts, c in sorted(by_ts.items()) if last_closed is None or ts > last_closed]
+        self.closed.extend(missed)
+        latest = list(candles[-1][:6])
+        if self.current is None or latest[0] >= self.current[0]:
+            self.current = latest
+        if missed:
+            self.log(f"Reconciled {len(missed)} missed candle(s) via REST", "SYSTEM")
+        return missed
+
+    def apply(self, candle):
+        """একটি স্ট্রিম আপডেট প্রসেস করে ইভেন্ট লিস্ট রিটার্ন করে।"""
+        candle = list(candle[:6])
+        if self.current is None or candle[0] == self.current[0]:
+            self.current = candle
+            return [("tick", candle)]
+
+        if candle[0] > self.current[0]:
+            events = []
+            if not self.closed or self.current[0] > self.closed[-1][0]:
+                self.closed.append(self.current)
+                events.append(("close", self.current))
+            if candle[0] - self.current[0] > self.tf_ms:
+                # মাঝের ক্যান্ডেল স্ট্রিমে আসেনি, পরের লুপেই REST দিয়ে পূরণ
+                self._last_reconcile = 0.0
+            self.current = candle
+            events.append(("tick", candle))
+            return events
+
+        # আগের (already closed) ক্যান্ডেলের দেরিতে আসা আপডেট: মান ঠিক করা, ইভেন্ট নয়
+        for i in range(len(self.closed) - 1, -1, -1):
+            if self.closed[i][0] == candle[0]:
+                self.closed[i] = candle
+                break
+        return []
+
+    def reconcile_due(self):
+        return time.monotonic() - self._last_reconcile >= self.reconcile_seconds
+
+    async def events(self, bootstrap=True):
+        if bootstrap:
+            await self.bootstrap()
+        failures = 0
+        while True:
+            if self.reconcile_due():
+                try:
+                    for candle in await self.reconcile():
+                        yield "close", candle
+                except Exception as e:
+                    self.log(f"Reconcile Error: {e}", "ERROR")
+
+            try:
+                updates = await self.adapter.watch_ohlcv(self.symbol, self.timeframe)
+                failures = 0
+            except StreamClosed:
+                break
+            except OwnerLost:
+                raise
+            except Exception as e:
+                # রিকানেক্ট: exponential backoff, তারপর REST reconcile দিয়ে ফাঁক পূরণ
+                failures += 1
+                delay = min(settings.LIVE_STREAM_RECONNECT_MAX, 2 ** (failures - 1))
+                self.log(f"Stream Error: {e} (retry in {delay}s)", "ERROR")
+                await asyncio.sleep(delay)
+                self._last_reconcile = 0.0
+                continue
+
+            for candle in sorted(updates or [], key=lambda c: c[0]):
+                for event in self.apply(candle):
+                    yield event
+
+    def to_frame(self, include_current=False):
+        """fetch_market_data এর মতো DataFrame (timestamp কলাম datetime)।"""
+        rows = list(self.closed)
+        if include_current and self.current is not None:
+            rows.append(self.current)
+        df = pd.DataFrame(rows, columns=OHLCV_FIELDS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
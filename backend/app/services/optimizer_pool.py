@@ -0,0 +1,140 @@
+import os
+# ✅ billiard (Celery এর multiprocessing fork) ব্যবহার করা হচ্ছে,
+# কারণ Celery prefork worker daemonic প্রসেস, সেখানে stdlib multiprocessing চাইল্ড প্রসেস তৈরি করতে দেয় না।
+from billiard import Pool
+from app.core.config import settings
+from app.services.shared_candles import SharedCandleBuffer
+
+# প্রতিটি ওয়ার্কার প্রসেসের লোকাল স্টেট (initializer একবারই সেট করে)
+_worker_state = {}
+
+
+def resolve_worker_count(workers=None):
+    """None হলে settings থেকে নেবে, 0 বা নেগেটিভ হলে সব CPU কোর ব্যবহার করবে।"""
+    if workers is None:
+        workers = settings.OPTIMIZER_WORKERS
+    workers = int(workers)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def resolve_chunk_size(total, workers, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = settings.OPTIMIZER_CHUNK_SIZE
+    chunk_size = int(chunk_size or 0)
+    if chunk_size <= 0:
+        # প্রতি ওয়ার্কারে ~৪টি চাঙ্ক, যাতে লোড ব্যালেন্স এবং প্রোগ্রেস আপডেট দুটোই ঠিক থাকে
+        chunk_size = max(1, min(50, total // (workers * 4) or 1))
+    return chunk_size
+
+
+def _init_worker(candle_spec, strategy_name, initial_cash, fixed_params, commission, slippage):
+    # সার্কুলার ইমপোর্ট এড়াতে এখানে ইমপোর্ট করা হচ্ছে
+    from app.services.backtest_engine import BacktestEngine
+
+    # ✅ ক্যান্ডেল ডাটা shared memory থেকে zero-copy অ্যাটাচ করা হয় (শুধু ছোট spec dict পিকল হয়)
+    shm, df = SharedCandleBuffer.attach(candle_spec)
+    _worker_state.update({
+        "engine": BacktestEngine(),
+        "shm": shm,
+        "df": df,
+        "strategy_name": strategy_name,
+        "initial_cash": initial_cash,
+        "fixed_params": fixed_params,
+        "commission": commission,
+        "slippage": slippage,
+    })
+
+
+def _run_chunk(chunk):
+    state = _worker_state
+    engine = state["engine"]
+    results = []
+    for instance_params in chunk:
+        metrics = engine._run_single_backtest(
+            state["df"], state["strategy_name"], state["initial_cash"], instance_params,
+            state["fixed_params"], state["commission"], state["slippage"]
+        )
+        metrics['params'] = instance_params
+        results.append(metrics)
+    return results
+
+
+def _run_window(task):
+    from app.services.walk_forward import run_window
+
+    state = _worker_state
+    window, param_sets = task
+    return run_window(
+        state["engine"], state["df"], window, param_sets, state["strategy_name"], state["initial_cash"],
+        state["fixed_params"], state["commission"], state["slippage"]
+    )
+
+
+def run_parallel_grid(df, strategy_name, initial_cash, param_sets, fixed_params, commission=0.001, slippage=0.0,
+                      workers=None, chunk_size=None, on_chunk_done=None, abort_callback=None):
+    """
+    param_sets এর প্রতিটি কম্বিনেশন প্রসেস পুলে চালায়।
+    on_chunk_done(chunk_results) প্রতিটি চাঙ্ক শেষ হলে মেইন প্রসেসে কল হয়।
+    abort হলে পুল টার্মিনেট করে এবং এতক্ষণ পাওয়া রেজাল্ট রিটার্ন করে।
+    """
+    workers = resolve_worker_count(workers)
+    chunk_size = resolve_chunk_size(len(param_sets), workers, chunk_size)
+    chunks = [param_sets[i:i + chunk_size] for i in range(0, len(param_sets), chunk_size)]
+
+    results = []
+    aborted = False
+    with SharedCandleBuffer(df) as candle_buffer:
+        pool = Pool(
+            processes=min(workers, len(chunks)) or 1,
+            initializer=_init_worker,
+            initargs=(candle_buffer.spec, strategy_name, initial_cash, fixed_params, commission, slippage)
+        )
+        try:
+            for chunk_results in pool.imap_unordered(_run_chunk, chunks):
+                results.extend(chunk_results)
+                if on_chunk_done:
+                    on_chunk_done(chunk_results)
+                if abort_callback and abort_callback():
+                    aborted = True
+                    break
+        finally:
+            # সব রেজাল্ট ইতিমধ্যে হাতে চলে এসেছে, তাই terminate নিরাপদ।
+            # আগে close() না করলে billiard মরে যাওয়া ওয়ার্কারের বদলে নতুন ওয়ার্কার চালু করে এবং join ~৩০ সেকেন্ড আটকে থাকে।
+            pool.close()
+            pool.terminate()
+            pool.join()
+
+    return results, aborted
+
+
+def run_parallel_windows(df, strategy_name, initial_cash, windows, param_sets, fixed_params, commission=0.001,
+                         slippage=0.0, workers=None, on_window_done=None, abort_callback=None):
+    """
+    Walk-forward: প্রতিটি উইন্ডো (train গ্রিড + test) একটি টাস্ক। ওয়ার্কাররা একই shared memory df থেকে
+    নিজের উইন্ডো কেটে নেয়। on_window_done(window_result) প্রতিটি উইন্ডো শেষে মেইন প্রসেসে কল হয়।
+    """
+    workers = resolve_worker_count(workers)
+    results = []
+    aborted = False
+    with SharedCandleBuffer(df) as candle_buffer:
+        pool = Pool(
+            processes=min(workers, len(windows)) or 1,
+            initializer=_init_worker,
+            initargs=(candle_buffer.spec, strategy_name, initial_cash, fixed_params, commission, slippage)
+        )
+        try:
+            for window_result in pool.imap_unordered(_run_window, [(window, param_sets) for window in windows]):
+                results.append(window_result)
+                if on_window_done:
+                    on_window_done(window_result)
+                if abort_callback and abort_callback():
+                    aborted = True
+                    break
+        finally:
+            pool.close()
+            pool.terminate()
+            pool.join()
+
+    return results, aborted
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class SharedCandleBuffer:
+    """
+    OHLCV ক্যান্ডেলগুলো একবার shared memory ব্লকে রাখে, যাতে অপটিমাইজার ওয়ার্কাররা
+    pickle ছাড়াই (zero-copy) একই ডাটা থেকে DataFrame তৈরি করতে পারে।
+
+    লেআউট: [int64 timestamp x n][float64 (n x 5) OHLCV, row-major]
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        length = len(df)
+        index_values = df.index.values
+        self.spec = {
+            "name": None,
+            "length": length,
+            "index_dtype": str(index_values.dtype),
+            "index_tz": str(df.index.tz) if getattr(df.index, 'tz', None) is not None else None,
+            "index_name": df.index.name,
+        }
+
+        # ফাঁকা ফ্রেমেও SharedMemory এর জন্য অন্তত ১ বাইট লাগে
+        size = max(1, length * 8 * (1 + len(OHLCV_COLUMNS)))
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.spec["name"] = self._shm.name
+
+        index_view, values_view = self._views(self._shm.buf, length)
+        index_view[:] = index_values.view('int64')
+        values_view[:] = df[OHLCV_COLUMNS].to_numpy(dtype='float64')
+
+    @staticmethod
+    def _views(buf, length):
+        index_view = np.ndarray((length,), dtype='int64', buffer=buf, offset=0)
+        values_view = np.ndarray((length, len(OHLCV_COLUMNS)), dtype='float64', buffer=buf, offset=length * 8)
+        return index_view, values_view
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        ওয়ার্কার প্রসেসে ব্লকটি অ্যাটাচ করে (shm, df) রিটার্ন করে।
+        df যতক্ষণ ব্যবহার হবে, shm অবজেক্টটি ততক্ষণ বাঁচিয়ে রাখতে হবে।
+        """
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        index_view, values_view = cls._views(shm.buf, spec["length"])
+        values_view.flags.writeable = False
+
+        index = pd.DatetimeIndex(index_view.view(spec["index_dtype"]), name=spec["index_name"])
+        if spec["index_tz"]:
+            index = index.tz_localize('UTC').tz_convert(spec["index_tz"])
+
+        df = pd.DataFrame(values_view, index=index, columns=OHLCV_COLUMNS, copy=False)
+        return shm, df
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
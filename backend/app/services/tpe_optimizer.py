@@ -0,0 +1,106 @@
+import math
+import numpy as np
+
+# -----------------------------------------------------------
+# TPE (Tree-structured Parzen Estimator) Optimizer + Pruning
+# -----------------------------------------------------------
+# গ্রিড প্রতিটি পয়েন্ট চালায়, জেনেটিক খারাপ ইন্ডিভিজুয়ালেও পুরো ব্যাকটেস্ট খরচ করে। TPE আগের ট্রায়ালগুলো
+# থেকে "ভালো" (সেরা gamma অংশ) আর "খারাপ" প্যারামিটারের ঘনত্ব l(x), g(x) বানায় এবং l/g সবচেয়ে বেশি এমন
+# পয়েন্ট পরের ট্রায়ালে চালায়। প্যারামিটারগুলো optimize() এর পার্স করা ডিসক্রিট লিস্ট, তাই ঘনত্ব হিসাব হয়
+# লিস্টের ইনডেক্সের উপর (Gaussian kernel + uniform prior)।
+# Pruner: ডেটার কয়েকটি চেকপয়েন্টে (২৫/৫০/৭৫%) চলতি রিটার্ন আগের ট্রায়ালদের একই চেকপয়েন্টের percentile এর
+# নিচে হলে ব্যাকটেস্ট সেখানেই থামানো হয়।
+
+N_STARTUP_TRIALS = 10   # এর আগে পর্যন্ত র‍্যান্ডম স্যাম্পল
+N_EI_CANDIDATES = 24    # প্রতি ট্রায়ালে l(x) থেকে কয়টি ক্যান্ডিডেট
+PRIOR_WEIGHT = 1.0
+
+
+def _gamma(n):
+    # Optuna এর ডিফল্ট: সেরা ১০% (সর্বোচ্চ ২৫টি) "ভালো" গ্রুপে
+    return min(int(math.ceil(0.1 * n)), 25)
+
+
+def _parzen(observed, size):
+    """ইনডেক্স 0..size-1 এর উপর ডিসক্রিট ঘনত্ব: uniform prior + প্রতিটি পর্যবেক্ষণে Gaussian kernel।"""
+    grid = np.arange(size)
+    density = np.full(size, PRIOR_WEIGHT / size)
+    if len(observed):
+        bandwidth = max(1.0, (size - 1) / (1 + len(observed)))
+        kernels = np.exp(-0.5 * ((grid[None, :] - np.asarray(observed)[:, None]) / bandwidth) ** 2)
+        density += (kernels / kernels.sum(axis=1, keepdims=True)).sum(axis=0)
+    return density / density.sum()
+
+
+class TPESampler:
+    def __init__(self, param_ranges, seed=None):
+        self.names = list(param_ranges.keys())
+        self.values = [list(v) for v in param_ranges.values()]
+        self.sizes = [len(v) for v in self.values]
+        self.space_size = math.prod(self.sizes)
+        self.rng = np.random.default_rng(seed)
+        self.tried = set()
+
+    def _random_untried(self):
+        for _ in range(100):
+            candidate = tuple(int(self.rng.integers(size)) for size in self.sizes)
+            if candidate not in self.tried:
+                return candidate
+        # ছোট স্পেসে প্রায় সব চালানো হয়ে গেলে বাকিগুলোর মধ্যে থেকে
+        remaining = [c for c in np.ndindex(*self.sizes) if c not in self.tried]
+        return tuple(int(i) for i in remaining[self.rng.integers(len(remaining))])
+
+    def suggest(self, trials):
+        """trials: [(index tuple, score, pruned)]। স্পেস শেষ হলে None।"""
+        if len(self.tried) >= self.space_size:
+            return None
+
+        completed = sorted((t for t in trials if not t[2]), key=lambda t: t[1], reverse=True)
+        if len(trials) < N_STARTUP_TRIALS or not completed:
+            candidate = self._random_untried()
+        else:
+            n_good = max(1, _gamma(len(completed)))
+            good = [t[0] for t in completed[:n_good]]
+            # pruned ট্রায়াল সবসময় খারাপ গ্রুপে
+            bad = [t[0] for t in completed[n_good:]] + [t[0] for t in trials if t[2]]
+
+            candidates = np.empty((N_EI_CANDIDATES, len(self.sizes)), dtype=int)
+            log_ratio = np.zeros(N_EI_CANDIDATES)
+            for dim, size in enumerate(self.sizes):
+                l = _parzen([g[dim] for g in good], size)
+                g = _parzen([b[dim] for b in bad], size)
+                candidates[:, dim] = self.rng.choice(size, size=N_EI_CANDIDATES, p=l)
+                log_ratio += np.log(l[candidates[:, dim]]) - np.log(g[candidates[:, dim]])
+
+            candidate = None
+            for i in np.argsort(-log_ratio):
+                option = tuple(int(x) for x in candidates[i])
+                if option not in self.tried:
+                    candidate = option
+                    break
+            if candidate is None:
+                candidate = self._random_untried()
+
+        self.tried.add(candidate)
+        return candidate
+
+    def params_for(self, candidate):
+        return {name: values[i] for name, values, i in zip(self.names, self.values, candidate)}
+
+
+class PercentilePruner:
+    def __init__(self, percentile=25.0, n_startup_trials=5, checkpoints=(0.25, 0.5, 0.75)):
+        self.percentile = percentile
+        self.n_startup_trials = n_startup_trials
+        self.fractions = checkpoints
+        self.history = {}  # চেকপয়েন্ট -> আগের ট্রায়ালদের রিটার্ন %
+
+    def checkpoints(self, n_bars):
+        return sorted({max(1, int(n_bars * f)) for f in self.fractions})
+
+    def should_prune(self, step, value):
+        """step বারে চলতি রিটার্ন % রেকর্ড করে; আগের ট্রায়ালদের percentile এর নিচে হলে True।"""
+        seen = self.history.setdefault(step, [])
+        prune = len(seen) >= self.n_startup_trials and value < np.percentile(seen, self.percentile)
+        seen.append(value)
+        return bool(prune)
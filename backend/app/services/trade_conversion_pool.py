@@ -0,0 +1,93 @@
+import os
+# optimizer_pool এর মতোই billiard, কারণ Celery prefork worker daemonic প্রসেস
+from billiard import Pool
+from app.core.config import settings
+from app.services.data_processing import convert_trade_file
+from app.services.optimizer_pool import resolve_worker_count
+
+# UI/API টাইমফ্রেম -> pandas resample frequency
+PANDAS_TIMEFRAMES = {
+    '1s': '1s', '5s': '5s', '15s': '15s', '30s': '30s',
+    '1m': '1min', '3m': '3min', '5m': '5min', '15m': '15min', '30m': '30min', '45m': '45min',
+    '1h': '1h', '2h': '2h', '4h': '4h', '6h': '6h', '12h': '12h', '1d': '1D',
+}
+
+# প্রতিটি ওয়ার্কার প্রসেসের লোকাল স্টেট (initializer একবারই সেট করে)
+_worker_state = {}
+
+
+def to_pandas_timeframe(timeframe):
+    # অজানা টাইমফ্রেম চুপচাপ 1min হলে ভুল নামের ফাইলে 1m ক্যান্ডেল লেখা হত
+    if timeframe not in PANDAS_TIMEFRAMES:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return PANDAS_TIMEFRAMES[timeframe]
+
+
+def output_filename(trade_file, timeframe):
+    return f"candles_{timeframe}_{trade_file}"
+
+
+def _init_worker(feed_dir, timeframes, chunk_rows, fill_gaps, progress_callback):
+    _worker_state.update({
+        "feed_dir": feed_dir,
+        "timeframes": timeframes,
+        "chunk_rows": chunk_rows,
+        "fill_gaps": fill_gaps,
+        "progress_callback": progress_callback,
+    })
+
+
+def _convert_one(trade_file):
+    state = _worker_state
+    last_percent = [-1]
+
+    def on_progress(percent):
+        # প্রতিটি চাঙ্কে না পাঠিয়ে শুধু পার্সেন্ট বদলালে পাঠানো
+        if state["progress_callback"] and percent != last_percent[0]:
+            last_percent[0] = percent
+            state["progress_callback"](trade_file, percent)
+
+    try:
+        outputs = {
+            to_pandas_timeframe(tf): os.path.join(state["feed_dir"], output_filename(trade_file, tf))
+            for tf in state["timeframes"]
+        }
+        counts = convert_trade_file(
+            os.path.join(state["feed_dir"], trade_file), outputs,
+            state["chunk_rows"], state["fill_gaps"], on_progress
+        )
+        files = {tf: output_filename(trade_file, tf) for tf in state["timeframes"]}
+        candles = {tf: counts[to_pandas_timeframe(tf)] for tf in state["timeframes"]}
+        return {"file": trade_file, "outputs": files, "candles": candles, "error": None}
+    except Exception as e:
+        print(f"Error converting {trade_file}: {e}")
+        return {"file": trade_file, "outputs": {}, "candles": {}, "error": str(e)}
+
+
+def run_parallel_conversion(feed_dir, trade_files, timeframes, workers=None, chunk_rows=None, fill_gaps=True,
+                            progress_callback=None, on_file_done=None):
+    """
+    ট্রেড ফাইলগুলো প্রসেস পুলে একসাথে কনভার্ট করে, প্রতিটি ফাইল একবার পড়েই সব timeframes লেখে।
+    progress_callback(file, percent) ওয়ার্কার প্রসেসে কল হয় (তাই পিকল-যোগ্য module-level ফাংশন হতে হবে)।
+    on_file_done(result) প্রতিটি ফাইল শেষ হলে মেইন প্রসেসে কল হয়।
+    """
+    workers = resolve_worker_count(settings.TRADE_CONVERT_WORKERS if workers is None else workers)
+    results = []
+    if not trade_files:
+        return results
+
+    pool = Pool(
+        processes=min(workers, len(trade_files)),
+        initializer=_init_worker,
+        initargs=(feed_dir, list(timeframes), chunk_rows, fill_gaps, progress_callback)
+    )
+    try:
+        for result in pool.imap_unordered(_convert_one, trade_files):
+            results.append(result)
+            if on_file_done:
+                on_file_done(result)
+    finally:
+        pool.close()
+        pool.terminate()
+        pool.join()
+    return results
@@ -0,0 +1,281 @@
+import math
+import numpy as np
+import pandas as pd
+from app.strategies import SmaCross, EmaCross, RsiStrategy, MacdCross, BollingerBandsStrat
+from app.services.indicator_cache import indicator_cache, data_fingerprint
+
+# -----------------------------------------------------------
+# NumPy Vectorized Fast Path (শুধুমাত্র বিল্ট-ইন STRATEGY_MAP স্ট্র্যাটেজির জন্য)
+# -----------------------------------------------------------
+# Backtrader এর বার-বাই-বার লুপ ছাড়াই পুরো অ্যারের উপর ইন্ডিকেটর ও এন্ট্রি/এক্সিট মাস্ক হিসাব করা হয়।
+# এক্সিকিউশন মডেল Backtrader এর ডিফল্ট ব্রোকারের মতোই:
+#   - সিগনাল বারের close এ অর্ডার, পরের বারের open এ ফিল (slippage high/low দিয়ে ক্যাপ করা)
+#   - PercentSizer: cash / close * percents%
+#   - ক্যাশ না থাকলে অর্ডার Margin হয়ে বাতিল
+#   - COMM_PERC কমিশন, DrawDown, Yearly SharpeRatio ও TradeAnalyzer এর সমতুল্য মেট্রিক্স
+
+
+def sma(values, period):
+    return pd.Series(values).rolling(int(period)).mean().to_numpy()
+
+
+def ema(values, period, alpha=None):
+    """Backtrader ExponentialSmoothing: প্রথম `period` ভ্যালুর SMA দিয়ে সিড, তারপর রিকার্সিভ স্মুদিং।"""
+    period = int(period)
+    alpha = alpha if alpha is not None else 2.0 / (1.0 + period)
+    out = np.full(len(values), np.nan)
+
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+
+    seed_idx = valid[0] + period - 1
+    segment = values[seed_idx:].copy()
+    segment[0] = math.fsum(values[valid[0]:seed_idx + 1]) / period
+    out[seed_idx:] = pd.Series(segment).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def rsi(close, period):
+    """Backtrader RSI (Smoothed/Wilder moving average, lookback=1)।"""
+    period = int(period)
+    delta = np.full(len(close), np.nan)
+    delta[1:] = np.diff(close)
+    up = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    down = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+
+    ma_up = ema(up, period, alpha=1.0 / period)
+    ma_down = ema(down, period, alpha=1.0 / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = ma_up / ma_down
+        return 100.0 - 100.0 / (1.0 + rs)
+
+
+def macd(close, period_me1, period_me2, period_signal):
+    macd_line = ema(close, period_me1) - ema(close, period_me2)
+    signal_line = ema(macd_line, period_signal)
+    return macd_line, signal_line
+
+
+def stddev(close, period, mid=None):
+    mid = sma(close, period) if mid is None else mid
+    return np.sqrt(np.abs(sma(close * close, period) - mid * mid))
+
+
+def bollinger(close, period, devfactor):
+    mid = sma(close, period)
+    std = stddev(close, period, mid)
+    return mid + devfactor * std, mid, mid - devfactor * std
+
+
+def crossover(a, b):
+    """Backtrader CrossOver: +1 (উপরে ক্রস), -1 (নিচে ক্রস), 0 অন্যথায়।"""
+    diff = a - b
+    valid = ~np.isnan(diff)
+    # NonZeroDifference: শূন্য পার্থক্যে আগের নন-জিরো মান ধরে রাখা হয়
+    keep = valid & (diff != 0)
+    if valid.any():
+        keep[np.argmax(valid)] = True
+    nzd = pd.Series(np.where(keep, diff, np.nan)).ffill().to_numpy(copy=True)
+    nzd[~valid] = np.nan
+
+    prev = np.full(len(diff), np.nan)
+    prev[1:] = nzd[:-1]
+    with np.errstate(invalid='ignore'):
+        up = (prev < 0.0) & (a > b)
+        down = (prev > 0.0) & (a < b)
+    return up.astype(np.int8) - down.astype(np.int8)
+
+
+# -----------------------------------------------------------
+# স্ট্র্যাটেজি ভিত্তিক এন্ট্রি/এক্সিট মাস্ক (Alias লজিক স্ট্র্যাটেজি ক্লাসের মতোই)
+# -----------------------------------------------------------
+# `cached(name, params, compute)` ইন্ডিকেটর ক্যাশ থেকে অ্যারে দেয়, না থাকলে compute() চালিয়ে রেখে দেয়।
+
+def _sma_cross_signals(p, close, cached):
+    short_p = int(p['fast_period'] if p['fast_period'] else p['short_period'])
+    long_p = int(p['slow_period'] if p['slow_period'] else p['long_period'])
+    fast = cached('sma', (short_p,), lambda: sma(close, short_p))
+    slow = cached('sma', (long_p,), lambda: sma(close, long_p))
+    cross = crossover(fast, slow)
+    return cross > 0, cross < 0
+
+
+def _ema_cross_signals(p, close, cached):
+    sp = int(p['short_period'] if p['short_period'] else p['shortPeriod'])
+    lp = int(p['long_period'] if p['long_period'] else p['longPeriod'])
+    fast = cached('ema', (sp,), lambda: ema(close, sp))
+    slow = cached('ema', (lp,), lambda: ema(close, lp))
+    cross = crossover(fast, slow)
+    return cross > 0, cross < 0
+
+
+def _rsi_signals(p, close, cached):
+    period = int(p['rsi_period'] if p['rsi_period'] else p['period'])
+    upper = p['rsi_upper'] if p['rsi_upper'] else p['overbought']
+    lower = p['rsi_lower'] if p['rsi_lower'] else p['oversold']
+    values = cached('rsi', (period,), lambda: rsi(close, period))
+    with np.errstate(invalid='ignore'):
+        return values < lower, values > upper
+
+
+def _macd_signals(p, close, cached):
+    fp = int(p['fast_period'] if p['fast_period'] else p['fastPeriod'])
+    sp = int(p['slow_period'] if p['slow_period'] else p['slowPeriod'])
+    sig = int(p['signal_period'] if p['signal_period'] else p['signalPeriod'])
+    fast = cached('ema', (fp,), lambda: ema(close, fp))
+    slow = cached('ema', (sp,), lambda: ema(close, sp))
+    macd_line = cached('macd', (fp, sp), lambda: fast - slow)
+    signal_line = cached('macd_signal', (fp, sp, sig), lambda: ema(macd_line, sig))
+    cross = crossover(macd_line, signal_line)
+    return cross > 0, cross < 0
+
+
+def _bollinger_signals(p, close, cached):
+    period = int(p['period'])
+    dev = float(p['std_dev'] if p['std_dev'] else (p['dev'] if p['dev'] else p['stdDev']))
+    mid = cached('sma', (period,), lambda: sma(close, period))
+    std = cached('stddev', (period,), lambda: stddev(close, period, mid))
+    bot = mid - dev * std
+    with np.errstate(invalid='ignore'):
+        return close < bot, close > mid
+
+
+SIGNAL_BUILDERS = {
+    SmaCross: _sma_cross_signals,
+    EmaCross: _ema_cross_signals,
+    RsiStrategy: _rsi_signals,
+    MacdCross: _macd_signals,
+    BollingerBandsStrat: _bollinger_signals,
+}
+
+RISK_PARAMS = ('stop_loss', 'take_profit', 'trailing_stop')
+
+
+def supports(strategy_class, params):
+    """শুধু হুবহু বিল্ট-ইন ক্লাস এবং SL/TP/Trailing ছাড়া রান হলে ফাস্ট-পাথ ব্যবহার করা যাবে।"""
+    if strategy_class not in SIGNAL_BUILDERS:
+        return False
+    return not any(float(params.get(k) or 0) > 0 for k in RISK_PARAMS)
+
+
+def _resolve_params(strategy_class, params):
+    resolved = dict(strategy_class.params._getitems())
+    resolved.update(params)
+    return resolved
+
+
+def _close_fingerprint(df, close):
+    # অপটিমাইজারে একই df বারবার আসে, তাই হ্যাশ একবার হিসাব করে df.attrs এ রাখা হয়
+    cached = df.attrs.get('_close_fingerprint')
+    if cached and cached[0] == len(close):
+        return cached[1]
+    fingerprint = data_fingerprint(close)
+    df.attrs['_close_fingerprint'] = (len(close), fingerprint)
+    return fingerprint
+
+
+def run_vectorized_backtest(df, strategy_class, params, initial_cash, commission=0.001, slippage=0.0, percents=90, cache=None):
+    """
+    _run_single_backtest এর মতোই মেট্রিক dict রিটার্ন করে (সাথে এই রানের indicatorCache hit/miss)।
+    params অবশ্যই আগে থেকে BacktestEngine._filter_params দিয়ে ফিল্টার করা থাকতে হবে।
+    """
+    cache = cache if cache is not None else indicator_cache
+    open_ = df['open'].to_numpy(dtype='float64')
+    high = df['high'].to_numpy(dtype='float64')
+    low = df['low'].to_numpy(dtype='float64')
+    close = df['close'].to_numpy(dtype='float64')
+    n = len(close)
+
+    fingerprint = _close_fingerprint(df, close)
+
+    def cached(name, indicator_params, compute):
+        return cache.get_or_compute((fingerprint, name, indicator_params), compute)
+
+    hits_before, misses_before = cache.hits, cache.misses
+    entries, exits = SIGNAL_BUILDERS[strategy_class](_resolve_params(strategy_class, params), close, cached)
+
+    cash = float(initial_cash)
+    position = 0.0
+    entry_price = entry_comm = 0.0
+    fill_bars, cash_levels, position_levels = [], [], []
+    trade_pnls = []
+
+    # শুধু সিগনাল থাকা বারগুলোতে স্টেট মেশিন চালানো হয় (বাকি সব ভেক্টরাইজড)
+    for i in np.flatnonzero(entries | exits):
+        fill = i + 1
+        if fill >= n:
+            break
+
+        if position == 0.0 and entries[i]:
+            size = cash / close[i] * (percents / 100)
+            price = open_[fill]
+            if slippage > 0:
+                price = min(price * (1 + slippage), high[fill])
+            comm = abs(size) * price * commission
+            if cash - size * price - comm < 0.0:
+                continue  # Margin: পর্যাপ্ত ক্যাশ নেই
+            cash = cash - size * price - comm
+            position, entry_price, entry_comm = size, price, comm
+
+        elif position > 0.0 and exits[i]:
+            price = open_[fill]
+            if slippage > 0:
+                price = max(price * (1 - slippage), low[fill])
+            comm = abs(position) * price * commission
+            pnl = position * (price - entry_price)
+            cash = cash + position * entry_price + pnl - comm
+            trade_pnls.append(pnl - entry_comm - comm)
+            position = 0.0
+
+        else:
+            continue
+
+        fill_bars.append(fill)
+        cash_levels.append(cash)
+        position_levels.append(position)
+
+    # প্রতিটি বারের পোর্টফোলিও ভ্যালু (cash + position * close)
+    cash_series = np.full(n, np.nan)
+    position_series = np.full(n, np.nan)
+    if fill_bars:
+        cash_series[fill_bars] = cash_levels
+        position_series[fill_bars] = position_levels
+    cash_series = pd.Series(cash_series).ffill().fillna(float(initial_cash)).to_numpy()
+    position_series = pd.Series(position_series).ffill().fillna(0.0).to_numpy()
+    values = cash_series + position_series * close
+
+    metrics = summarize_values(values, df.index, initial_cash, len(trade_pnls), sum(1 for pnl in trade_pnls if pnl >= 0.0))
+    metrics["indicatorCache"] = {"hits": cache.hits - hits_before, "misses": cache.misses - misses_before}
+    return metrics
+
+
+def summarize_values(values, index, initial_cash, total_closed, won_trades):
+    """প্রতি বারের পোর্টফোলিও ভ্যালু থেকে _run_single_backtest এর মেট্রিক (Cerebro analyzer গুলোর সমান)।"""
+    n = len(values)
+    end_value = float(values[-1]) if n else float(initial_cash)
+    profit_percent = ((end_value - initial_cash) / initial_cash) * 100
+
+    peaks = np.maximum.accumulate(values) if n else values
+    max_drawdown = float(np.max(100.0 * (peaks - values) / peaks)) if n else 0.0
+
+    # SharpeRatio (timeframe=Years, riskfreerate=0): বছরের শেষ ভ্যালু থেকে রিটার্ন
+    sharpe_ratio = 0
+    if n:
+        year_end_values = pd.Series(values).groupby(index[:n].year.to_numpy()).last().to_numpy()
+        yearly_returns = np.diff(np.r_[float(initial_cash), year_end_values]) / np.r_[float(initial_cash), year_end_values[:-1]]
+        deviation = float(np.std(yearly_returns))
+        if deviation > 0:
+            sharpe_ratio = float(np.mean(yearly_returns)) / deviation
+
+    win_rate = (won_trades / total_closed * 100) if total_closed > 0 else 0
+
+    return {
+        "profitPercent": round(profit_percent, 2),
+        "maxDrawdown": round(max_drawdown, 2),
+        "sharpeRatio": round(sharpe_ratio, 2),
+        "total_trades": total_closed,
+        "winRate": round(win_rate, 2),
+        "final_value": round(end_value, 2),
+        "initial_cash": initial_cash,
+    }
@@ -0,0 +1,251 @@
+import statistics
+from collections import Counter
+import backtrader as bt
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.services import event_backtest
+
+# -----------------------------------------------------------
+# Walk-Forward Optimization
+# -----------------------------------------------------------
+# পুরো রেঞ্জে একবার অপটিমাইজ করলে ওভারফিট হয় আর out-of-sample ধারণা পাওয়া যায় না। এখানে একবার লোড করা
+# DataFrame কে rolling (বা anchored) train/test উইন্ডোতে ভাগ করা হয়: প্রতিটি train উইন্ডোতে গ্রিড সার্চ,
+# বিজয়ী প্যারামিটার দিয়ে ঠিক পরের test উইন্ডো চালানো। test উইন্ডোগুলো পরপর, তাই তাদের ইকুইটি জোড়া দিয়ে
+# (আগের উইন্ডোর শেষ ক্যাপিটাল থেকে পরেরটি শুরু) পুরো out-of-sample কার্ভ পাওয়া যায়।
+# উইন্ডো কাটা হয় df.iloc দিয়ে (কপি/DB কুয়েরি নেই); প্যারালাল মোডে ওয়ার্কাররা shared memory থেকে একই df পায়।
+
+MIN_WINDOW_BARS = 20
+
+
+def parse_period(value):
+    """int (বা "500") = বার সংখ্যা, নাহলে pandas Timedelta স্ট্রিং ("30D", "12h")।"""
+    if isinstance(value, (int, np.integer)) or (isinstance(value, str) and value.strip().isdigit()):
+        return int(value)
+    return pd.Timedelta(value)
+
+
+def build_windows(index, train_period, test_period, anchored=False):
+    """
+    [(train_start, train_end, test_start, test_end)] iloc সীমা (end exclusive)। test উইন্ডো একটার পর একটা
+    test_period করে সরে; anchored হলে train সবসময় শুরু থেকে। দুই অংশেই অন্তত MIN_WINDOW_BARS বার লাগে।
+    """
+    train_period, test_period = parse_period(train_period), parse_period(test_period)
+    n = len(index)
+    windows = []
+
+    if isinstance(train_period, int) and isinstance(test_period, int):
+        test_start = train_period
+        while test_start < n:
+            train_start = 0 if anchored else test_start - train_period
+            windows.append((train_start, test_start, test_start, min(test_start + test_period, n)))
+            test_start += test_period
+    elif isinstance(train_period, pd.Timedelta) and isinstance(test_period, pd.Timedelta):
+        test_time = index[0] + train_period
+        while test_time <= index[-1]:
+            train_start = 0 if anchored else int(index.searchsorted(test_time - train_period, side='left'))
+            test_start = int(index.searchsorted(test_time, side='left'))
+            test_end = int(index.searchsorted(test_time + test_period, side='left'))
+            windows.append((train_start, test_start, test_start, test_end))
+            test_time += test_period
+    else:
+        raise ValueError("train_period and test_period must both be bar counts or both be durations")
+
+    return [w for w in windows if w[1] - w[0] >= MIN_WINDOW_BARS and w[3] - w[2] >= MIN_WINDOW_BARS]
+
+
+def _slice(df, start, end):
+    window = df.iloc[start:end]
+    # vectorized_backtest df.attrs এ close fingerprint রাখে; উইন্ডো যেন প্যারেন্টেরটা না পায়
+    window.attrs.pop('_close_fingerprint', None)
+    return window
+
+
+class _ValueRecorder(bt.Analyzer):
+    def start(self):
+        self.values = []
+        self.pnls = []
+
+    def next(self):
+        self.values.append(self.strategy.broker.getvalue())
+
+    def notify_trade(self, trade):
+        if trade.isclosed:
+            self.pnls.append(trade.pnlcomm)
+
+
+class _WarmupBroker(bt.brokers.BackBroker):
+    """warmup এর বারগুলোতে অর্ডার Rejected, তাই warm-up এ খোলা পজিশন test এ বয়ে যায় না।"""
+
+    params = (('warmup', 0),)
+
+    def submit(self, order, check=True):
+        if len(order.data) <= self.p.warmup:
+            order.reject(self)
+            self.notify(order)
+            return order
+        return super().submit(order, check)
+
+
+def evaluate_window(engine, df, strategy_name, initial_cash, params, fixed_params, commission=0.001, slippage=0.0, warmup=0):
+    """
+    test উইন্ডোতে একটি রান: (মেট্রিক dict, প্রতি বারের পোর্টফোলিও ভ্যালু)। df এর প্রথম warmup বার শুধু
+    ইন্ডিকেটর গরম করার জন্য (অর্ডার নেওয়া হয় না); মেট্রিক আর ভ্যালু শুধু বাকি অংশের।
+    """
+    strategy_class = engine._load_strategy_class(strategy_name)
+    valid_params = engine._filter_params(strategy_class, engine._clean_params({**fixed_params, **params}))
+
+    if event_backtest.supports(strategy_class):
+        result = event_backtest.run_event_backtest(df, strategy_class, valid_params, initial_cash, commission, slippage,
+                                                   trade_from=warmup)
+        values = result.values
+        pnls = [t.pnlcomm for t in result.broker.trades]
+    else:
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.broker = _WarmupBroker(warmup=warmup)
+        cerebro.adddata(bt.feeds.PandasData(dataname=df))
+        cerebro.addstrategy(strategy_class, **valid_params)
+        cerebro.broker.setcash(initial_cash)
+        cerebro.broker.setcommission(commission=commission, commtype=bt.CommInfoBase.COMM_PERC, margin=None, mult=1.0, stocklike=True)
+        if slippage > 0: cerebro.broker.set_slippage_perc(perc=slippage)
+        cerebro.addsizer(bt.sizers.PercentSizer, percents=90)
+        cerebro.addanalyzer(_ValueRecorder, _name="values")
+        strat = cerebro.run()[0]
+        # Analyzer.prenext ও next কল করে, তাই প্রতিটি বারের ভ্যালু থাকে
+        values = np.asarray(strat.analyzers.values.values, dtype='float64')
+        pnls = strat.analyzers.values.pnls
+
+    values = np.asarray(values[warmup:], dtype='float64')
+    total_closed = len(pnls)
+    won = sum(1 for pnl in pnls if pnl >= 0.0)
+
+    end_value = float(values[-1]) if len(values) else float(initial_cash)
+    peaks = np.maximum.accumulate(values) if len(values) else values
+    metrics = {
+        "profitPercent": round((end_value - initial_cash) / initial_cash * 100, 2),
+        "maxDrawdown": round(float(np.max(100.0 * (peaks - values) / peaks)) if len(values) else 0.0, 2),
+        "total_trades": total_closed,
+        "winRate": round(won / total_closed * 100 if total_closed else 0, 2),
+        "final_value": round(end_value, 2),
+        "initial_cash": initial_cash,
+    }
+    return metrics, values
+
+
+def run_window(engine, df, window, param_sets, strategy_name, initial_cash, fixed_params, commission=0.001, slippage=0.0):
+    """একটি উইন্ডো: train এ সব কম্বিনেশন, profitPercent এ সেরাটি দিয়ে test।"""
+    train_start, train_end, test_start, test_end = window
+    train = _slice(df, train_start, train_end)
+    test = _slice(df, test_start, test_end)
+    # test এর আগের বারগুলো দিয়ে ইন্ডিকেটর গরম করা, নাহলে প্রতিটি উইন্ডোর শুরুর slow-period বার ট্রেডই হয় না
+    warmup = min(settings.WALK_FORWARD_WARMUP_BARS, test_start)
+    test_with_warmup = _slice(df, test_start - warmup, test_end)
+
+    best = None
+    for instance_params in param_sets:
+        metrics = engine._run_single_backtest(train, strategy_name, initial_cash, instance_params, fixed_params, commission, slippage)
+        if best is None or metrics['profitPercent'] > best[0]['profitPercent']:
+            best = (metrics, instance_params)
+
+    train_metrics, best_params = best
+    train_metrics.pop('indicatorCache', None)
+    test_metrics, values = evaluate_window(
+        engine, test_with_warmup, strategy_name, initial_cash, best_params, fixed_params, commission, slippage, warmup
+    )
+    times = test.index.to_numpy('datetime64[s]').astype('int64')
+    return {
+        "window": window,
+        "train_start": int(train.index[0].timestamp()),
+        "train_end": int(train.index[-1].timestamp()),
+        "test_start": int(times[0]),
+        "test_end": int(times[-1]),
+        "best_params": best_params,
+        "train": train_metrics,
+        "test": test_metrics,
+        "combinations": len(param_sets),
+        "_equity": (times, np.asarray(values, dtype='float64')),
+    }
+
+
+def parameter_stability(window_results):
+    """প্রতিটি প্যারামিটারের উইন্ডো ভেদে মান: গড়, std, CV আর সবচেয়ে বেশি আসা মানের ভাগ।"""
+    stability = {}
+    names = window_results[0]["best_params"].keys() if window_results else []
+    for name in names:
+        values = [w["best_params"][name] for w in window_results]
+        mode, mode_count = Counter(values).most_common(1)[0]
+        entry = {"values": values, "distinct": len(set(values)), "mode": mode, "mode_share": round(mode_count / len(values), 2)}
+        if all(isinstance(v, (int, float)) for v in values):
+            mean = statistics.fmean(values)
+            std = statistics.pstdev(values)
+            entry.update({"mean": round(mean, 4), "std": round(std, 4), "cv": round(std / abs(mean), 4) if mean else 0.0})
+        stability[name] = entry
+    return stability
+
+
+def stitch_results(window_results, initial_cash):
+    """উইন্ডোগুলোর test ইকুইটি জোড়া দিয়ে out-of-sample কার্ভ আর সামারি।"""
+    window_results = sorted(window_results, key=lambda w: w["window"][2])
+    capital = float(initial_cash)
+    equity = []
+    for w in window_results:
+        times, values = w.pop("_equity")
+        scaled = values * (capital / initial_cash)
+        w["oos_equity"] = [{"time": int(t), "value": round(float(v), 2)} for t, v in zip(times, scaled)]
+        equity.extend(w["oos_equity"])
+        if len(scaled):
+            capital = float(scaled[-1])
+        w["window"] = list(w["window"])
+
+    curve = np.array([point["value"] for point in equity])
+    peaks = np.maximum.accumulate(curve) if len(curve) else curve
+    train_profits = [w["train"]["profitPercent"] for w in window_results]
+    test_profits = [w["test"]["profitPercent"] for w in window_results]
+    avg_train = statistics.fmean(train_profits) if train_profits else 0.0
+    avg_test = statistics.fmean(test_profits) if test_profits else 0.0
+
+    summary = {
+        "windows": len(window_results),
+        "oos_final_value": round(capital, 2),
+        "oos_profit_percent": round((capital - initial_cash) / initial_cash * 100, 2),
+        "oos_max_drawdown": round(float(np.max(100.0 * (peaks - curve) / peaks)) if len(curve) else 0.0, 2),
+        "avg_train_profit": round(avg_train, 2),
+        "avg_test_profit": round(avg_test, 2),
+        # Walk-forward efficiency: in-sample লাভের কতটা out-of-sample এ টিকে থাকে
+        "efficiency": round(avg_test / avg_train, 2) if avg_train > 0 else 0.0,
+        "profitable_windows": sum(1 for p in test_profits if p > 0),
+    }
+
+    return {
+        "mode": "walk_forward",
+        "summary": summary,
+        "windows": window_results,
+        "parameter_stability": parameter_stability(window_results),
+        "oos_equity": equity,
+    }
+
+
+def result_rows(stitched):
+    """
+    optimize() এর অন্য মেথডের মতো রেজাল্ট রো লিস্ট (API/ফ্রন্টএন্ড একই টেবিল দেখায়): প্রতিটি উইন্ডো একটি রো,
+    params = বিজয়ী প্যারামিটার আর মেট্রিক = test (out-of-sample) এর। রো গুলো সময়ের ক্রমে, তাই প্রতিটি রোর
+    oos_equity পরপর জুড়লেই পুরো কার্ভ; summary আর parameter_stability প্রতিটি রোতে একই।
+    """
+    rows = []
+    for w in stitched["windows"]:
+        rows.append({
+            **w["test"],
+            "params": w["best_params"],
+            "mode": stitched["mode"],
+            "window": w["window"],
+            "train_start": w["train_start"],
+            "train_end": w["train_end"],
+            "test_start": w["test_start"],
+            "test_end": w["test_end"],
+            "train": w["train"],
+            "combinations": w["combinations"],
+            "oos_equity": w["oos_equity"],
+            "summary": stitched["summary"],
+            "parameter_stability": stitched["parameter_stability"],
+        })
+    return rows
@@ -1,6 +1,8 @@
 from .celery_app import celery_app
 from app.db.session import SessionLocal
-from .services.backtest_engine import BacktestEngine
+from .services.backtest_engine import BacktestEngine, market_service
+from .services import backtest_cache
+from app.core.config import settings
 import sys
 import math
 import time
@@ -62,8 +64,9 @@ def print_pretty_result(result):
 
 # টাস্কটি ব্যাকগ্রাউন্ডে রান হবে
 @celery_app.task(bind=True)
-def run_backtest_task(self, symbol: str, timeframe: str, strategy_name: str, initial_cash: float, params: dict, start_date: str = None, end_date: str = None, custom_data_file: str = None, commission: float = 0.001, slippage: float = 0.0, secondary_timeframe: str = None, stop_loss: float = 0.0, take_profit: float = 0.0, trailing_stop: float = 0.0):
+def run_backtest_task(self, symbol: str, timeframe: str, strategy_name: str, initial_cash: float, params: dict, start_date: str = None, end_date: str = None, custom_data_file: str = None, commission: float = 0.001, slippage: float = 0.0, secondary_timeframe: str = None, stop_loss: float = 0.0, take_profit: float = 0.0, trailing_stop: float = 0.0, engine: str = None):
     db = SessionLocal()
+    backtest_engine = engine or settings.BACKTEST_ENGINE
     engine = BacktestEngine()
     
     last_percent = -1
@@ -81,8 +84,30 @@ def run_backtest_task(self, symbol: str, timeframe: str, strategy_name: str, ini
             if percent % 10 == 0:
                 print(f"⏳ Backtest Progress: {percent}%", flush=True)
 
+    # ✅ Result Cache: হুবহু একই রিকোয়েস্ট + একই স্ট্র্যাটেজি সোর্স + একই ডাটা হলে আগের রেজাল্টই ফেরত
+    cache_request = {
+        "symbol": symbol, "timeframe": timeframe, "strategy_name": strategy_name,
+        "initial_cash": initial_cash, "params": params, "start_date": start_date, "end_date": end_date,
+        "custom_data_file": custom_data_file, "commission": commission, "slippage": slippage,
+        "secondary_timeframe": secondary_timeframe, "stop_loss": stop_loss,
+        "take_profit": take_profit, "trailing_stop": trailing_stop, "engine": backtest_engine
+    }
+
     try:
         publish_task_status('BACKTEST', self.request.id, 'processing', 0)
+
+        if settings.BACKTEST_CACHE_ENABLED:
+            try:
+                cache_key = backtest_cache.request_key(db, engine, market_service, cache_request)
+                cached = backtest_cache.result_cache.get(cache_key) if cache_key else None
+                if cached:
+                    print(f"⚡ Backtest Cache Hit: {symbol} ({strategy_name})", flush=True)
+                    print_pretty_result(cached)
+                    publish_task_status('BACKTEST', self.request.id, 'completed', 100, cached)
+                    return cached
+            except Exception as e:
+                print(f"⚠️ Backtest Cache Lookup Error: {e}")
+
         result = engine.run(
             db=db,
             symbol=symbol,
@@ -99,10 +124,20 @@ def run_backtest_task(self, symbol: str, timeframe: str, strategy_name: str, ini
             secondary_timeframe=secondary_timeframe,
             stop_loss=stop_loss,
             take_profit=take_profit,
-            trailing_stop=trailing_stop
+            trailing_stop=trailing_stop,
+            engine=backtest_engine
         )
         print_pretty_result(result)
         publish_task_status('BACKTEST', self.request.id, 'completed', 100, result)
+
+        if settings.BACKTEST_CACHE_ENABLED and result.get("status") == "success":
+            try:
+                # রান চলাকালীন Auto-sync হলে ডাটা বদলে যায়, তাই কী আবার হিসাব করা হয়
+                cache_key = backtest_cache.request_key(db, engine, market_service, cache_request)
+                if cache_key:
+                    backtest_cache.result_cache.set(cache_key, result)
+            except Exception as e:
+                print(f"⚠️ Backtest Cache Store Error: {e}")
         return result
         
     except Exception as e:
@@ -115,7 +150,7 @@ def run_backtest_task(self, symbol: str, timeframe: str, strategy_name: str, ini
         db.close()
 
 @celery_app.task(bind=True)
-def run_optimization_task(self, symbol: str, timeframe: str, strategy_name: str, initial_cash: float, params: dict, start_date: str = None, end_date: str = None, method="grid", population_size=50, generations=10, commission: float = 0.001, slippage: float = 0.0):
+def run_optimization_task(self, symbol: str, timeframe: str, strategy_name: str, initial_cash: float, params: dict, start_date: str = None, end_date: str = None, method="grid", population_size=50, generations=10, commission: float = 0.001, slippage: float = 0.0, workers: int = None, chunk_size: int = None, train_period: str = None, test_period: str = None, anchored: bool = False, n_trials: int = None, prune: bool = True):
     db = SessionLocal()
     engine = BacktestEngine()
     
@@ -165,7 +200,14 @@ def run_optimization_task(self, symbol: str, timeframe: str, strategy_name: str,
             progress_callback=on_progress,
             abort_callback=check_abort,
             commission=commission,
-            slippage=slippage
+            slippage=slippage,
+            workers=workers,
+            chunk_size=chunk_size,
+            train_period=train_period,
+            test_period=test_period,
+            anchored=anchored,
+            n_trials=n_trials,
+            prune=prune
         )
         
         try:
@@ -306,7 +348,7 @@ def run_live_bot_task(self, bot_id: int):
         # Celery এর ভেতরে Asyncio রান করা
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        loop.run_until_complete(engine.run_loop())
+        loop.run_until_complete(engine.run())
         loop.close()
 
     except Exception as e:
@@ -326,37 +368,43 @@ from .celery_app import celery_app
 from celery import current_task
 from tqdm import tqdm
 from .utils import get_redis_client
+from app.services.feed_store import feed_store
+from app.services.exchange_pool import exchange_pool, split_windows
+from celery.signals import worker_process_shutdown
 
 DATA_FEED_DIR = "app/data_feeds"
 os.makedirs(DATA_FEED_DIR, exist_ok=True)
 
-# --- Helper: শেষ টাইমস্ট্যাম্প বের করার ফাংশন ---
-def get_last_timestamp(file_path):
-    try:
-        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-            return None
-        with open(file_path, 'rb') as f:
-            try:
-                f.seek(-2, os.SEEK_END)
-                while f.read(1) != b'\n':
-                    f.seek(-2, os.SEEK_CUR)
-            except OSError:
-                f.seek(0)
-            
-            last_line = f.readline().decode().strip()
-            if not last_line: return None
-            data = last_line.split(',')
-            
-            if len(data) > 0:
-                 try:
-                    # আপনার CSV তে ডেট ফরম্যাট 'YYYY-MM-DD HH:MM:SS' হিসেবে সেভ হচ্ছে
-                    dt_obj = datetime.strptime(data[0], "%Y-%m-%d %H:%M:%S")
-                    return int(dt_obj.timestamp() * 1000)
-                 except ValueError:
-                    # যদি কোনো কারণে ফরম্যাট না মিলে
-                    pass
-    except Exception:
-        return None
+# ওয়ার্কার প্রসেস বন্ধ হলে async exchange ক্লায়েন্টগুলোর সেশন বন্ধ করা
+@worker_process_shutdown.connect
+def close_exchange_pool(**kwargs):
+    exchange_pool.close()
+
+def run_windowed_download(task, windows, writer, start_ts, total_duration, desc, fetch_batch, to_rows=None):
+    """
+    উইন্ডোগুলো DOWNLOAD_CONCURRENCY টি করে একসাথে ফেচ করে ক্রমানুসারে লেখে, তাই ফাইলে সবসময় একটানা prefix
+    থাকে এবং resume শেষ লেখা timestamp থেকেই নিরাপদ। ইউজার স্টপ করলে Revoked রেজাল্ট রিটার্ন করে।
+    """
+    redis_client = get_redis_client()
+    batch_size = max(1, settings.DOWNLOAD_CONCURRENCY)
+    with tqdm(total=total_duration, unit="ms", desc=desc, ncols=80) as pbar:
+        for i in range(0, len(windows), batch_size):
+            # ✅ স্টপ চেক: প্রতিটি ব্যাচের আগে
+            if task.request.id and redis_client.exists(f"abort_task:{task.request.id}"):
+                print(f"🛑 Stop signal received via Redis for task {task.request.id}")
+                return {"status": "Revoked", "message": "Stopped by user"}
+
+            batch = windows[i:i + batch_size]
+            # retry/backoff পুলের ভেতরেই, এখানে এরর আসা মানে সব চেষ্টা ব্যর্থ
+            for rows in exchange_pool.run(fetch_batch(batch)):
+                if rows:
+                    writer.append(to_rows(rows) if to_rows else rows)
+
+            covered = batch[-1][1] - batch[0][0]
+            pbar.update(covered)
+            progress_pct = min(100, int(((batch[-1][1] - start_ts) / total_duration) * 100))
+            task.update_state(state='PROGRESS', meta={'percent': progress_pct, 'status': 'Downloading...'})
+            publish_task_status('DOWNLOAD', task.request.id, 'processing', progress_pct)
     return None
 
 # ✅ Helper to safe parse date
@@ -384,14 +432,9 @@ def download_candles_task(self, exchange_id, symbol, timeframe, start_date, end_
     try:
         if exchange_id not in ccxt.exchanges:
             return {"status": "failed", "error": f"Exchange {exchange_id} not found"}
-            
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class({
-            'enableRateLimit': True,
-            'userAgent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'timeout': 10000,
-        })
-        redis_client = get_redis_client()
+
+        # তারিখ পার্সিং এর জন্য exchange ইনস্ট্যান্স লাগে না (parse8601/milliseconds static)
+        exchange = ccxt.Exchange
         
         safe_symbol = symbol.replace('/', '-')
         filename = f"{exchange_id}_{safe_symbol}_{timeframe}.csv"
@@ -409,79 +452,39 @@ def download_candles_task(self, exchange_id, symbol, timeframe, start_date, end_
         else:
             end_ts = exchange.milliseconds()
 
-        # ৩. রিজুউম লজিক
-        if os.path.exists(save_path):
-            with open(save_path, 'r') as f:
-                lines = f.readlines()
-                if len(lines) > 1:
-                    last_line = lines[-1].strip().split(',')
-                    try:
-                        last_ts_obj = datetime.strptime(last_line[0], "%Y-%m-%d %H:%M:%S")
-                        last_ts = int(last_ts_obj.timestamp() * 1000)
-                        if last_ts:
-                            since = last_ts + 1
-                            print(f"🔄 Resuming {symbol} download from {last_line[0]}")
-                    except: pass
+        # ৩. রিজুউম লজিক (O(1): বাইনারি ফিডের শেষ সেগমেন্ট বা CSV এর resume ম্যানিফেস্ট থেকে)
+        if feed_store.enabled and not feed_store.exists(filename) and os.path.exists(save_path):
+            # পুরোনো CSV থাকলে আগে বাইনারি ফিডে মাইগ্রেট, তারপর ফিড থেকে resume
+            feed_store.migrate_csv(filename)
+        last_ts = feed_store.resume_timestamp(filename, 'candles')
+        if last_ts:
+            since = last_ts + 1
+            print(f"🔄 Resuming {symbol} download from timestamp {last_ts}")
 
         total_duration = end_ts - since
         if total_duration <= 0:
              return {"status": "completed", "message": "Data is already up to date."}
 
         start_ts = since
-        mode = 'a' if os.path.exists(save_path) else 'w'
         
         print(f"🚀 Starting download: {symbol} ({timeframe}) | Target: {end_date or 'NOW'}")
 
-        with open(save_path, mode, newline='') as f:
-            writer = csv.writer(f)
-            if mode == 'w' or os.path.getsize(save_path) == 0:
-                writer.writerow(['datetime', 'open', 'high', 'low', 'close', 'volume'])
-            
-            with tqdm(total=total_duration, unit="ms", desc=f"📥 {symbol}", ncols=80) as pbar:
-                while True:
-                    # ✅ ১. স্টপ চেক: লুপের শুরুতে
-                    if self.request.id and redis_client.exists(f"abort_task:{self.request.id}"):
-                        print(f"🛑 Stop signal received via Redis for task {self.request.id}")
-                        return {"status": "Revoked", "message": "Stopped by user"}
-
-                    try:
-                        if since >= end_ts: break
-
-                        # ✅ ২. ফেচ করার সময় টাইমআউট সেট করুন যাতে এটি হ্যাং না হয়
-                        exchange.timeout = 10000 # 10 seconds timeout
-                        candles = exchange.fetch_ohlcv(symbol, timeframe, since, limit=1000)
-                        
-                        # ✅ ৩. স্টপ চেক: প্রসেসিং এর পরে আবার চেক
-                        if self.request.id and redis_client.exists(f"abort_task:{self.request.id}"):
-                             return {"status": "Revoked", "message": "Stopped by user"}
-                        
-                        if not candles: break
-                        
-                        rows = []
-                        for c in candles:
-                            if c[0] > end_ts: continue
-                            dt_str = datetime.fromtimestamp(c[0]/1000).strftime('%Y-%m-%d %H:%M:%S')
-                            rows.append([dt_str, c[1], c[2], c[3], c[4], c[5]])
-                        
-                        if rows:
-                            writer.writerows(rows)
-                            f.flush()
-                        
-                        current_ts = candles[-1][0]
-                        step = current_ts - since
-                        pbar.update(step)
-                        since = current_ts + 1
-                        
-                        progress_pct = min(100, int(((current_ts - start_ts) / total_duration) * 100))
-                        self.update_state(state='PROGRESS', meta={'percent': progress_pct, 'status': 'Downloading...'})
-                        publish_task_status('DOWNLOAD', self.request.id, 'processing', progress_pct)
-                        
-                        if current_ts >= end_ts: break
-                        
-                    except Exception as e:
-                        print(f"Fetch Error: {e}")
-                        time.sleep(2) # এরর হলে একটু অপেক্ষা
-                        continue
+        # ✅ পেজ-সাইজের আলাদা উইন্ডো একসাথে ফেচ (শেয়ার্ড async ক্লায়েন্ট + token bucket)
+        limit = 1000
+        window_ms = limit * exchange.parse_timeframe(timeframe) * 1000
+        windows = split_windows(since, end_ts, window_ms)
+
+        # ✅ Arrow সেগমেন্ট ফিডে append (pyarrow না থাকলে আগের মতো CSV)
+        with feed_store.writer(filename, 'candles') as writer:
+            revoked = run_windowed_download(
+                self, windows, writer, start_ts, total_duration, f"📥 {symbol}",
+                lambda batch: exchange_pool.fetch_windows(
+                    exchange_pool.fetch_ohlcv_window, exchange_id, batch, symbol, timeframe
+                ),
+                lambda rows: [c[:6] for c in rows]
+            )
+            if revoked:
+                return revoked
 
         publish_task_status('DOWNLOAD', self.request.id, 'completed', 100, {"filename": filename})
         return {"status": "completed", "filename": filename}
@@ -495,14 +498,8 @@ def download_trades_task(self, exchange_id, symbol, start_date, end_date=None):
     try:
         if exchange_id not in ccxt.exchanges:
              return {"status": "failed", "error": f"Exchange {exchange_id} not found"}
-        
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class({
-            'enableRateLimit': True,
-            'userAgent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'timeout': 10000,
-        })
-        redis_client = get_redis_client() 
+
+        exchange = ccxt.Exchange
         
         safe_symbol = symbol.replace('/', '-')
         filename = f"trades_{exchange_id}_{safe_symbol}.csv"
@@ -518,72 +515,190 @@ def download_trades_task(self, exchange_id, symbol, start_date, end_date=None):
         else:
             end_ts = exchange.milliseconds()
 
-        if os.path.exists(save_path):
-            last_ts = get_last_timestamp(save_path)
-            if last_ts: 
-                since = last_ts + 1
-                print(f"🔄 Resuming Trades {symbol} from timestamp {last_ts}")
+        if feed_store.enabled and not feed_store.exists(filename) and os.path.exists(save_path):
+            feed_store.migrate_csv(filename)
+        last_ts = feed_store.resume_timestamp(filename, 'trades')
+        if last_ts:
+            since = last_ts + 1
+            print(f"🔄 Resuming Trades {symbol} from timestamp {last_ts}")
         
         total_duration = end_ts - since
         if total_duration <= 0:
              return {"status": "completed", "message": "Trades already up to date."}
 
         start_ts = since
-        mode = 'a' if os.path.exists(save_path) else 'w'
         
         print(f"🚀 Starting Trade DL: {symbol} | Target: {end_date or 'NOW'}")
 
-        with open(save_path, mode, newline='') as f:
-            writer = csv.writer(f)
-            if mode == 'w' or os.path.getsize(save_path) == 0:
-                writer.writerow(['id', 'timestamp', 'datetime', 'symbol', 'side', 'price', 'amount', 'cost'])
-            
-            with tqdm(total=total_duration, unit="ms", desc=f"Tick {symbol}", ncols=80) as pbar:
-                while True:
-                    # ✅ ১. স্টপ চেক
-                    if self.request.id and redis_client.exists(f"abort_task:{self.request.id}"):
-                          return {"status": "Revoked", "message": "Stopped by user"}
-
-                    try:
-                        if since >= end_ts: break
-                        
-                        # ✅ ২. টাইমআউট
-                        exchange.timeout = 10000 
-                        trades = exchange.fetch_trades(symbol, since, limit=1000)
-                        
-                        # ✅ ৩. স্টপ চেক
-                        if self.request.id and redis_client.exists(f"abort_task:{self.request.id}"):
-                             return {"status": "Revoked", "message": "Stopped by user"}
-                        
-                        if not trades: break
-                        
-                        rows = []
-                        for t in trades:
-                            if t['timestamp'] > end_ts: continue
-                            rows.append([t['id'], t['timestamp'], t['datetime'], t['symbol'], t['side'], t['price'], t['amount'], t['cost']])
-                        
-                        if rows:
-                            writer.writerows(rows)
-                            f.flush()
-                        
-                        current_ts = trades[-1]['timestamp']
-                        step = current_ts - since
-                        pbar.update(step)
-                        since = current_ts + 1
-                        
-                        progress_pct = min(100, int(((current_ts - start_ts) / total_duration) * 100))
-                        self.update_state(state='PROGRESS', meta={'percent': progress_pct, 'status': 'Fetching Trades...'})
-                        publish_task_status('DOWNLOAD', self.request.id, 'processing', progress_pct)
-                        
-                        if current_ts >= end_ts: break
-                        
-                    except Exception as e:
-                        print(f"Fetch Trades Error: {e}")
-                        time.sleep(2)
-                        continue
-                    
+        windows = split_windows(since, end_ts, settings.DOWNLOAD_TRADE_WINDOW_MINUTES * 60_000)
+
+        with feed_store.writer(filename, 'trades') as writer:
+            revoked = run_windowed_download(
+                self, windows, writer, start_ts, total_duration, f"Tick {symbol}",
+                lambda batch: exchange_pool.fetch_windows(
+                    exchange_pool.fetch_trades_window, exchange_id, batch, symbol
+                )
+            )
+            if revoked:
+                return revoked
+
         publish_task_status('DOWNLOAD', self.request.id, 'completed', 100, {"filename": filename})
         return {"status": "completed", "filename": filename}
 
     except Exception as e:
-        return {"status": "failed", "error": str(e)}
\ No newline at end of file
+        return {"status": "failed", "error": str(e)}
+
+# --- Task 3: Batch Download (Multi-Symbol Candles) ---
+from app.services.batch_download import BatchJob, run_batch_download
+from app.services.derived_timeframes import BASE_TIMEFRAME, refresh_aggregates
+from functools import partial
+
+class DbCandleSink:
+    """ব্যাচ ডাউনলোডের ক্যান্ডেল সরাসরি MarketData টেবিলে (upsert, তাই আবার চালালেও ডুপ্লিকেট হয় না)।"""
+
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.db = SessionLocal()
+        self.first_ts = None
+        self.last_ts = None
+
+    def append(self, rows):
+        if market_service._save_candles(self.db, rows, self.symbol, self.timeframe):
+            self.first_ts = rows[0][0] if self.first_ts is None else self.first_ts
+            self.last_ts = rows[-1][0]
+
+    def close(self):
+        try:
+            # 1m লেখা হলে ঐ রেঞ্জের higher-timeframe অ্যাগ্রিগেটগুলো materialize করা
+            if self.timeframe == BASE_TIMEFRAME and self.first_ts is not None:
+                refresh_aggregates(
+                    self.db.get_bind(),
+                    datetime.fromtimestamp(self.first_ts / 1000),
+                    datetime.fromtimestamp(self.last_ts / 1000)
+                )
+        except Exception as e:
+            print(f"⚠️ Aggregate Refresh Error: {e}")
+        finally:
+            self.db.close()
+
+def open_batch_sink(destination, job):
+    if destination == "db":
+        return DbCandleSink(job.symbol, job.timeframe)
+    return feed_store.writer(job.filename, 'candles')
+
+@celery_app.task(bind=True)
+def download_batch_task(self, exchange_id, symbols, timeframes, start_date, end_date=None, destination="file"):
+    task_id = self.request.id
+    try:
+        if exchange_id not in ccxt.exchanges:
+            return {"status": "failed", "error": f"Exchange {exchange_id} not found"}
+        if destination not in ("file", "db"):
+            return {"status": "failed", "error": f"Invalid destination: {destination}"}
+        # _save_candles সব রো "binance" হিসেবে লেখে; অন্য exchange এর রো ভুল লেবেলে যেত বা conflict এ হারিয়ে যেত
+        if destination == "db" and exchange_id != "binance":
+            return {"status": "failed", "error": f"destination 'db' only supports binance, got {exchange_id}"}
+
+        exchange = ccxt.Exchange
+        start_ts = safe_parse_date(exchange, start_date)
+        if start_ts is None:
+            return {"status": "failed", "error": f"Invalid start_date format: {start_date}"}
+        end_ts = safe_parse_date(exchange, end_date) if end_date else exchange.milliseconds()
+        if end_ts is None:
+            return {"status": "failed", "error": f"Invalid end_date format: {end_date}"}
+
+        jobs = []
+        for symbol in dict.fromkeys(symbols):
+            for timeframe in dict.fromkeys(timeframes):
+                since = start_ts
+                filename = None
+                if destination == "file":
+                    filename = f"{exchange_id}_{symbol.replace('/', '-')}_{timeframe}.csv"
+                    # একক ডাউনলোডের মতোই ফাইল থেকে resume
+                    if feed_store.enabled and not feed_store.exists(filename) and os.path.exists(feed_store.csv_path(filename)):
+                        feed_store.migrate_csv(filename)
+                    last_ts = feed_store.resume_timestamp(filename, 'candles')
+                    if last_ts:
+                        since = max(since, last_ts + 1)
+                jobs.append(BatchJob(symbol, timeframe, since, end_ts, filename))
+
+        print(f"🚀 Starting batch download: {len(jobs)} jobs on {exchange_id} -> {destination}")
+        redis_client = get_redis_client()
+        last_publish = [0.0]
+
+        def on_progress(stats):
+            # প্রতিটি উইন্ডোতে না পাঠিয়ে নির্দিষ্ট বিরতিতে (ব্যাকটেস্ট WebSocket চ্যানেলে যায়)
+            now = time.monotonic()
+            if now - last_publish[0] < settings.DOWNLOAD_BATCH_PROGRESS_INTERVAL:
+                return
+            last_publish[0] = now
+            snapshot = stats.snapshot()
+            # এই কলব্যাক exchange pool এর থ্রেডে চলে; সেখানে self.request (thread-local) খালি, তাই task_id স্পষ্টভাবে
+            self.update_state(task_id=task_id, state='PROGRESS', meta={
+                'percent': stats.percent,
+                'status': f"Downloading... {snapshot['candles_per_sec']} candles/s"
+            })
+            publish_task_status('DOWNLOAD', task_id, 'processing', stats.percent, snapshot)
+
+        def should_abort():
+            return bool(task_id and redis_client.exists(f"abort_task:{task_id}"))
+
+        publish_task_status('DOWNLOAD', task_id, 'processing', 0)
+        stats = run_batch_download(
+            exchange_id, jobs, partial(open_batch_sink, destination), on_progress, should_abort
+        )
+        summary = stats.snapshot()
+        print(f"✅ Batch download finished: {summary['candles']} candles, {summary['candles_per_sec']} candles/s, {summary['counts']}")
+
+        if any(job.status == "revoked" for job in jobs):
+            publish_task_status('DOWNLOAD', task_id, 'failed', stats.percent, {"error": "Stopped by user", **summary})
+            return {"status": "Revoked", "message": "Stopped by user", **summary}
+
+        publish_task_status('DOWNLOAD', task_id, 'completed', 100, summary)
+        return {"status": "completed", **summary}
+
+    except Exception as e:
+        publish_task_status('DOWNLOAD', task_id, 'failed', 0, {"error": str(e)})
+        return {"status": "failed", "error": str(e)}
+
+from app.services.trade_conversion_pool import run_parallel_conversion
+
+def publish_convert_file_progress(task_id, trade_file, percent):
+    # ওয়ার্কার প্রসেস থেকে কল হয়: একটি ফাইলের কনভার্সন প্রোগ্রেস
+    publish_task_status('CONVERT', task_id, 'file_progress', percent, {"file": trade_file})
+
+# --- Task: Trades -> Candles (প্রসেস পুলে একসাথে একাধিক ফাইল, প্রতি ফাইলে একবার পড়ে সব টাইমফ্রেম) ---
+@celery_app.task(bind=True)
+def convert_trades_task(self, filenames: list, timeframes: list, workers: int = None, fill_gaps: bool = False):
+    task_id = self.request.id
+    total = len(filenames)
+    done = []
+
+    def on_file_done(result):
+        done.append(result)
+        percent = int(len(done) / total * 100)
+        status_msg = f"Failed: {result['file']}" if result["error"] else f"Converted: {result['file']}"
+        print(f"🔄 Conversion {len(done)}/{total} | {status_msg}", flush=True)
+        self.update_state(state='PROGRESS', meta={'percent': percent, 'status': status_msg})
+        publish_task_status('CONVERT', task_id, 'processing', percent, result)
+
+    try:
+        publish_task_status('CONVERT', task_id, 'processing', 0)
+        results = run_parallel_conversion(
+            DATA_FEED_DIR, filenames, timeframes, workers=workers, fill_gaps=fill_gaps,
+            progress_callback=partial(publish_convert_file_progress, task_id),
+            on_file_done=on_file_done
+        )
+        summary = {
+            "status": "completed",
+            "converted": sum(1 for r in results if not r["error"]),
+            "files": results,
+            "errors": [f"{r['file']}: {r['error']}" for r in results if r["error"]],
+        }
+        publish_task_status('CONVERT', task_id, 'completed', 100, summary)
+        return summary
+
+    except Exception as e:
+        print(f"❌ Conversion Error: {e}", flush=True)
+        publish_task_status('CONVERT', task_id, 'failed', 0, {"error": str(e)})
+        return {"status": "failed", "error": str(e)}
@@ -0,0 +1,92 @@
+import sys
+import os
+import io
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+# Adjust path to find app module
+sys.path.append(os.getcwd())
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.market_service import MarketService
+from app.services.candle_loader import copy_candles
+
+# ✅ ORM পাথ বনাম binary COPY লোডার বেঞ্চমার্ক
+# ব্যবহার: cd backend && python benchmark_candle_loader.py --sizes 100000 1000000 5000000
+# আলাদা সিম্বলে সিনথেটিক ক্যান্ডেল ঢুকিয়ে টেস্ট করা হয় এবং শেষে মুছে ফেলা হয়।
+
+BENCH_SYMBOL = "BENCH/USDT"
+BENCH_TIMEFRAME = "1m"
+
+
+def seed_candles(db, size):
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, size)))
+    df = pd.DataFrame({
+        "exchange": "binance",
+        "symbol": BENCH_SYMBOL,
+        "timeframe": BENCH_TIMEFRAME,
+        "timestamp": pd.date_range("2015-01-01", periods=size, freq="1min"),
+        "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": rng.uniform(1, 100, size),
+    })
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY {models.MarketData.__tablename__} (exchange, symbol, timeframe, timestamp, open, high, low, close, volume) "
+        "FROM STDIN WITH (FORMAT csv)", buffer
+    )
+    cursor.close()
+    db.commit()
+
+
+def clear_candles(db):
+    db.query(models.MarketData).filter(
+        models.MarketData.symbol == BENCH_SYMBOL,
+        models.MarketData.timeframe == BENCH_TIMEFRAME
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    service = MarketService()
+    db = SessionLocal()
+    print(f"{'rows':>10} | {'ORM + DataFrame':>16} | {'binary COPY':>12} | {'speedup':>8}")
+    print("-" * 56)
+    try:
+        for size in args.sizes:
+            clear_candles(db)
+            seed_candles(db, size)
+
+            settings.CANDLE_COPY_LOADER = False
+            orm_time, orm_df = timed(lambda: service._query_candles_df(db, BENCH_SYMBOL, BENCH_TIMEFRAME))
+            copy_time, copy_df = timed(lambda: copy_candles(db, BENCH_SYMBOL, BENCH_TIMEFRAME))
+
+            if not orm_df.equals(copy_df):
+                print(f"⚠️ Result mismatch at {size} rows")
+            print(f"{size:>10,} | {orm_time:>15.2f}s | {copy_time:>11.2f}s | {orm_time / copy_time:>7.1f}x")
+            del orm_df, copy_df
+    finally:
+        clear_candles(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+import backtrader as bt
+
+# Adjust path to find app module
+sys.path.append(os.getcwd())
+
+from app.strategies import STRATEGY_MAP
+from app.services.backtest_engine import FractionalPercentSizer
+from app.services.event_backtest import run_event_backtest
+
+# ✅ Backtrader বনাম ইভেন্ট ইঞ্জিন বেঞ্চমার্ক (bars/sec)
+# ব্যবহার: cd backend && python benchmark_event_backtest.py --sizes 100000 1000000 --strategy "SMA Crossover" --stop-loss 1
+# সিনথেটিক 1m ক্যান্ডেলে দুই ইঞ্জিনই BacktestEngine.run এর একই ব্রোকার সেটআপে চলে; শেষ ভ্যালু মিলছে কি না দেখানো হয়।
+
+
+def make_candles(size):
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, size)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0005, size)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0005, size)))
+    index = pd.date_range("2015-01-01", periods=size, freq="1min", name="datetime")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close,
+                         "volume": rng.uniform(1, 100, size)}, index=index)
+
+
+def run_backtrader(df, strategy_class, params, commission, slippage):
+    cerebro = bt.Cerebro()
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(strategy_class, **params)
+    cerebro.broker.setcash(10000.0)
+    cerebro.broker.setcommission(commission=commission, commtype=bt.CommInfoBase.COMM_PERC, margin=None, mult=1.0, stocklike=True)
+    if slippage > 0:
+        cerebro.broker.set_slippage_perc(perc=slippage)
+    cerebro.addsizer(FractionalPercentSizer, percents=90)
+    # BaseStrategy এর SL/TP প্রিন্ট বেঞ্চমার্কে গোনা হয় না
+    with contextlib.redirect_stdout(io.StringIO()):
+        cerebro.run()
+    return cerebro.broker.getvalue()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--strategy", default="SMA Crossover", choices=sorted(STRATEGY_MAP))
+    parser.add_argument("--stop-loss", type=float, default=0.0)
+    parser.add_argument("--take-profit", type=float, default=0.0)
+    parser.add_argument("--trailing-stop", type=float, default=0.0)
+    parser.add_argument("--commission", type=float, default=0.001)
+    parser.add_argument("--slippage", type=float, default=0.0)
+    parser.add_argument("--skip-backtrader", action="store_true", help="বড় সাইজে শুধু ইভেন্ট ইঞ্জিন")
+    args = parser.parse_args()
+
+    strategy_class = STRATEGY_MAP[args.strategy]
+    params = {k: v for k, v in {
+        "stop_loss": args.stop_loss, "take_profit": args.take_profit, "trailing_stop": args.trailing_stop
+    }.items() if v > 0}
+
+    print(f"{'bars':>10} | {'backtrader bars/s':>18} | {'event bars/s':>13} | {'speedup':>8} | match")
+    print("-" * 68)
+    for size in args.sizes:
+        df = make_candles(size)
+        event_time, result = timed(lambda: run_event_backtest(
+            df, strategy_class, params, 10000.0, args.commission, args.slippage
+        ))
+        if args.skip_backtrader:
+            print(f"{size:>10} | {'-':>18} | {size / event_time:>13,.0f} | {'-':>8} | -")
+            continue
+        bt_time, bt_value = timed(lambda: run_backtrader(df, strategy_class, params, args.commission, args.slippage))
+        match = abs(bt_value - result.end_value) <= 1e-6 * max(1.0, abs(bt_value))
+        print(f"{size:>10} | {size / bt_time:>18,.0f} | {size / event_time:>13,.0f} | "
+              f"{bt_time / event_time:>7.1f}x | {'✅' if match else '❌'} ({bt_value:.2f} / {result.end_value:.2f})")
+
+
+if __name__ == "__main__":
+    main()
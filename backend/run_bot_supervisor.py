@@ -0,0 +1,65 @@
+import sys
+import os
+import signal
+import asyncio
+import argparse
+import multiprocessing
+
+# Adjust path to find app module
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.services.bot_supervisor import BotSupervisor
+
+# ✅ লাইভ বট সুপারভাইজার: প্রতিটি প্রসেস একটি event loop এ অনেক বট চালায়, bot_id এর consistent hash অনুযায়ী ভাগ
+# ব্যবহার: cd backend && python run_bot_supervisor.py [--processes 4]
+# বট স্টার্ট/স্টপ আগের মতোই Redis এর bot_task:{id} key দিয়ে (API সেট/ডিলিট করে)।
+
+
+def run_supervisor():
+    async def main():
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        # SIGTERM/SIGINT এ বটগুলো থামিয়ে lease ছেড়ে দেওয়া, যাতে অন্য প্রসেস সাথে সাথে নিতে পারে
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await BotSupervisor().run()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=settings.BOT_SUPERVISOR_PROCESSES)
+    args = parser.parse_args()
+
+    if not settings.BOT_SUPERVISOR_ENABLED:
+        # বট তখন Celery টাস্কে চলে; সুপারভাইজারও bot_task:{id} দেখে চালালে একই বট দুবার ট্রেড করত
+        print("⏸️ BOT_SUPERVISOR_ENABLED=False, live bots run as Celery tasks. Supervisor exiting.")
+        return
+
+    processes = max(1, args.processes)
+    if processes == 1:
+        run_supervisor()
+        return
+
+    children = [multiprocessing.Process(target=run_supervisor, name=f"bot-supervisor-{i}") for i in range(processes)]
+    for child in children:
+        child.start()
+    # docker stop এর SIGTERM চাইল্ডগুলোতে পৌঁছে দেওয়া (প্রতিটি নিজের বট থামিয়ে বের হয়)
+    signal.signal(signal.SIGTERM, lambda *_: [child.terminate() for child in children])
+    try:
+        for child in children:
+            child.join()
+    except KeyboardInterrupt:
+        for child in children:
+            child.terminate()
+        for child in children:
+            child.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
-import pandas as pd
 import os
+import sys
+
+# backend এর স্ট্রিমিং কনভার্টার ব্যবহার করা
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from app.services.data_processing import stream_trades_to_candles
 
 def convert_trades_to_ohlcv(trade_file_name, timeframe='1s'):
     # ১. ফাইলের পাথ চেক করা
@@ -13,43 +17,18 @@ def convert_trades_to_ohlcv(trade_file_name, timeframe='1s'):
     print("⏳ Processing... This might take a moment depending on file size.")
 
     try:
-        # ২. ডাটা রিড করা (শুধু দরকারি কলামগুলো)
+        # ২. চাঙ্কে চাঙ্কে পড়ে রিস্যাম্পল করা (পুরো ফাইল মেমোরিতে লোড হয় না) 🪄
         # Trade CSV Headers: id, timestamp, datetime, symbol, side, price, amount, cost
-        df = pd.read_csv(file_path, usecols=['datetime', 'price', 'amount'])
-        
-        # Datetime কলামকে ইনডেক্স বানানো
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df.set_index('datetime', inplace=True)
-
-        # ৩. রিস্যাম্পলিং (Magic Happens Here!) 🪄
         # '1s' = 1 Second, '1min' = 1 Minute, etc.
-        ohlc = df['price'].resample(timeframe).ohlc()
-        volume = df['amount'].resample(timeframe).sum()
-
-        # ৪. ডাটা মার্জ করা
-        candles = pd.concat([ohlc, volume], axis=1)
-        candles.columns = ['open', 'high', 'low', 'close', 'volume']
-
-        # ফাঁকা ক্যান্ডেল হ্যান্ডেল করা (যে সেকেন্ডে কোনো ট্রেড হয়নি)
-        # নিয়ম: যদি ট্রেড না থাকে, তবে আগের ক্লোজ প্রাইস হবে বর্তমানের OHLC
-        candles['close'] = candles['close'].ffill()
-        candles['open'] = candles['open'].fillna(candles['close'])
-        candles['high'] = candles['high'].fillna(candles['close'])
-        candles['low'] = candles['low'].fillna(candles['close'])
-        candles['volume'] = candles['volume'].fillna(0)
-
-        # ৫. ফাইল সেভ করা
+        # ফাঁকা ক্যান্ডেল (যে সেকেন্ডে কোনো ট্রেড হয়নি) আগের ক্লোজ প্রাইস দিয়ে পূরণ হয়
         output_filename = trade_file_name.replace('trades_', f'candles_{timeframe}_')
         output_path = f"backend/app/data_feeds/{output_filename}"
-        
-        # ইনডেক্স রিসেট করে CSV বানানো
-        candles.reset_index(inplace=True)
-        candles.to_csv(output_path, index=False)
+        total_candles = stream_trades_to_candles(file_path, output_path, timeframe)
 
         print("\n" + "="*50)
         print(f"🎉 CONVERSION COMPLETE!")
         print(f"📄 Generated: {output_filename}")
-        print(f"📊 Total Candles: {len(candles)}")
+        print(f"📊 Total Candles: {total_candles}")
         print("="*50)
 
     except Exception as e:
@@ -0,0 +1,36 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def make_candles(n, seed=1, freq='1h', volatility=0.01, noise=None, start='2024-01-01', rows=False):
+    """র‍্যান্ডম-ওয়াক OHLCV। noise না দিলে open = আগের close আর ±0.2% wick;
+    rows=True হলে এক্সচেঞ্জের মতো [timestamp_ms, o, h, l, c, v] লিস্ট।"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    if noise is None:
+        high = np.maximum(open_, close) * 1.002
+        low = np.minimum(open_, close) * 0.998
+    else:
+        open_ = open_ * (1 + rng.normal(0, noise, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 2 * noise, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 2 * noise, n)))
+    index = pd.date_range(start, periods=n, freq=freq, name='datetime')
+    df = pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close,
+                       'volume': rng.uniform(1, 100, n)}, index=index)
+    if rows:
+        timestamps = index.as_unit('ms').asi8.tolist()
+        return [[ts, *values] for ts, values in zip(timestamps, df.to_numpy().tolist())]
+    return df
+
+
+@pytest.fixture
+def candles():
+    return make_candles
@@ -0,0 +1,136 @@
+import asyncio
+import fnmatch
+import json
+import time
+from types import SimpleNamespace
+
+from app.services.bot_supervisor import BotSupervisor, HashRing
+
+
+class MemoryRedis:
+    """sync() এ লাগে এমন কয়টি async Redis কমান্ড (TTL ছাড়া)।"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def hset(self, name, key, value):
+        self.data.setdefault(name, {})[key] = str(value)
+
+    async def hgetall(self, name):
+        return dict(self.data.get(name, {}))
+
+    async def hdel(self, name, key):
+        self.data.get(name, {}).pop(key, None)
+
+    async def scan_iter(self, match, count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def eval(self, script, numkeys, key, token, ttl):
+        # শুধু RENEW_LEASE_SCRIPT: value মিললে 1
+        return 1 if self.data.get(key) == token else 0
+
+    async def publish(self, channel, message):
+        return 0
+
+
+class IdleEngine:
+    async def run(self):
+        await asyncio.Event().wait()
+
+
+def test_hash_ring_moves_only_a_share_of_bots():
+    bots = range(1000)
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+    moved = [b for b in bots if before.node_for(b) != after.node_for(b)]
+    # নতুন প্রসেস শুধু নিজের ভাগ নেয়, বাকিরা জায়গা বদলায় না
+    assert all(after.node_for(b) == "d" for b in moved)
+    assert 150 < len(moved) < 350
+
+
+def test_supervisors_split_bots_and_rebalance():
+    async def run():
+        redis = MemoryRedis()
+        for bot_id in range(1, 201):
+            await redis.set(f"bot_task:{bot_id}", "running")
+
+        first = BotSupervisor("node-a", redis, lambda bot_id: IdleEngine())
+        second = BotSupervisor("node-b", redis, lambda bot_id: IdleEngine())
+        await first.sync()
+        await second.sync()
+        # হ্যান্ডঅফ: পুরোনো owner lease ছাড়লে নতুন owner নেয়
+        await first.sync()
+        await second.sync()
+        await asyncio.sleep(0)
+        assert set(first.running) | set(second.running) == set(range(1, 201))
+        assert not set(first.running) & set(second.running)
+        assert 40 < len(first.running) < 160
+
+        # ইউজার বট থামালে (key ডিলিট) পরের sync এ বন্ধ
+        stopped = next(iter(first.running))
+        await redis.delete(f"bot_task:{stopped}")
+        await first.sync()
+        assert stopped not in first.running
+
+        # একটি প্রসেস বন্ধ হলে lease ছেড়ে দেয়, অন্যটি তার সব বট নেয়
+        await second.shutdown()
+        await first.sync()
+        assert set(first.running) == set(range(1, 201)) - {stopped}
+        await first.shutdown()
+        assert not [k for k in redis.data if k.startswith("bot_lease:")]
+
+    asyncio.run(run())
+
+
+def test_lost_lease_stops_local_bot():
+    async def run():
+        redis = MemoryRedis()
+        await redis.set("bot_task:7", "running")
+        supervisor = BotSupervisor("node-a", redis, lambda bot_id: IdleEngine())
+        await supervisor.sync()
+        assert 7 in supervisor.running
+
+        # stall এর মধ্যে lease expire হয়ে অন্য নোড নিয়েছে: রিনিউ ওভাররাইট করে না, লোকাল কপি থামে
+        await redis.set("bot_lease:7", "node-b")
+        await supervisor.sync()
+        assert 7 not in supervisor.running
+        assert await redis.get("bot_lease:7") == "node-b"
+
+    asyncio.run(run())
+
+
+def test_log_publish_does_not_block_event_loop(monkeypatch):
+    from app.services import live_engine
+    published = []
+
+    def slow_publish(channel, payload):
+        time.sleep(0.3)
+        published.append(json.loads(payload))
+
+    monkeypatch.setattr(live_engine.redis_log_client, 'publish', slow_publish)
+    engine = live_engine.LiveBotEngine.__new__(live_engine.LiveBotEngine)
+    engine.symbol, engine.bot = 'BTC/USDT', SimpleNamespace(id=7)
+
+    async def run():
+        start = time.monotonic()
+        engine.log("tick")
+        # ধীর Redis এও লুপের অন্য বট আটকায় না
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 0.1
+    live_engine.log_executor.submit(lambda: None).result()
+    assert published[0]["channel"] == "logs_7" and published[0]["data"]["message"] == "tick"
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.services.candle_writer import CandleWriter
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def make_page(start, n=10):
+    return [[start + i * 60_000, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(n)]
+
+
+def run_writer(fail_batches):
+    writer = CandleWriter(FakeSession, 'BTC/USDT', '1m', batch_rows=10, flush_interval=0)
+    calls = []
+
+    def write_batch(db, batch):
+        calls.append(len(batch))
+        if len(calls) in fail_batches:
+            raise RuntimeError("COPY failed")
+        return len(batch)
+
+    writer._write_batch = write_batch
+
+    async def run():
+        async with writer:
+            for i in range(3):
+                await writer.submit(make_page(i * 600_000))
+                # প্রতিটি পেজ আলাদা ব্যাচে যাক
+                await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    return writer, calls
+
+
+def test_writer_reports_saved_rows():
+    writer, calls = run_writer(fail_batches=())
+    assert calls == [10, 10, 10] and writer.saved == 30 and writer.failed_rows == 0
+
+
+def test_failed_batch_fails_the_sync():
+    with pytest.raises(RuntimeError, match="10 candles failed to write: COPY failed"):
+        run_writer(fail_batches=(2,))
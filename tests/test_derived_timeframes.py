@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+from app.services.derived_timeframes import aggregate_table, last_closed_bucket
+from app.services.market_service import MarketService
+
+
+def test_aggregate_query_skips_other_exchanges_and_open_bucket():
+    engine = sa.create_engine("sqlite://")
+    view = aggregate_table('1h')
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "CREATE TABLE market_data_1h (exchange TEXT, symbol TEXT, timestamp DATETIME, "
+            "open FLOAT, high FLOAT, low FLOAT, close FLOAT, volume FLOAT)"
+        ))
+        open_bucket = datetime.now().replace(minute=0, second=0, microsecond=0)
+        rows = [('binance', open_bucket - timedelta(hours=h), 1.0) for h in (3, 2, 1, 0)]
+        rows.append(('kucoin', open_bucket - timedelta(hours=2), 99.0))
+        conn.execute(view.insert(), [
+            {'exchange': ex, 'symbol': 'BTC/USDT', 'timestamp': ts, 'open': p, 'high': p, 'low': p, 'close': p, 'volume': p}
+            for ex, ts, p in rows
+        ])
+
+    with Session(engine) as db:
+        df = MarketService()._query_aggregate_df(db, 'BTC/USDT', '1h')
+        capped = MarketService()._query_aggregate_df(db, 'BTC/USDT', '1h', end_dt=open_bucket - timedelta(hours=2))
+
+    # চলতি ঘণ্টা (open_bucket) আংশিক, আর kucoin এর রো বাদ
+    assert list(df.index) == [open_bucket - timedelta(hours=h) for h in (3, 2, 1)]
+    assert (df['close'] == 1.0).all()
+    assert list(capped.index) == [open_bucket - timedelta(hours=h) for h in (3, 2)]
+    assert last_closed_bucket('15m', datetime(2024, 1, 1, 12, 0)) == datetime(2024, 1, 1, 11, 45)
@@ -0,0 +1,89 @@
+import io
+import contextlib
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from app.strategies import STRATEGY_MAP
+from app.services.event_backtest import EVENT_STRATEGIES, EventStrategy, run_event_backtest
+
+CANDLES = {'seed': 1, 'volatility': 0.003, 'noise': 0.001, 'freq': '1min'}
+
+
+def backtrader_run(df, strategy_class, params, commission, slippage):
+    # _run_single_backtest এর একই ব্রোকার সেটআপ
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(strategy_class, **params)
+    cerebro.broker.setcash(10000)
+    cerebro.broker.setcommission(commission=commission, commtype=bt.CommInfoBase.COMM_PERC, margin=None, mult=1.0, stocklike=True)
+    if slippage > 0:
+        cerebro.broker.set_slippage_perc(perc=slippage)
+    cerebro.addsizer(bt.sizers.PercentSizer, percents=90)
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
+    with contextlib.redirect_stdout(io.StringIO()):
+        strategy = cerebro.run()[0]
+    return cerebro.broker.getvalue(), strategy
+
+
+def assert_matches_backtrader(df, strategy_class, params, slippage):
+    expected_value, strategy = backtrader_run(df, strategy_class, params, 0.001, slippage)
+    result = run_event_backtest(df, strategy_class, params, 10000, 0.001, slippage)
+
+    assert strategy.trade_history, "parity কেস এ অন্তত একটি ট্রেড থাকতে হবে"
+    assert result.end_value == pytest.approx(expected_value, rel=1e-9)
+    assert [(t['type'], t['time']) for t in result.trades_log()] == \
+        [(t['type'], t['time']) for t in strategy.trade_history]
+    np.testing.assert_allclose([t['price'] for t in result.trades_log()],
+                               [t['price'] for t in strategy.trade_history], rtol=1e-12)
+    analysis = strategy.analyzers.trades.get_analysis()
+    assert result.trade_analysis()['total_closed'] == analysis.total.closed
+    assert result.trade_analysis()['net_profit'] == round(analysis.pnl.net.total, 2)
+
+
+@pytest.mark.parametrize("name, params, slippage", [
+    ("SMA Crossover", {}, 0.0005),
+    ("SMA Crossover", {"stop_loss": 0.5, "take_profit": 1.0}, 0.0),
+    ("Bollinger Bands", {"stop_loss": 1.0, "trailing_stop": 0.5}, 0.0005),
+])
+def test_event_engine_matches_backtrader(name, params, slippage, candles):
+    assert_matches_backtrader(candles(3000, **CANDLES), STRATEGY_MAP[name], params, slippage)
+
+
+# প্রতিটি পোর্টের alias/নন-ডিফল্ট প্যারামিটার; নতুন পোর্ট রেজিস্টার করলে এখানে কেস যোগ করতে হবে
+PORT_PARAMS = {
+    'SmaCross': {'fast_period': 5, 'slow_period': 20},
+    'RsiStrategy': {'rsi_period': 7, 'rsi_upper': 65, 'rsi_lower': 35},
+    'MacdCross': {'fast_period': 8, 'slow_period': 21, 'signal_period': 5},
+    'BollingerBandsStrat': {'period': 15, 'std_dev': 1.5},
+    'EmaCross': {'short_period': 5, 'long_period': 15},
+}
+
+
+@pytest.mark.parametrize("bt_class", list(EVENT_STRATEGIES), ids=lambda c: c.__name__)
+def test_every_event_port_matches_backtrader(bt_class, candles):
+    assert bt_class.__name__ in PORT_PARAMS, f"{bt_class.__name__} পোর্টের parity কেস নেই"
+    df = candles(3000, **CANDLES)
+    assert_matches_backtrader(df, bt_class, {}, 0.0005)
+    assert_matches_backtrader(df, bt_class, dict(PORT_PARAMS[bt_class.__name__], stop_loss=0.5, take_profit=1.0), 0.0)
+    assert_matches_backtrader(df, bt_class, dict(PORT_PARAMS[bt_class.__name__], trailing_stop=0.4), 0.0005)
+
+
+class BuyDip(EventStrategy):
+    params = (('drop', 0.01),)
+
+    def next(self):
+        if len(self.data) < 2:
+            return
+        if not self.position and self.data.close[0] < self.data.close[-1] * (1 - self.p.drop):
+            self.buy()
+        elif self.position and len(self.data) % 10 == 0:
+            self.close()
+
+
+def test_plain_event_strategy_runs_directly(candles):
+    result = run_event_backtest(candles(500, **CANDLES), BuyDip, {'drop': 0.002}, 10000, 0.0)
+    log = result.trades_log()
+    assert log and [t['type'] for t in log[:2]] == ['buy', 'sell']
+    assert len(result.values) == 500 and len(result.equity_curve()) == 500
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from app.services.exchange_pool import exchange_pool
+
+TF_MS = 60_000
+
+
+@pytest.mark.parametrize("page_cap, expected_calls", [(1000, 1), (300, 4)])
+def test_fetch_ohlcv_window_pages_through_capped_exchange(monkeypatch, page_cap, expected_calls):
+    calls = []
+
+    async def fake_call(exchange_id, method, symbol, timeframe, since, limit):
+        # limit যাই হোক, exchange প্রতি পেজে সর্বোচ্চ page_cap টি ক্যান্ডেল দেয়
+        calls.append(since)
+        return [[ts, 1.0, 1.0, 1.0, 1.0, 1.0] for ts in range(since, since + min(limit, page_cap) * TF_MS, TF_MS)]
+
+    monkeypatch.setattr(exchange_pool, 'call', fake_call)
+    start = 1704067200000
+    rows = asyncio.run(exchange_pool.fetch_ohlcv_window('okx', 'BTC/USDT', '1m', start, start + 1000 * TF_MS, 1000))
+
+    assert [r[0] for r in rows] == list(range(start, start + 1000 * TF_MS, TF_MS))
+    assert len(calls) == expected_calls
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.services.feed_store import FeedStore, CsvFeedWriter, recover_csv_feed, read_manifest
+
+
+def make_rows(n=5000):
+    timestamps = 1704067200000 + np.arange(n, dtype='int64') * 60_000
+    return [[int(ts), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0] for i, ts in enumerate(timestamps)]
+
+
+def test_binary_feed_matches_csv_feed(tmp_path):
+    store = FeedStore(str(tmp_path))
+    rows = make_rows()
+
+    # একই ডাউনলোড একবার বাইনারি সেগমেন্টে, একবার পুরোনো CSV ফরম্যাটে
+    original = settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS
+    try:
+        settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS = True, 1000
+        with store.writer('binance_BTC-USDT_1m.csv', 'candles') as writer:
+            for i in range(0, len(rows), 700):
+                writer.append(rows[i:i + 700])
+        settings.DATA_FEED_BINARY = False
+        with store.writer('legacy_1m.csv', 'candles') as writer:
+            writer.append(rows)
+    finally:
+        settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS = original
+
+    assert len(store.segments('binance_BTC-USDT_1m.csv')) == 4
+    assert store.last_timestamp('binance_BTC-USDT_1m.csv') == rows[-1][0]
+
+    feed = store.load_candles('binance_BTC-USDT_1m.csv')
+    legacy = pd.read_csv(store.csv_path('legacy_1m.csv'), index_col='datetime', parse_dates=True)
+    assert (feed.index == legacy.index).all()
+    np.testing.assert_array_equal(feed.to_numpy(), legacy.to_numpy())
+
+    # CSV -> বাইনারি মাইগ্রেশন একই ডাটা দেয়
+    assert store.migrate_csv('legacy_1m.csv', chunk_rows=2000) == len(rows)
+    pd.testing.assert_frame_equal(store.load_candles('legacy_1m.csv'), feed)
+    assert store.list_feeds() == ['binance_BTC-USDT_1m.csv', 'legacy_1m.csv']
+
+
+def test_csv_resume_manifest_truncates_torn_row(tmp_path):
+    path = str(tmp_path / "binance_BTC-USDT_1m.csv")
+    rows = make_rows(10)
+    with CsvFeedWriter(path, 'candles') as writer:
+        writer.append(rows[:5])
+        writer.append(rows[5:8])
+    size = os.path.getsize(path)
+
+    # ক্র্যাশ: অর্ধেক লেখা রো, ম্যানিফেস্ট আপডেট হয়নি
+    with open(path, 'ab') as f:
+        f.write(b'2024-01-01 00:08:00,108.0,1')
+    assert recover_csv_feed(path, 'candles') == rows[7][0]
+    assert os.path.getsize(path) == size
+
+    with CsvFeedWriter(path, 'candles') as writer:
+        writer.append(rows[8:])
+    assert read_manifest(path)['rows'] == 10
+    assert len(pd.read_csv(path)) == 10
+
+    # ম্যানিফেস্ট ছাড়া পুরোনো ফাইলেও শেষ থেকে স্ক্যান করে resume
+    os.remove(path + ".manifest.json")
+    assert recover_csv_feed(path, 'candles') == rows[9][0]
+
+
+def test_interrupted_compaction_never_duplicates_rows(tmp_path, monkeypatch):
+    store = FeedStore(str(tmp_path))
+    rows = make_rows(3000)
+    original = settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS, settings.FEED_MAX_SEGMENTS
+    try:
+        settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS, settings.FEED_MAX_SEGMENTS = True, 1000, 100
+        with store.writer('binance_ETH-USDT_1m.csv', 'candles') as writer:
+            for i in range(0, len(rows), 1000):
+                writer.append(rows[i:i + 1000])
+                writer.flush()
+    finally:
+        settings.DATA_FEED_BINARY, settings.FEED_SEGMENT_ROWS, settings.FEED_MAX_SEGMENTS = original
+    name = 'binance_ETH-USDT_1m.csv'
+    expected = store.load_candles(name)
+    assert len(store.segments(name)) == 3
+
+    # মার্জ করা base লেখার পর, পুরোনো সেগমেন্ট মোছার আগে "ক্র্যাশ"
+    def crash(path):
+        raise OSError("crash")
+    monkeypatch.setattr(os, 'remove', crash)
+    try:
+        store.compact(name)
+    except OSError:
+        pass
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(store.load_candles(name), expected)
+
+    # পরের append ও কম্প্যাকশন আবর্জনা পরিষ্কার করে
+    settings.DATA_FEED_BINARY = True
+    try:
+        with store.writer(name, 'candles') as writer:
+            writer.append(make_rows(3100)[3000:])
+    finally:
+        settings.DATA_FEED_BINARY = original[0]
+    store.compact(name)
+    assert [os.path.basename(p) for p in store.segments(name)] == ['base-000003.arrow']
+    assert sorted(os.listdir(store.feed_dir(name))) == ['base-000003.arrow']
+    assert len(store.load_candles(name)) == 3100
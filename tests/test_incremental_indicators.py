@@ -0,0 +1,69 @@
+import backtrader as bt
+import numpy as np
+
+from app.services.incremental_indicators import SMA, EMA, RSI, MACD, BollingerBands, ATR, IndicatorSet
+
+CANDLES = {'seed': 3, 'noise': 0.002, 'freq': '1min'}
+
+
+class Recorder(bt.Strategy):
+    def __init__(self):
+        self.ind = {
+            'sma': bt.ind.SMA(period=20),
+            'ema': bt.ind.EMA(period=20),
+            'rsi': bt.ind.RSI(period=14),
+            'macd': bt.ind.MACD(period_me1=12, period_me2=26, period_signal=9),
+            'bb': bt.ind.BollingerBands(period=20, devfactor=2.0),
+            'atr': bt.ind.ATR(period=14),
+        }
+        self.rows = []
+
+    def next(self):
+        macd, bb = self.ind['macd'], self.ind['bb']
+        self.rows.append([
+            self.ind['sma'][0], self.ind['ema'][0], self.ind['rsi'][0],
+            macd.macd[0], macd.signal[0], bb.mid[0], bb.top[0], bb.bot[0], self.ind['atr'][0],
+        ])
+
+
+def backtrader_values(df):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.addstrategy(Recorder)
+    return np.array(cerebro.run()[0].rows)
+
+
+def incremental_values(df):
+    indicators = IndicatorSet(
+        sma=SMA(20), ema=EMA(20), rsi=RSI(14), macd=MACD(12, 26, 9), bb=BollingerBands(20, 2.0), atr=ATR(14)
+    )
+    rows = []
+    frame = df.reset_index().rename(columns={'datetime': 'timestamp'})
+    for bar in frame[['timestamp', 'open', 'high', 'low', 'close', 'volume']].itertuples(index=False):
+        v = indicators.update(list(bar))
+        rows.append([v['sma'], v['ema'], v['rsi'], v['macd'].macd, v['macd'].signal,
+                     v['bb'].mid, v['bb'].top, v['bb'].bot, v['atr']])
+    return np.array(rows)
+
+
+def test_incremental_matches_backtrader(candles):
+    df = candles(600, **CANDLES)
+    expected = backtrader_values(df)
+    actual = incremental_values(df)
+    # Backtrader এর next() সব ইন্ডিকেটরের minperiod (MACD: 26 + 9 - 1) এর পর থেকে শুরু
+    np.testing.assert_allclose(actual[-len(expected):], expected, rtol=1e-9, atol=1e-9)
+    assert np.isnan(actual[:-len(expected), 4]).all()
+
+
+def test_frame_updates_only_new_bars_and_peeks_forming_candle(candles):
+    frame = candles(300, **CANDLES).reset_index().rename(columns={'datetime': 'timestamp'})
+    full = IndicatorSet(rsi=RSI(14), macd=MACD())
+    sliding = IndicatorSet(rsi=RSI(14), macd=MACD())
+
+    for end in range(100, 301, 7):
+        window = frame.iloc[max(0, end - 100):end]
+        # লাইভ poll এর মতো: প্রতিবার ১০০ রো, শেষ রোটি চলমান
+        peeked = sliding.update_frame(window, forming=True)
+        closed = full.update_frame(frame.iloc[:end])
+        assert peeked['rsi'] == closed['rsi']
+        assert peeked['macd'] == closed['macd']
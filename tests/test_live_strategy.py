@@ -0,0 +1,66 @@
+import time
+import asyncio
+
+import backtrader as bt
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.live_strategy import LiveStrategyRunner, create_live_runner
+from app.services.vectorized_backtest import sma, crossover
+
+WARM_UP = 100
+CANDLES = {'seed': 5, 'freq': '1min', 'rows': True}
+
+
+def expected_signals(candles):
+    close = np.array([c[4] for c in candles])
+    cross = crossover(sma(close, 5), sma(close, 20))
+    signals, in_position = [], False
+    # warm-up এর অর্ডার reject হয়, তাই বট ফ্ল্যাট থেকে শুরু
+    for i in range(WARM_UP, len(candles)):
+        if not in_position and cross[i] > 0:
+            signals.append(("BUY", candles[i][0]))
+            in_position = True
+        elif in_position and cross[i] < 0:
+            signals.append(("SELL", candles[i][0]))
+            in_position = False
+    return signals
+
+
+def test_strategy_map_strategy_runs_bar_by_bar(candles):
+    bars = candles(400, **CANDLES)
+
+    async def run():
+        runner = create_live_runner("SMA Crossover", {"fast_period": "5", "slow_period": "20"})
+        try:
+            await runner.warm_up(bars[:WARM_UP])
+            signals = []
+            for bar in bars[WARM_UP:]:
+                signals.extend(await runner.push(bar))
+            return signals
+        finally:
+            runner.stop()
+
+    signals = asyncio.run(run())
+    assert [(s.action, s.bar_ts) for s in signals] == expected_signals(bars)
+    assert all(s.size_pct == 100 for s in signals)
+    assert create_live_runner("No Such Strategy") is None
+
+
+class SlowStrategy(bt.Strategy):
+    def next(self):
+        time.sleep(0.5)
+
+
+def test_stuck_strategy_times_out(monkeypatch, candles):
+    monkeypatch.setattr(settings, 'LIVE_STRATEGY_BAR_TIMEOUT', 0.05)
+    runner = LiveStrategyRunner(SlowStrategy)
+    try:
+        with pytest.raises(RuntimeError, match="stuck"):
+            asyncio.run(runner.push(candles(1, **CANDLES)[0]))
+        # টাইমআউটের পর রানার আর বার নেয় না
+        with pytest.raises(RuntimeError, match="not running"):
+            asyncio.run(runner.push(candles(2, **CANDLES)[1]))
+    finally:
+        runner.stop()
@@ -0,0 +1,41 @@
+import asyncio
+
+from app.services.market_stream import LiveCandleFeed, ReplayAdapter
+
+CANDLES = {'freq': '1min', 'rows': True}
+
+
+def collect(feed):
+    async def run():
+        return [event async for event in feed.events()]
+    return asyncio.run(run())
+
+
+def test_stream_emits_each_close_once_without_polling(candles):
+    bars = candles(150, **CANDLES)
+    adapter = ReplayAdapter(bars, history=100, ticks_per_candle=4)
+    feed = LiveCandleFeed(adapter, 'BTC/USDT', '1m', history=100, reconcile_seconds=3600)
+    events = collect(feed)
+
+    closes = [candle for event, candle in events if event == "close"]
+    # শেষ ক্যান্ডেলটি চলমান, তাই ক্লোজ হয় না
+    assert closes == bars[99:-1]
+    assert len([e for e, _ in events if e == "tick"]) == 50 * 4
+    # REST শুধু শুরুর হিস্টোরির জন্য
+    assert adapter.rest_calls == 1
+    assert list(feed.closed) == bars[49:-1]
+    assert feed.to_frame()['close'].tolist() == [c[4] for c in bars[49:-1]]
+
+
+def test_reconcile_fills_candles_missed_by_stream(candles):
+    bars = candles(150, **CANDLES)
+    adapter = ReplayAdapter(bars, history=100, ticks_per_candle=2, skip={120, 121})
+    feed = LiveCandleFeed(adapter, 'BTC/USDT', '1m', history=100, reconcile_seconds=3600)
+    events = collect(feed)
+
+    closes = [candle[0] for event, candle in events if event == "close"]
+    # স্ট্রিমে ফাঁক ধরা পড়লে REST reconcile হারানো ক্যান্ডেলগুলো দেয়, ডুপ্লিকেট ছাড়া
+    assert sorted(closes) == [c[0] for c in bars[99:-1]]
+    assert len(set(closes)) == len(closes)
+    assert adapter.rest_calls == 2
+    assert [c[0] for c in feed.closed] == [c[0] for c in bars[49:-1]]
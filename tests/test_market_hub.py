@@ -0,0 +1,164 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.market_hub import MarketDataHub, OwnerLost
+from app.services.market_stream import ReplayAdapter
+
+CANDLES = {'freq': '1min', 'rows': True}
+
+
+def test_bots_on_same_symbol_share_one_feed(candles):
+    adapters = []
+
+    def factory(exchange_id, market_type):
+        adapter = ReplayAdapter(candles(130, **CANDLES), history=100, ticks_per_candle=2, delay=0.002)
+        adapters.append(adapter)
+        return adapter
+
+    async def consume(subscription):
+        return [event async for event in subscription]
+
+    async def run():
+        hub = MarketDataHub(adapter_factory=factory, cluster=False)
+        first = await hub.subscribe('BTC/USDT', '1m')
+        second = await hub.subscribe('BTC/USDT', '1m')
+        assert hub.active_feeds() == {'binance:spot:BTC/USDT:1m': 2}
+        # দ্বিতীয় বট শুরুতেই শেয়ার্ড হিস্টোরি পায়
+        assert len(second.to_frame()) == 99
+        events = await asyncio.gather(consume(first), consume(second))
+        return hub, events
+
+    hub, (first_events, second_events) = asyncio.run(run())
+
+    # একটাই exchange ফিড, একবারই REST হিস্টোরি
+    assert len(adapters) == 1 and adapters[0].rest_calls == 1
+    assert first_events[-len(second_events):] == second_events
+    assert len([e for e, _ in first_events if e == "close"]) == 30
+    # স্ট্রিম শেষ হলে ফিড হাব থেকে সরে যায় এবং adapter বন্ধ হয়
+    assert hub.active_feeds() == {} and adapters[0].is_closed
+
+
+def test_last_unsubscribe_stops_feed(candles):
+    adapters = []
+
+    def factory(exchange_id, market_type):
+        adapter = ReplayAdapter(candles(130, **CANDLES), history=100, ticks_per_candle=2, delay=0.05)
+        adapters.append(adapter)
+        return adapter
+
+    async def run():
+        hub = MarketDataHub(adapter_factory=factory, cluster=False)
+        first = await hub.subscribe('BTC/USDT', '1m')
+        second = await hub.subscribe('BTC/USDT', '1m')
+        await hub.unsubscribe(first)
+        assert not adapters[0].is_closed
+        await hub.unsubscribe(second)
+        return hub
+
+    hub = asyncio.run(run())
+    assert hub.active_feeds() == {} and adapters[0].is_closed
+
+
+class LockRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def eval(self, script, numkeys, key, token, ttl):
+        # RENEW_LOCK_SCRIPT: token মিললে 1
+        return 1 if self.data.get(key) == token else 0
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_renew_does_not_steal_lock_from_new_owner(monkeypatch):
+    monkeypatch.setattr(settings, 'MARKET_HUB_LOCK_TTL', 0.03)
+
+    async def run():
+        hub = MarketDataHub(cluster=True)
+        redis = LockRedis()
+        hub._redis, hub._redis_loop = redis, asyncio.get_running_loop()
+        feed = SimpleNamespace(closed=[], current=None)
+        key = 'binance:spot:BTC/USDT:1m'
+        redis.data[f"market_feed_owner:{key}"] = "other-process"
+        with pytest.raises(OwnerLost):
+            await asyncio.wait_for(hub._renew_lock(key, feed), 1)
+        return redis
+
+    redis = asyncio.run(run())
+    assert redis.data == {"market_feed_owner:binance:spot:BTC/USDT:1m": "other-process"}
+
+
+class FailoverRedis(LockRedis):
+    """owner প্রসেস চুপচাপ মারা গেছে এমন Redis: pub/sub এ কোনো মেসেজ আসে না।"""
+
+    def __init__(self):
+        super().__init__()
+        self.published = 0
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published += 1
+
+    def pubsub(self):
+        async def get_message(ignore_subscribe_messages=True, timeout=1.0):
+            await asyncio.sleep(0.005)
+            return None
+
+        async def noop(*args):
+            pass
+
+        return SimpleNamespace(subscribe=noop, unsubscribe=noop, close=noop, get_message=get_message)
+
+
+def test_follower_takes_over_when_owner_dies(monkeypatch, candles):
+    monkeypatch.setattr(settings, 'MARKET_HUB_LOCK_TTL', 0.03)
+    bars = candles(130, **CANDLES)
+    adapters = []
+
+    def factory(exchange_id, market_type):
+        adapter = ReplayAdapter(bars, history=100, ticks_per_candle=2, delay=0.002)
+        adapters.append(adapter)
+        return adapter
+
+    async def run():
+        hub = MarketDataHub(adapter_factory=factory, cluster=True)
+        redis = FailoverRedis()
+        hub._redis, hub._redis_loop = redis, asyncio.get_running_loop()
+        key = 'binance:spot:BTC/USDT:1m'
+        redis.data[f"market_feed_owner:{key}"] = "other-process"
+        redis.data[f"market_feed_snapshot:{key}"] = json.dumps(bars[:100])
+
+        subscription = await hub.subscribe('BTC/USDT', '1m')
+        # প্রথমে follower: exchange স্ট্রিম খোলা হয়নি
+        assert not adapters
+        # owner মারা গেল, lock expire
+        del redis.data[f"market_feed_owner:{key}"]
+        events = [event async for event in subscription]
+        return hub, redis, events
+
+    hub, redis, events = asyncio.run(run())
+
+    # follower নিজেই owner হয়ে exchange স্ট্রিম চালিয়েছে, বটরা ফিড হারায়নি
+    assert len(adapters) == 1 and adapters[0].is_closed
+    assert len([e for e, _ in events if e == "close"]) == 30
+    assert redis.published > 0
+    assert hub.active_feeds() == {}
@@ -1,10 +1,5 @@
-import sys
-import os
 from datetime import datetime, timedelta
 
-# Add backend to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
-
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, MarketData
@@ -0,0 +1,70 @@
+import io
+import contextlib
+
+import numpy as np
+
+from app.services.backtest_engine import BacktestEngine
+from app.services.tpe_optimizer import TPESampler, PercentilePruner
+
+RANGES = {'fast_period': list(range(3, 31, 3)), 'slow_period': list(range(20, 101, 10))}
+CANDLES = {'seed': 7, 'volatility': 0.004}
+
+
+def test_sampler_never_repeats_and_exhausts_space():
+    sampler = TPESampler({'a': [1, 2, 3], 'b': ['x', 'y']}, seed=0)
+    trials = []
+    for _ in range(6):
+        candidate = sampler.suggest(trials)
+        trials.append((candidate, float(sum(candidate)), False))
+    assert len({t[0] for t in trials}) == 6
+    assert sampler.suggest(trials) is None
+    assert sampler.params_for((2, 1)) == {'a': 3, 'b': 'y'}
+
+
+def test_pruner_cuts_below_percentile():
+    pruner = PercentilePruner(percentile=50, n_startup_trials=3)
+    assert pruner.checkpoints(1000) == [250, 500, 750]
+    # প্রথম n_startup_trials কখনো prune হয় না
+    assert not any(pruner.should_prune(250, v) for v in (-5.0, 0.0, 5.0))
+    assert pruner.should_prune(250, -1.0)
+    assert not pruner.should_prune(250, 1.0)
+    assert not pruner.should_prune(500, -50.0)
+
+
+def test_pruned_event_run_matches_full_run_when_not_pruned(candles):
+    df = candles(2000, **CANDLES)
+    engine = BacktestEngine()
+    params = {'fast_period': 9, 'slow_period': 40}
+    fixed = {'stop_loss': 1, 'take_profit': 3}
+    with contextlib.redirect_stdout(io.StringIO()):
+        full = engine._run_single_backtest(df, "SMA Crossover", 10000, params, fixed)
+        never = engine._run_single_backtest(df, "SMA Crossover", 10000, params, fixed,
+                                            pruner=PercentilePruner(n_startup_trials=10 ** 9))
+        # আগের ট্রায়ালগুলো সবাই +1000% এ ছিল, তাই প্রথম চেকপয়েন্টেই থামবে
+        dominated = PercentilePruner(n_startup_trials=1)
+        dominated.history = {step: [1000.0] for step in dominated.checkpoints(len(df))}
+        pruned = engine._run_single_backtest(df, "SMA Crossover", 10000, params, fixed, pruner=dominated)
+    assert never == full
+    assert pruned['pruned'] and pruned['prunedAt'] == 25.0
+
+
+def test_tpe_reaches_grid_top_decile_with_fewer_trials(candles):
+    df = candles(2000, **CANDLES)
+    engine = BacktestEngine()
+    grid = [engine._run_single_backtest(df, "SMA Crossover", 10000, {'fast_period': f, 'slow_period': s}, {})['profitPercent']
+            for f in RANGES['fast_period'] for s in RANGES['slow_period']]
+
+    results = engine._run_tpe(df, "SMA Crossover", 10000, RANGES, {}, n_trials=30, seed=0)
+    assert len(results) == 30
+    assert len({tuple(r['params'].items()) for r in results}) == 30
+    assert max(r['profitPercent'] for r in results) >= np.percentile(grid, 90)
+
+
+def test_tpe_prunes_dominated_runs(candles):
+    df = candles(2000, **CANDLES)
+    engine = BacktestEngine()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = engine._run_tpe(df, "SMA Crossover", 10000, RANGES, {'stop_loss': 2}, n_trials=30, seed=1)
+    pruned = [r for r in results if r.get('pruned')]
+    assert pruned and len(pruned) < len(results)
+    assert all(r['prunedAt'] in (25.0, 50.0, 75.0) for r in pruned)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_processing import iter_trade_candles, stream_trades_to_candles
+from app.services.trade_conversion_pool import _convert_one, _init_worker, to_pandas_timeframe
+
+
+def write_trades(path, n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(0.7, n)
+    gaps[2000:2003] = 200  # কয়েক মিনিট কোনো ট্রেড নেই
+    ts = pd.Timestamp('2024-01-01T23:55:00Z') + pd.to_timedelta(np.cumsum(gaps), unit='s')
+    pd.DataFrame({
+        'id': range(n),
+        'datetime': ts.strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3] + 'Z',
+        'price': 100 + np.cumsum(rng.normal(0, 0.1, n)),
+        'amount': rng.uniform(0, 1, n),
+    }).to_csv(path, index=False)
+
+
+def full_resample(path, timeframe):
+    # পুরোনো (পুরো ফাইল মেমোরিতে) কনভার্সন
+    df = pd.read_csv(path, usecols=['datetime', 'price', 'amount'])
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    df.set_index('datetime', inplace=True)
+    candles = pd.concat([df['price'].resample(timeframe).ohlc(), df['amount'].resample(timeframe).sum()], axis=1)
+    candles.columns = ['open', 'high', 'low', 'close', 'volume']
+    candles['close'] = candles['close'].ffill()
+    for col in ['open', 'high', 'low']:
+        candles[col] = candles[col].fillna(candles['close'])
+    candles['volume'] = candles['volume'].fillna(0)
+    return candles
+
+
+def test_chunked_conversion_matches_full_resample(tmp_path):
+    trade_file = str(tmp_path / "trades_test.csv")
+    write_trades(trade_file)
+
+    for timeframe in ['1s', '7s', '1min']:
+        expected = full_resample(trade_file, timeframe)
+        for chunk_rows in [97, 1000, 100_000]:
+            streamed = pd.concat(list(iter_trade_candles(trade_file, timeframe, chunk_rows)))
+            pd.testing.assert_frame_equal(streamed, expected, check_freq=False, check_names=False)
+
+    output = str(tmp_path / "candles_1min_test.csv")
+    assert stream_trades_to_candles(trade_file, output, '1min', chunk_rows=250) == len(full_resample(trade_file, '1min'))
+    assert list(pd.read_csv(output, nrows=1).columns) == ['datetime', 'open', 'high', 'low', 'close', 'volume']
+
+
+def test_unknown_timeframe_fails_the_file(tmp_path):
+    write_trades(str(tmp_path / "trades_test.csv"), n=200)
+    with pytest.raises(ValueError):
+        to_pandas_timeframe('7m')
+
+    _init_worker(str(tmp_path), ['1m', '7m'], 1000, False, None)
+    result = _convert_one("trades_test.csv")
+    # চুপচাপ 1min এ লেখা নয়: ফাইলটি ব্যর্থ হিসেবে রিপোর্ট, কোনো আউটপুট নেই
+    assert result["error"] == "Unsupported timeframe: 7m" and result["outputs"] == {}
+    assert not (tmp_path / "candles_7m_trades_test.csv").exists()
@@ -0,0 +1,57 @@
+from app.core.config import settings
+from app.services.backtest_engine import BacktestEngine
+from app.services.indicator_cache import indicator_cache
+
+CANDLES = {'seed': 1, 'noise': 0.002, 'start': '2022-01-01'}
+
+
+def test_vectorized_matches_backtrader(candles):
+    engine = BacktestEngine()
+    df = candles(3000, **CANDLES)
+    cases = [
+        ('SMA Crossover', {'short_period': 5, 'long_period': 20}),
+        ('EMA Crossover', {'short_period': 9, 'long_period': 21}),
+        ('RSI Crossover', {'rsi_period': 14, 'rsi_lower': 35, 'rsi_upper': 65}),
+        ('MACD Crossover', {}),
+        ('Bollinger Bands', {'period': 20, 'std_dev': 2.0}),
+    ]
+
+    original = settings.VECTORIZED_BACKTEST
+    try:
+        for name, params in cases:
+            settings.VECTORIZED_BACKTEST = False
+            expected = engine._run_single_backtest(df, name, 10000, params, {}, 0.002, 0.001)
+            settings.VECTORIZED_BACKTEST = True
+            actual = engine._run_single_backtest(df, name, 10000, params, {}, 0.002, 0.001)
+            actual.pop('indicatorCache')
+            assert actual == expected, name
+    finally:
+        settings.VECTORIZED_BACKTEST = original
+
+
+def test_indicator_cache_reuses_shared_periods(candles):
+    engine = BacktestEngine()
+    df = candles(1000, **CANDLES)
+    indicator_cache.clear()
+    try:
+        # প্রথম রানের long_period=20 SMA দ্বিতীয় রানে short_period=20 হিসেবে ক্যাশ থেকে আসবে
+        first = engine._run_single_backtest(df, 'SMA Crossover', 10000, {'short_period': 10, 'long_period': 20}, {})
+        second = engine._run_single_backtest(df, 'SMA Crossover', 10000, {'short_period': 20, 'long_period': 30}, {})
+        assert first['indicatorCache'] == {'hits': 0, 'misses': 2}
+        assert second['indicatorCache'] == {'hits': 1, 'misses': 1}
+    finally:
+        indicator_cache.clear()
+
+
+def test_optimize_reports_aggregate_cache_stats(monkeypatch, candles):
+    from app.services import backtest_engine
+    df = candles(1000, **CANDLES)
+    monkeypatch.setattr(backtest_engine.market_service, 'get_candles_df', lambda *args, **kwargs: df)
+    params = {'short_period': {'start': 10, 'end': 20, 'step': 10}, 'long_period': {'start': 20, 'end': 30, 'step': 10}}
+    rows = BacktestEngine().optimize(None, 'BTC/USDT', '1h', 'SMA Crossover', 10000, params, workers=1)
+
+    # 4 রানে SMA 10/20/30 প্রতিটি একবার করে হিসাব, বাকি 5টি ক্যাশ থেকে; সব রো তে একই মোট সামারি
+    assert len(rows) == 4
+    assert rows[0]['indicatorCache'] == {'hits': 5, 'misses': 3, 'hitRate': 62.5}
+    assert all(r['indicatorCache'] is rows[0]['indicatorCache'] for r in rows)
+    assert indicator_cache.stats()['size'] == 0
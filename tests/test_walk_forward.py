@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.services import walk_forward
+from app.services.backtest_engine import BacktestEngine
+
+CANDLES = {'seed': 3, 'volatility': 0.004}
+
+
+def test_build_windows_rolling_and_anchored(candles):
+    index = candles(1000, **CANDLES).index
+    rolling = walk_forward.build_windows(index, 400, 200)
+    assert rolling == [(0, 400, 400, 600), (200, 600, 600, 800), (400, 800, 800, 1000)]
+    anchored = walk_forward.build_windows(index, "400", "250", anchored=True)
+    # শেষ test উইন্ডো ছোট হলেও MIN_WINDOW_BARS এর বেশি হলে রাখা হয়
+    assert anchored == [(0, 400, 400, 650), (0, 650, 650, 900), (0, 900, 900, 1000)]
+
+
+def test_build_windows_by_duration(candles):
+    index = candles(24 * 10, **CANDLES).index
+    windows = walk_forward.build_windows(index, "4D", "2D")
+    assert [(w[1] - w[0], w[3] - w[2]) for w in windows] == [(96, 48), (96, 48), (96, 48)]
+    with pytest.raises(ValueError):
+        walk_forward.build_windows(index, "4D", 48)
+
+
+def test_walk_forward_stitches_out_of_sample_equity(candles):
+    df = candles(1200, **CANDLES)
+    engine = BacktestEngine()
+    windows = walk_forward.build_windows(df.index, 400, 200)
+    param_sets = [{'fast_period': f, 'slow_period': s} for f in (5, 10) for s in (20, 30)]
+
+    window_results = [
+        walk_forward.run_window(engine, df, w, param_sets, "SMA Crossover", 10000, {}, 0.001, 0.0)
+        for w in windows
+    ]
+    # ক্রম উল্টো দিলেও stitch সময় অনুযায়ী সাজায়
+    result = walk_forward.stitch_results(list(reversed(window_results)), 10000)
+
+    assert result["summary"]["windows"] == len(windows) == 4
+    equity = result["oos_equity"]
+    assert len(equity) == sum(w[3] - w[2] for w in windows)
+    assert [p["time"] for p in equity] == sorted(p["time"] for p in equity)
+    assert equity[-1]["value"] == result["summary"]["oos_final_value"]
+    assert set(result["parameter_stability"]) == {'fast_period', 'slow_period'}
+    assert all(w["best_params"] in param_sets for w in result["windows"])
+
+
+def test_parallel_windows_match_serial(candles):
+    df = candles(1200, **CANDLES)
+    engine = BacktestEngine()
+    windows = walk_forward.build_windows(df.index, 400, 200)
+    param_sets = [{'fast_period': f, 'slow_period': 20} for f in (5, 10)]
+
+    serial = walk_forward.stitch_results([
+        walk_forward.run_window(engine, df, w, param_sets, "SMA Crossover", 10000, {}, 0.001, 0.0)
+        for w in windows
+    ], 10000)
+
+    from app.services.optimizer_pool import run_parallel_windows
+    parallel, aborted = run_parallel_windows(df, "SMA Crossover", 10000, windows, param_sets, {}, workers=2)
+    parallel = walk_forward.stitch_results(parallel, 10000)
+
+    assert not aborted
+    assert parallel["summary"] == serial["summary"]
+    assert [w["best_params"] for w in parallel["windows"]] == [w["best_params"] for w in serial["windows"]]
+
+
+def test_test_window_is_warmed_up_before_scoring(monkeypatch, candles):
+    df = candles(1200, **CANDLES)
+    engine = BacktestEngine()
+    params = {'fast_period': 10, 'slow_period': 30}
+    cold, cold_values = walk_forward.evaluate_window(engine, df.iloc[600:800], "SMA Crossover", 10000, params, {})
+    warm, warm_values = walk_forward.evaluate_window(engine, df.iloc[300:800], "SMA Crossover", 10000, params, {}, warmup=300)
+    # একই 200 টি test বার; warm-up এ কোনো অর্ডার নেই, তাই test ফ্ল্যাট অবস্থায় initial_cash থেকে শুরু
+    assert len(cold_values) == len(warm_values) == 200
+    assert warm_values[0] == 10000
+    # গরম ইন্ডিকেটরে test এর শুরু থেকেই সিগনাল আসে
+    assert warm["total_trades"] >= cold["total_trades"]
+
+    # Backtrader পাথেও একই ফল (ট্রেড শুধু test অংশের)
+    monkeypatch.setattr(walk_forward.event_backtest, 'supports', lambda cls: False)
+    bt_warm, bt_values = walk_forward.evaluate_window(engine, df.iloc[300:800], "SMA Crossover", 10000, params, {}, warmup=300)
+    assert bt_warm == warm
+    np.testing.assert_allclose(bt_values, warm_values, rtol=1e-9)
+
+
+def test_optimize_walk_forward_returns_result_rows(candles):
+    df = candles(1200, **CANDLES)
+    engine = BacktestEngine()
+    rows = engine._run_walk_forward(df, "SMA Crossover", 10000, {'fast_period': [5, 10], 'slow_period': [20]}, {},
+                                    0.001, 0.0, train_period=400, test_period=200, workers=1)
+
+    # অন্য মেথডের মতো লিস্ট: params + out-of-sample মেট্রিক, সময়ের ক্রমে
+    assert isinstance(rows, list) and len(rows) == 4
+    assert all(r["mode"] == "walk_forward" and r["params"] in ({'fast_period': 5, 'slow_period': 20},
+                                                                {'fast_period': 10, 'slow_period': 20}) for r in rows)
+    assert [r["test_start"] for r in rows] == sorted(r["test_start"] for r in rows)
+    equity = [p for r in rows for p in r["oos_equity"]]
+    assert equity[-1]["value"] == rows[0]["summary"]["oos_final_value"]